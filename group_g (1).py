@@ -48,18 +48,34 @@ The dataset has been limited to include data from Jan 5th to Feb 5th, 2025, whic
 5. Congestion Relief Zone vs. Excluded Roadway Entries:
 """
 
+# The analysis below uses this repository's mta package; in Colab, clone it and install its requirements first
+!git clone --depth 1 https://github.com/QMSS-G5063-2025/Group_G_ManhattanCRZ.git
+!pip install -q -r Group_G_ManhattanCRZ/requirements.txt
+
+import sys
+sys.path.insert(0, 'Group_G_ManhattanCRZ')
+
 import pandas as pd
 import numpy as np
-from google.colab import files
-uploaded = files.upload()
 
-df=pd.read_csv('MTA_Entries.csv')
+from mta.data import data_version, memory_footprint, prepare_entries, raw_csv_path, read_entries_csv
 
-df['Toll Hour'] = pd.to_datetime(df['Toll Hour'], format='%m/%d/%Y %I:%M:%S %p')
-cutoff_date = pd.to_datetime('2025-02-05 12:59:59')
-df = df[df['Toll Hour'] <= cutoff_date]
+# Download MTA_Entries.csv once into .cache/ (MTA_DATA_SOURCE points at a local copy instead),
+# then read only the columns we use, with categorical dimensions and int32 counts
+data_version(build_snapshot=False)
+df = prepare_entries(read_entries_csv(raw_csv_path()))
+print(f"Memory footprint: {memory_footprint(df) / 1e6:.1f} MB")
 df
 
+"""For archives too large to load at once, the same file can be streamed in chunks and folded into running totals instead. `aggregate_csv` applies the date window (and optional column filters) to every chunk, so peak memory stays at one chunk plus the aggregate cube, and `cube.aggregate([...], measures)` gives the same result as the `df.groupby([...], observed=True)[measures].sum()` calls below.
+
+```python
+from mta.cube import aggregate_csv
+cube = aggregate_csv(raw_csv_path(), chunksize=500_000, start='2025-01-05')
+cube.aggregate(['Detection Region'], ['CRZ Entries'])
+```
+"""
+
 """### **1. Word Cloud for Detection Group**
 The Detection Group word cloud visualizes the distribution of vehicle entry points into Manhattan at or below 60th Street. Each Detection Group represents a specific crossing location where vehicles are detected as they first enter the area (e.g., Lincoln Tunnel, Williamsburg Bridge, Manhattan Bridge).
 
@@ -69,21 +85,21 @@ The Detection Group word cloud visualizes the distribution of vehicle entry poin
 By presenting these entry points in a word cloud, where larger words represent crossings with higher entry volumes and smaller words indicate crossings with fewer detected entries, We can easily identify the most frequently used entry routes into the congestion zone and understand the spatial distribution of traffic inflows.
 """
 
-from wordcloud import WordCloud
+import io
 import matplotlib.pyplot as plt
+from PIL import Image
+from mta.cloud import wordcloud_png
 
 # Count frequencies of each Detection Group
 detection_group_counts = df["Detection Group"].value_counts()
 
-# Generate word cloud
+# Generate word cloud (the PNG is cached under a hash of the frequencies and options)
 def generate_wordcloud():
-    wordcloud = WordCloud(width=800, height=400, max_words=100, colormap="Blues").generate_from_frequencies(
-        detection_group_counts.to_dict()
-    )
+    png = wordcloud_png(detection_group_counts.to_dict(), max_words=100)
 
     # Display word cloud
     plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation="bilinear")
+    plt.imshow(Image.open(io.BytesIO(png)), interpolation="bilinear")
     plt.axis("off")
     plt.title("Word Cloud for Detection Group", fontsize=14)
     plt.show()
@@ -99,41 +115,18 @@ generate_wordcloud()
 Now that we can identify high-traffic entry points, we want to visualize how much traffic is distributed across various entry points into Manhattan. A map of Manhattan with heat maps wil then be made to indicate traffic volumes at different entry points. This graph can highlight the most congested areas and show spatial patterns in vehicle entries by presenting entry points with different colors, with deep red indicating higher traffic volumn.
 """
 
-import folium
-from folium.plugins import HeatMap
-import pandas as pd
-
-entry_points = {
-    'Brooklyn Bridge': {'lat': 40.70563, 'lon': -73.99635},
-    'Queensboro Bridge': {'lat': 40.759, 'lon': -73.955},
-    'East 60th St': {'lat': 40.76305, 'lon': -73.96818},
-    'Manhattan Bridge': {'lat': 40.7075, 'lon': -73.99077},
-    'Lincoln Tunnel': {'lat': 40.760128, 'lon': -74.003065},
-    'West Side Highway at 60th St': {'lat': 40.7714, 'lon': -73.9905},
-    'Queens Midtown Tunnel': {'lat': 40.7407, 'lon': -73.9588},
-    'Williamsburg Bridge': {'lat': 40.71369, 'lon': -73.97262},
-    'Holland Tunnel': {'lat': 40.727399, 'lon': -74.021338},
-    'Hugh L. Carey Tunnel': {'lat': 40.6958, 'lon': -74.0136},
-}
+from mta.charts import with_coordinates
+from mta.maps import bubble_map, heatmap
 
 # Grouping data by Detection Group to sum traffic volume (CRZ Entries)
-entry_data = df.groupby('Detection Group')['CRZ Entries'].sum().reset_index()
+entry_data = df.groupby('Detection Group', observed=True)['CRZ Entries'].sum().reset_index()
 
-# Add latitude and longitude for each entry point based on the manual dictionary
-entry_data['lat'] = entry_data['Detection Group'].map(lambda x: entry_points.get(x, {}).get('lat'))
-entry_data['lon'] = entry_data['Detection Group'].map(lambda x: entry_points.get(x, {}).get('lon'))
+# Add latitude and longitude for each entry point from the ENTRY_POINTS table
+# (entry points without coordinates are dropped)
+entry_data = with_coordinates(entry_data)
 
-# Filter out rows where lat/lon are missing (if any)
-entry_data = entry_data.dropna(subset=['lat', 'lon'])
-
-# Create a map centered around Manhattan
-map_manhattan = folium.Map(location=[40.758, -73.985], zoom_start=12)
-
-# Prepare data for the heatmap
-heat_data = [[row['lat'], row['lon'], row['CRZ Entries']] for index, row in entry_data.iterrows()]
-
-# Add HeatMap layer
-HeatMap(heat_data).add_to(map_manhattan)
+# Heatmap of the entry points, built from the [lat, lon, entries] arrays in one go
+map_manhattan = heatmap(entry_data)
 
 map_manhattan
 
@@ -142,67 +135,13 @@ map_manhattan
 However, for individuals who may not be familiar with Manhattan, the specific entry points may be hard to identify. To improve clarity, we decide to add labels andf markers indicating the names of these entry points below each heatmap location.
 """
 
-# Create a new map centered around Manhattan
-map_manhattan_with_labels = folium.Map(location=[40.758, -73.985], zoom_start=12)
-
-# Add the HeatMap layer
-HeatMap(heat_data).add_to(map_manhattan_with_labels)
-
-# Add labels with entry point names below each point
-for index, row in entry_data.iterrows():
-    html = f"""
-        <b>Entry Point:</b> {row['Detection Group']}<br>
-        <b>Number of Entries:</b> {row['CRZ Entries']}
-    </div>
-    """
-
-    popup = folium.Popup(html, max_width=200)
-
-    folium.Marker(
-        location=[row['lat'], row['lon']],
-        popup=popup,
-        icon=folium.Icon(color='blue', icon='info-sign')
-    ).add_to(map_manhattan_with_labels)
+# Same heatmap plus one labelled marker per entry point (a single GeoJSON layer)
+map_manhattan_with_labels = heatmap(entry_data, markers=True)
 
 map_manhattan_with_labels
 
-import branca.colormap as cm
-
-map_manhattan_with_bubbles = folium.Map(location=[40.758, -73.985], zoom_start=12)
-
-min_entries = min(entry_data['CRZ Entries'])
-max_entries = max(entry_data['CRZ Entries'])
-
-colormap = cm.LinearColormap(
-    colors=['blue', 'purple', 'orange', 'red'],
-    vmin=min_entries,
-    vmax=max_entries,
-)
-
-map_manhattan_with_bubbles.add_child(colormap)
-
-for index, row in entry_data.iterrows():
-    html = f"""
-    <div style="font-family: Arial, sans-serif; padding: 5px;">
-        <b>Entry Point:</b> {row['Detection Group']}<br>
-        <b>Number of Entries:</b> {row['CRZ Entries']}
-    </div>
-    """
-
-    radius = int(np.sqrt(row['CRZ Entries']) / 35)
-    circle_color = colormap(row['CRZ Entries'])
-
-    folium.CircleMarker(
-        location=[row['lat'], row['lon']],
-        radius=radius,
-        popup=folium.Popup(html, max_width=200),
-        tooltip=f"{row['Detection Group']} | Entries: {row['CRZ Entries']}",
-        color=circle_color,
-        fill=True,
-        fill_color=circle_color,
-        fill_opacity=0.6,
-        weight=1
-    ).add_to(map_manhattan_with_bubbles)
+# Bubbles sized by sqrt(entries) and coloured with a branca colormap
+map_manhattan_with_bubbles = bubble_map(entry_data)
 
 map_manhattan_with_bubbles
 
@@ -214,7 +153,7 @@ Now that we got the map, we will then create a table that shows the percentage o
 """
 
 # Calculate the total entries and the percentage of entries for each Detection Region
-region_data = df.groupby('Detection Region')['CRZ Entries'].sum().reset_index()
+region_data = df.groupby('Detection Region', observed=True)['CRZ Entries'].sum().reset_index()
 
 # Calculate the total traffic volume to compute percentages
 total_entries = region_data['CRZ Entries'].sum()
@@ -276,8 +215,8 @@ fig.update_layout(
 To represent the distribution of vehicles by category in the tolling system, a bar chart can be used. The chart will display the average daily number of entries by vehicle types.
 """
 
-daily_avg = df.groupby(['Toll Date', 'Vehicle Class'])['CRZ Entries'].sum().reset_index()
-daily_avg = daily_avg.groupby('Vehicle Class')['CRZ Entries'].mean().reset_index(name='Average Daily Count')
+daily_avg = df.groupby(['Toll Date', 'Vehicle Class'], observed=True)['CRZ Entries'].sum().reset_index()
+daily_avg = daily_avg.groupby('Vehicle Class', observed=True)['CRZ Entries'].mean().reset_index(name='Average Daily Count')
 daily_avg_sorted = daily_avg.sort_values('Average Daily Count', ascending=False)
 
 vehicle_chart = px.bar(
@@ -313,8 +252,8 @@ vehicle_chart.show()
 The congestion pricing policy sets the charing peak hour to 5 a.m. to 9 p.m. on weekdays and 9 a.m. to 9 p.m. on weekends, with the rest as off-peak/overnight hours. As the policy is primary targeting at peak hours with a higher toll rate of 9 dollars and off-peak hour toll is 2.25 dollars, we were expecting the peak-hour entries to reduce over time after the policy implementation. However, the graphs show relatively stable trends over time, with weekday peaks having lower entries and weekend peaks having higher.
 """
 
-daily_avg_detection = df.groupby(['Toll Date', 'Time Period', 'Detection Group'])['CRZ Entries'].sum().reset_index()
-daily_avg_detection = daily_avg_detection.groupby(['Time Period', 'Detection Group'])['CRZ Entries'].mean().reset_index()
+daily_avg_detection = df.groupby(['Toll Date', 'Time Period', 'Detection Group'], observed=True)['CRZ Entries'].sum().reset_index()
+daily_avg_detection = daily_avg_detection.groupby(['Time Period', 'Detection Group'], observed=True)['CRZ Entries'].mean().reset_index()
 daily_avg_detection = daily_avg_detection.sort_values(by='CRZ Entries', ascending=True)
 pivot = daily_avg_detection.pivot(index='Detection Group', columns='Time Period', values='CRZ Entries').reset_index()
 pivot = pivot.sort_values(by='Peak', ascending=False)
@@ -344,8 +283,8 @@ detection_time_chart.update_layout(
 
 detection_time_chart.show()
 
-dow_avg = df.groupby(['Toll Date', 'Day of Week', 'Time Period'])['CRZ Entries'].sum().reset_index()
-dow_avg = dow_avg.groupby(['Day of Week', 'Time Period'])['CRZ Entries'].mean().reset_index()
+dow_avg = df.groupby(['Toll Date', 'Day of Week', 'Time Period'], observed=True)['CRZ Entries'].sum().reset_index()
+dow_avg = dow_avg.groupby(['Day of Week', 'Time Period'], observed=True)['CRZ Entries'].mean().reset_index()
 dow_avg = dow_avg.sort_values(['Day of Week', 'Time Period'])
 
 dow_chart = px.bar(
@@ -372,8 +311,8 @@ dow_chart.update_layout(
 
 dow_chart.show()
 
-daily_totals = df.groupby(['Toll Date','Day of Week', 'Time Period'])['CRZ Entries'].sum().reset_index()
-daily_total = daily_totals.groupby(['Toll Date', 'Day of Week', 'Time Period'])['CRZ Entries'].mean().reset_index()
+daily_totals = df.groupby(['Toll Date','Day of Week', 'Time Period'], observed=True)['CRZ Entries'].sum().reset_index()
+daily_total = daily_totals.groupby(['Toll Date', 'Day of Week', 'Time Period'], observed=True)['CRZ Entries'].mean().reset_index()
 daily_total['Toll Date'] = pd.to_datetime(daily_total['Toll Date'])
 
 time_chart = px.line(
@@ -404,22 +343,10 @@ time_chart.update_xaxes(
     tickformat='%m-%d'
 )
 
-weekend_dates = daily_total[daily_total['Day of Week'].isin(['Saturday', 'Sunday'])]['Toll Date'].unique()
-for date in weekend_dates:
-    date = pd.to_datetime(date)
-    next_date = date + pd.Timedelta(days=1)
-    time_chart.add_shape(
-        type="rect",
-        x0=date,
-        x1=next_date,
-        y0=0,
-        y1=1,
-        yref="paper",
-        fillcolor="lightgray",
-        opacity=0.3,
-        layer="below",
-        line_width=0,
-    )
+# Shade weekends: one band per run of Saturdays and Sundays rather than one shape per date
+from mta.timeseries import add_weekend_shading
+
+add_weekend_shading(time_chart, daily_total['Toll Date'])
 
 time_chart.add_annotation(
     xref="paper",
@@ -446,23 +373,19 @@ time_chart.show()
 
 """How about by time of the day?"""
 
-df['Toll Date'] = pd.to_datetime(df['Toll Date'], errors='coerce')
-df['Toll Hour'] = pd.to_datetime(df['Toll Hour'], format='%m/%d/%Y %I:%M:%S %p', errors='coerce')
-
-# Create a new column for just the time portion (hour and minute)
-df['Time'] = df['Toll Hour'].dt.strftime('%H:%M')
+from mta.data import slot_labels
 
+# prepare_entries already derived the 10-minute slot of the day (0-143) as an integer key
 # First verify we have data
-print(df['Time'].head())
+print(df['Slot'].head())
 print(df['CRZ Entries'].head())
 
-# Group by time and calculate average entries
-time_sums = df.groupby(['Toll Date', 'Time'])['CRZ Entries'].sum().reset_index()
-df_avg_entries = time_sums.groupby('Time')['CRZ Entries'].mean().reset_index()
+# Group by day and slot and calculate average entries (groupby sorts the slots in time order)
+time_sums = df.groupby(['Day Index', 'Slot'])['CRZ Entries'].sum().reset_index()
+df_avg_entries = time_sums.groupby('Slot')['CRZ Entries'].mean().reset_index()
 
-# Sort by time to ensure proper ordering
-df_avg_entries['Time'] = pd.to_datetime(df_avg_entries['Time'], format='%H:%M').dt.strftime('%H:%M')
-df_avg_entries = df_avg_entries.sort_values('Time')
+# 'HH:MM' labels are only needed for the 144 result rows
+df_avg_entries['Time'] = slot_labels(df_avg_entries['Slot'])
 
 # Create an interactive line chart with Plotly
 fig = px.line(df_avg_entries,
@@ -509,11 +432,12 @@ By comparing CRZ entries with Excluded Roadway entries, we can gain insights int
 3. Congestion management: Understanding where traffic congestion is being concentrated and whether the excluded roadways are seeing more traffic as a result of the tolling policy.
 """
 
-# Filter data for Jan 5 - Jan 25, 2025
-df_filtered = df[(df['Toll Date'] >= '2025-01-05') & (df['Toll Date'] <= '2025-01-25')]
+# Filter data for Jan 5 - Jan 25, 2025 (df is sorted by Toll 10 Minute Block, so this is a binary-search slice)
+from mta.data import date_range
+df_filtered = date_range(df, '2025-01-05', '2025-01-25')
 
 # Group by 'Toll Date' and sum up the CRZ and Excluded Roadway entries
-daily_entries = df_filtered.groupby('Toll Date')[['CRZ Entries', 'Excluded Roadway Entries']].sum().reset_index()
+daily_entries = df_filtered.groupby('Toll Date', observed=True)[['CRZ Entries', 'Excluded Roadway Entries']].sum().reset_index()
 
 fig = px.bar(daily_entries,
              x='Toll Date',
@@ -553,11 +477,9 @@ daily_entries. head()
 """Based on the calculation, the CRZ Entries make up 88.06% of the total entries."""
 
 # Ensure the dataset includes the necessary columns for analysis
-df_crossing_points = df[['Toll Date', 'Detection Group', 'CRZ Entries', 'Excluded Roadway Entries']]
+# (Weekday is the integer key from prepare_entries, 0: Monday, 6: Sunday)
+df_crossing_points = df[['Toll Date', 'Weekday', 'Detection Group', 'CRZ Entries', 'Excluded Roadway Entries']]
 
-# Convert the 'Toll Date' column to datetime and filter for weekdays (Monday to Friday)
-df_crossing_points['Toll Date'] = pd.to_datetime(df_crossing_points['Toll Date'])
-df_crossing_points['Weekday'] = df_crossing_points['Toll Date'].dt.weekday  # 0: Monday, 6: Sunday
 
 import seaborn as sns
 
@@ -590,17 +512,15 @@ fig.show()
 """DFR Drive and East 60th St are the top entry points, with CRZ entries significantly higher than Excluded Roadway entries. This suggests that these locations have a higher concentration of traffic entering the CRZ area. Besides, excluded Roadway entries are visible at some locations, but they tend to be secondary routes or alternate entries compared to the CRZ."""
 
 # Ensure we have the necessary columns (Vehicle Class, CRZ Entries, Excluded Roadway Entries)
-df_vehicle_category = df[['Toll Date', 'Vehicle Class', 'CRZ Entries', 'Excluded Roadway Entries']]
+# (Weekday is the integer key from prepare_entries, 0: Monday, 6: Sunday)
+df_vehicle_category = df[['Toll Date', 'Weekday', 'Vehicle Class', 'CRZ Entries', 'Excluded Roadway Entries']]
 
-# Convert the 'Toll Date' column to datetime and filter for weekdays (Monday to Friday)
-df_vehicle_category['Toll Date'] = pd.to_datetime(df_vehicle_category['Toll Date'])
-df_vehicle_category['Weekday'] = df_vehicle_category['Toll Date'].dt.weekday  # 0: Monday, 6: Sunday
 
 # Filter for weekdays (Monday to Friday)
 df_weekdays_vehicle_category = df_vehicle_category[df_vehicle_category['Weekday'] < 5]
 
 # Group by 'Vehicle Class' and calculate the total CRZ and Excluded Roadway entries for each category on weekdays
-weekday_entries_by_category = df_weekdays_vehicle_category.groupby('Vehicle Class')[['CRZ Entries', 'Excluded Roadway Entries']].sum().reset_index()
+weekday_entries_by_category = df_weekdays_vehicle_category.groupby('Vehicle Class', observed=True)[['CRZ Entries', 'Excluded Roadway Entries']].sum().reset_index()
 
 # Create an interactive bar chart with Plotly to compare CRZ vs Excluded Roadway entries by Vehicle Category
 fig = px.bar(weekday_entries_by_category,
@@ -623,99 +543,13 @@ fig.show()
 
 # Install Plotly Dash in Colab
 !pip install dash
-!pip install dash-html-components
-!pip install dash-core-components
 
-import dash
-import dash_core_components as dcc
-import dash_html_components as html
-import plotly.express as px
-import pandas as pd
-from dash.dependencies import Input, Output
-
-# Prepare the data (Ensure it's in the correct datetime format)
-df['Toll Date'] = pd.to_datetime(df['Toll Date'])
-df['Toll Hour'] = pd.to_datetime(df['Toll Hour'], format='%m/%d/%Y %I:%M:%S %p')
-
-# Create the app
-app = dash.Dash(__name__)
-
-# Layout for the dashboard
-app.layout = html.Div([
-    # Title of the dashboard
-    html.H1("Vehicle Entries to CRZ and Excluded Roadways", style={'text-align': 'center'}),
-
-    # Dropdown for selecting Date Range
-    dcc.DatePickerRange(
-        id='date-picker-range',
-        start_date='2025-01-05',
-        end_date='2025-01-25',
-        display_format='YYYY-MM-DD',
-        style={'width': '50%', 'margin': 'auto'}
-    ),
-
-    # Dropdown for selecting Vehicle Class
-    dcc.Dropdown(
-        id='vehicle-class-dropdown',
-        options=[
-            {'label': 'All', 'value': 'All'},
-            {'label': 'Class 1 (Cars)', 'value': 'Class 1'},
-            {'label': 'Class 2 (Small Trucks)', 'value': 'Class 2'},
-            {'label': 'Class 3 (Large Trucks)', 'value': 'Class 3'},
-            {'label': 'Class 4 (Buses)', 'value': 'Class 4'},
-            {'label': 'Class 5 (Motorcycles)', 'value': 'Class 5'},
-            {'label': 'TLC Taxis/FHVs', 'value': 'TLC Taxis/FHVs'},
-        ],
-        value='All',
-        style={'width': '50%', 'margin': 'auto'}
-    ),
-
-    # Dropdown for selecting Entry Type
-    dcc.Dropdown(
-        id='entry-type-dropdown',
-        options=[
-            {'label': 'CRZ', 'value': 'CRZ'},
-            {'label': 'Excluded Roadway', 'value': 'Excluded Roadway'}
-        ],
-        value='CRZ',
-        style={'width': '50%', 'margin': 'auto'}
-    ),
-
-    # Graph for showing the hourly entries (interactive)
-    dcc.Graph(id='entry-graph')
-])
+from mta.dashboard import create_app
 
-# Callback to update graph based on dropdown inputs
-@app.callback(
-    Output('entry-graph', 'figure'),
-    [Input('date-picker-range', 'start_date'),
-     Input('date-picker-range', 'end_date'),
-     Input('vehicle-class-dropdown', 'value'),
-     Input('entry-type-dropdown', 'value')]
-)
-def update_graph(start_date, end_date, vehicle_class, entry_type):
-    # Filter data based on the selected date range
-    filtered_df = df[(df['Toll Date'] >= start_date) & (df['Toll Date'] <= end_date)]
-
-    # Filter based on vehicle class
-    if vehicle_class != 'All':
-        filtered_df = filtered_df[filtered_df['Vehicle Class'] == vehicle_class]
-
-    # Create the chart based on the selected Entry Type (CRZ or Excluded Roadway)
-    if entry_type == 'CRZ':
-        fig = px.line(filtered_df,
-                      x=filtered_df['Toll Hour'],
-                      y='CRZ Entries',
-                      title=f'Hourly {entry_type} Entries (Selected Date Range)',
-                      labels={'Toll Hour': 'Hour of Day', 'CRZ Entries': 'Total CRZ Entries'})
-    else:
-        fig = px.line(filtered_df,
-                      x=filtered_df['Toll Hour'],
-                      y='Excluded Roadway Entries',
-                      title=f'Hourly {entry_type} Entries (Selected Date Range)',
-                      labels={'Toll Hour': 'Hour of Day', 'Excluded Roadway Entries': 'Total Excluded Roadway Entries'})
-
-    return fig
+# Create the app (df already has parsed Toll Date / Toll 10 Minute Block from prepare_entries).
+# The callback sums entries per time bucket and downsamples to MTA_DASH_POINTS points,
+# so the figure stays small whatever date range is selected (see mta/timeseries.py).
+app = create_app(df)
 
 if __name__ == '__main__':
     app.run(debug=True, use_reloader=False)  # Disable reloader for Colab
@@ -0,0 +1 @@
+"""Shared data helpers for the Group G CRZ entries dashboard and notebook."""
@@ -0,0 +1,152 @@
+"""Benchmarks for loading, section aggregation and figure building.
+
+Runs every stage of the app against a synthetic MTA export of the requested
+size and records wall time and peak traced memory per case to JSON, so two
+runs (before/after a change, or two machines) can be compared::
+
+    python -m mta.bench --rows 1e6 1e7 --out bench.json
+    python -m mta.bench --rows 1e6 --compare bench.json
+
+Synthetic CSVs (see mta/synthetic.py) are written once under
+``.cache/bench/`` and reused.  Above ``--max-frame-rows`` the in-memory
+cases are skipped and the cube is built by streaming the CSV, so 100M-row
+runs stay within memory.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from mta import charts, maps, synthetic
+from mta.cloud import DEFAULT_OPTIONS, render_png
+from mta.cube import ROWS, EntryCube, aggregate_csv
+from mta.data import CACHE_DIR, TOLL_HOUR_FORMAT, parse_toll_hours, prepare_entries, read_entries_csv
+from mta.timeseries import entry_series
+
+BENCH_DIR = os.path.join(CACHE_DIR, "bench")
+
+
+def synthetic_csv(rows, seed=0):
+    """Path of a synthetic CSV with at least ``rows`` rows, written on first use."""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    days = synthetic.days_for_rows(rows)
+    path = os.path.join(BENCH_DIR, f"synthetic-{days}d-{seed}.csv")
+    if not os.path.exists(path):
+        synthetic.write_csv(path, days=days, seed=seed)
+    return path
+
+
+def measure(fn, repeat=3):
+    """Best and median wall time of ``fn()`` over ``repeat`` runs, plus the peak traced memory of one run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'peak_bytes': peak}
+
+
+def section_cases():
+    """(name, aggregate, build) per dashboard section: the aggregation alone, then the finished output."""
+    cases = [
+        ('section2/wordcloud', lambda c: c.aggregate(['Detection Group'], [ROWS]),
+         lambda c: render_png(charts.detection_counts(c), **DEFAULT_OPTIONS)),
+        ('section4/region', lambda c: c.aggregate(['Detection Region']), charts.region_chart),
+        ('section5/vehicle', lambda c: c.aggregate(['Toll Date', 'Vehicle Class']), charts.vehicle_chart),
+        ('section6/peak', lambda c: c.aggregate(['Toll Date', 'Time Period', 'Detection Group']), charts.peak_chart),
+        ('section6/day_of_week', lambda c: c.aggregate(['Toll Date', 'Day of Week', 'Time Period']), charts.day_of_week_chart),
+        ('section6/daily', lambda c: c.aggregate(['Toll Date', 'Day of Week', 'Time Period']), charts.daily_time_chart),
+        ('section6/time_of_day', lambda c: c.aggregate(['Toll Date', 'Time']), charts.time_of_day_chart),
+        ('section6/over_time', lambda c: c.aggregate(['Toll Date', 'Time']), charts.entries_over_time_chart),
+        ('section7/crz_vs_excluded', lambda c: c.aggregate(['Toll Date'], ['CRZ Entries', 'Excluded Roadway Entries'],
+                                                           start='2025-01-05', end='2025-01-25'),
+         charts.crz_vs_excluded_chart),
+    ]
+    for slug, view in zip(['heatmap', 'markers', 'bubble'], maps.MAP_VIEWS):
+        cases.append((f'section3/{slug}', charts.entry_data, lambda c, view=view: maps.map_html(c, view)))
+    return cases
+
+
+def run(rows, seed=0, repeat=3, max_frame_rows=20_000_000):
+    path = synthetic_csv(rows, seed)
+    results = {}
+
+    def record(name, fn, n=repeat):
+        results[name] = measure(fn, n)
+        print(f"  {name:<36} {results[name]['best_s']:9.4f}s  {results[name]['peak_bytes'] / 1e6:9.1f} MB")
+
+    if rows <= max_frame_rows:
+        raw = read_entries_csv(path)
+        record('load/read_csv', lambda: read_entries_csv(path), 1)
+        record('load/parse_toll_hours', lambda: parse_toll_hours(raw['Toll 10 Minute Block']))
+        record('load/parse_toll_hours_per_row', lambda: pd.to_datetime(raw['Toll 10 Minute Block'].astype(str), format=TOLL_HOUR_FORMAT), 1)
+        record('load/prepare', lambda: prepare_entries(raw.copy()))
+        df = prepare_entries(raw)
+        del raw
+        record('cube/from_frame', lambda: EntryCube.from_frame(df))
+        cube = EntryCube.from_frame(df)
+        record('dash/entry_series_3w', lambda: entry_series(df, '2025-01-05', '2025-01-25'))
+        record('dash/entry_series_all', lambda: entry_series(df, df['Toll Date'].iloc[0], df['Toll Date'].iloc[-1]))
+        del df
+    else:
+        record('cube/aggregate_csv', lambda: aggregate_csv(path, end=None), 1)
+        cube = aggregate_csv(path, end=None)
+
+    for name, aggregate, build in section_cases():
+        record(f'{name}/aggregate', lambda: aggregate(cube))
+        record(f'{name}/build', lambda: build(cube))
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(current, baseline):
+    """Print best-time ratios (current / baseline) for the cases both runs share."""
+    for rows, cases in current['results'].items():
+        base = baseline['results'].get(rows, {})
+        print(f"{rows} rows")
+        for name, result in cases.items():
+            if name in base:
+                ratio = result['best_s'] / base[name]['best_s']
+                print(f"  {name:<36} {base[name]['best_s']:9.4f}s -> {result['best_s']:9.4f}s  x{ratio:5.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", nargs="+", type=float, default=[1e6], help="synthetic row counts to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best and median are kept)")
+    parser.add_argument("--max-frame-rows", type=float, default=2e7,
+                        help="above this size, skip the in-memory cases and stream the CSV into the cube")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    report = {'environment': environment(), 'seed': args.seed, 'results': {}}
+    for rows in map(int, args.rows):
+        print(f"{rows} rows")
+        report['results'][str(rows)] = run(rows, args.seed, args.repeat, int(args.max_frame_rows))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
@@ -0,0 +1,207 @@
+"""Bounded in-process result caches with hit/miss accounting.
+
+Streamlit re-executes ``visualization.py`` on every interaction, but imported
+modules stay loaded for the life of the server process.  Caches registered
+here therefore survive reruns and are shared by every session, so a chart
+built once for a given data version is reused by every later viewer.
+``DiskCache`` adds an optional filesystem tier for values that several
+server processes (e.g. Dash workers) should share; ``TieredCache`` puts an
+``LRUCache`` in front of it.
+"""
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used mapping with a fixed entry budget."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class DiskCache:
+    """Str/bytes values stored one file per key under ``directory``.
+
+    Every process pointing at the same directory shares the entries.  Writes
+    are atomic (temp file + ``os.replace``), a hit refreshes the file's
+    mtime, and once there are more than ``max_entries`` files the least
+    recently used are deleted.  Statistics count this process's lookups.
+    """
+
+    def __init__(self, directory, max_entries=1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode()).hexdigest()[:32])
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(value.encode() if isinstance(value, str) else value)
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self):
+        entries = [entry for entry in os.scandir(self.directory) if not entry.name.endswith(".tmp")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass  # another process evicted it first
+
+    def __len__(self):
+        return sum(1 for entry in os.scandir(self.directory) if not entry.name.endswith(".tmp"))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self),
+            'maxsize': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """An in-process ``LRUCache`` in front of an optional shared ``DiskCache``.
+
+    Values should be str or bytes so they can be written to disk.  Disk hits
+    are promoted into memory (as bytes).
+    """
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is _MISSING and self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self):
+        return {'memory': self.memory.stats(), **({'disk': self.disk.stats()} if self.disk is not None else {})}
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name, maxsize=64):
+    """Return the process-wide cache called ``name``, creating it on first use."""
+    with _registry_lock:
+        cache = _registry.get(name)
+        if cache is None:
+            cache = _registry[name] = LRUCache(maxsize)
+        return cache
+
+
+def memoize(maxsize=64, name=None):
+    """Cache a function's results by its (hashable) arguments.
+
+    The cache is looked up by name, so re-decorating the same function on a
+    Streamlit rerun keeps the existing entries.  Callers are expected to pass
+    the data version as one of the arguments so a new dataset never hits a
+    stale entry.
+    """
+    def decorator(func):
+        cache = get_cache(name or f"{func.__module__}.{func.__qualname__}", maxsize)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Statistics of every registered cache, keyed by cache name."""
+    with _registry_lock:
+        return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,383 @@
+"""Aggregations and Plotly figures for the dashboard sections.
+
+Each builder takes an ``EntryCube`` and returns either the aggregated frame
+a section needs or a finished figure, so the Streamlit app can memoize them
+per data version.  Plotly is imported inside the figure builders, so
+importing this module (e.g. for ``detection_counts``) stays cheap.
+"""
+import pandas as pd
+
+from mta.cube import ROWS
+from mta.data import MEASURES
+from mta.timeseries import add_weekend_shading, entry_figure, entry_series, render_mode
+
+# --- Entry Point Locations ---
+ENTRY_POINTS = {
+    'Brooklyn Bridge': {'lat': 40.70563, 'lon': -73.99635},
+    'Queensboro Bridge': {'lat': 40.759, 'lon': -73.955},
+    'East 60th St': {'lat': 40.76305, 'lon': -73.96818},
+    'Manhattan Bridge': {'lat': 40.7075, 'lon': -73.99077},
+    'Lincoln Tunnel': {'lat': 40.760128, 'lon': -74.003065},
+    'West Side Highway at 60th St': {'lat': 40.7714, 'lon': -73.9905},
+    'Queens Midtown Tunnel': {'lat': 40.7407, 'lon': -73.9588},
+    'Williamsburg Bridge': {'lat': 40.71369, 'lon': -73.97262},
+    'Holland Tunnel': {'lat': 40.727399, 'lon': -74.021338},
+    'Hugh L. Carey Tunnel': {'lat': 40.6958, 'lon': -74.0136},
+}
+
+
+# --- Section 2: Word Cloud of Entry Points ---
+def detection_counts(cube):
+    """Number of rows per Detection Group (same as ``df['Detection Group'].value_counts()``)."""
+    counts = cube.aggregate(['Detection Group'], [ROWS])
+    return dict(zip(counts['Detection Group'].astype(str), counts[ROWS].tolist()))
+
+
+# --- Section 3: Heatmaps of Entry Points ---
+def with_coordinates(totals):
+    """Attach entry point lat/lon to per-Detection Group totals, dropping unknown groups."""
+    coords = pd.DataFrame.from_dict(ENTRY_POINTS, orient='index').rename_axis('Detection Group').reset_index()
+    totals = totals.assign(**{'Detection Group': totals['Detection Group'].astype(str)})
+    return totals.merge(coords, on='Detection Group', how='inner')
+
+
+def entry_data(cube):
+    """Total CRZ entries per Detection Group with the entry point coordinates."""
+    return with_coordinates(cube.aggregate(['Detection Group']))
+
+
+# --- Section 4: Percentage of Entries by Detection Region ---
+def region_chart(cube):
+    import plotly.express as px
+
+    region_data = cube.aggregate(['Detection Region'])
+    region_data['Percentage'] = (region_data['CRZ Entries'] / region_data['CRZ Entries'].sum()) * 100
+    fig = px.bar(
+        region_data,
+        x='Detection Region',
+        y='Percentage',
+        color='Detection Region',
+        title='Percentage of CRZ Entries by Detection Region',
+        labels={'Percentage': 'Percentage of Entries (%)'}
+    )
+
+    fig.update_layout(
+        title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
+        width=1200,
+        height=600,
+        xaxis_title='Detection Region',
+        yaxis_title='Percentage of Entries (%)',
+        template='simple_white',
+        font=dict(family="Arial", size=14, color="black"),
+        showlegend=False
+    )
+    return fig
+
+
+REGION_TABLE_STYLES = [
+    {'selector': 'thead th', 'props': [('background-color', '#0074CC'), ('color', 'white'), ('font-weight', 'bold')]},
+    {'selector': 'tbody td', 'props': [('text-align', 'center'), ('padding', '10px'), ('background-color', '#f9f9f9')]},
+    {'selector': 'tbody tr:nth-child(even)', 'props': [('background-color', '#f1f1f1')]},
+    {'selector': 'tr:hover', 'props': [('background-color', '#ddd')]},
+    {'selector': 'caption', 'props': [('font-size', '1.5em'), ('margin-bottom', '10px'), ('text-align', 'center')]}
+]
+
+
+def region_table(cube):
+    """CRZ entries and their share (rounded %) per Detection Region, largest first."""
+    region_data = cube.aggregate(['Detection Region'])
+    region_data['Percentage'] = ((region_data['CRZ Entries'] / region_data['CRZ Entries'].sum()) * 100).round(0)
+    return region_data.sort_values(by='Percentage', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def region_table_html(cube):
+    """The region table as a styled HTML table, as shown in the notebook."""
+    return region_table(cube).style.set_table_styles(REGION_TABLE_STYLES).hide(axis='index').to_html()
+
+
+# --- Section 5: Average Daily Entries by Vehicle Type ---
+def vehicle_chart(cube):
+    import plotly.express as px
+
+    daily_avg = cube.aggregate(['Toll Date', 'Vehicle Class'])
+    daily_avg = daily_avg.groupby('Vehicle Class', observed=True)['CRZ Entries'].mean().reset_index(name='Average Daily Count')
+    return px.bar(daily_avg, x='Vehicle Class', y='Average Daily Count',
+                  title="Average Daily Number of Entries by Vehicle Type",
+                  color='Vehicle Class')
+
+
+# --- Section 6: Number of Entries by Time ---
+def peak_chart(cube):
+    import plotly.express as px
+
+    daily_avg_detection = cube.aggregate(['Toll Date', 'Time Period', 'Detection Group'])
+    daily_avg_detection = daily_avg_detection.groupby(['Time Period', 'Detection Group'], observed=True)['CRZ Entries'].mean().reset_index()
+    daily_avg_detection = daily_avg_detection.sort_values(by='CRZ Entries', ascending=True)
+    pivot = daily_avg_detection.pivot(index='Detection Group', columns='Time Period', values='CRZ Entries').reset_index()
+    pivot = pivot.sort_values(by='Peak', ascending=False)
+    sorted_detection_groups = pivot['Detection Group'].tolist()
+
+    detection_time_chart = px.bar(
+        daily_avg_detection,
+        x='CRZ Entries',
+        y='Detection Group',
+        color='Time Period',
+        barmode='group',
+        orientation='h',
+        title='Average Daily Entries by Detection Group and Time Period',
+        labels={'CRZ Entries': 'Count of Entries'},
+        category_orders={'Detection Group': sorted_detection_groups, 'Time Period': ['Overnight', 'Peak']}
+    )
+
+    detection_time_chart.update_layout(
+        title=dict(y=0.9, x=0.55, xanchor="center", yanchor="top"),
+        xaxis_title="Entries",
+        yaxis_title="Detection Group",
+        template='simple_white',
+        font=dict(family="Arial", size=14, color="black"),
+        width=1000,
+        height=600
+    )
+    return detection_time_chart
+
+
+def day_of_week_chart(cube):
+    import plotly.express as px
+
+    dow_avg = cube.aggregate(['Toll Date', 'Day of Week', 'Time Period'])
+    dow_avg = dow_avg.groupby(['Day of Week', 'Time Period'], observed=True)['CRZ Entries'].mean().reset_index()
+    dow_avg = dow_avg.sort_values(['Day of Week', 'Time Period'])
+
+    dow_chart = px.bar(
+        dow_avg,
+        x='Day of Week',
+        y='CRZ Entries',
+        color='Time Period',
+        barmode='group',
+        title='Average Daily Entries by Day of Week and Time Period',
+        labels={'CRZ Entries': 'Average Daily Entries', 'Day of Week': 'Day of Week'},
+        category_orders={'Day of Week': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+                         'Time Period': ['Peak', 'Overnight']},
+        color_discrete_sequence=['#EF553B', '#636EFA']
+    )
+
+    dow_chart.update_layout(
+        title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
+        template='simple_white',
+        font=dict(family="Arial", size=14, color="black"),
+        width=1000,
+        height=600,
+        legend_title="Time Period"
+    )
+    return dow_chart
+
+
+def daily_time_chart(cube):
+    import plotly.express as px
+
+    daily_totals = cube.aggregate(['Toll Date', 'Day of Week', 'Time Period'])
+    daily_total = daily_totals.groupby(['Toll Date', 'Day of Week', 'Time Period'], observed=True)['CRZ Entries'].mean().reset_index()
+    daily_total['Toll Date'] = pd.to_datetime(daily_total['Toll Date'])
+
+    time_chart = px.line(
+        daily_total,
+        x='Toll Date',
+        y='CRZ Entries',
+        color='Time Period',
+        title='Average Daily Entries Over Time',
+        labels={'CRZ Entries': 'Total Daily Entries', 'Toll Date': 'Date'},
+        color_discrete_map={'Peak': '#EF553B', 'Overnight': '#636EFA'},
+        render_mode=render_mode(len(daily_total))
+    )
+
+    time_chart.update_layout(
+        title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
+        template='simple_white',
+        font=dict(family="Arial", size=14, color="black"),
+        width=1000,
+        height=500,
+        legend_title="Time Period"
+    )
+    time_chart.update_xaxes(tickmode='auto', nticks=13, tickformat='%m-%d')
+
+    # Add shaded weekends (one band per weekend, see mta/timeseries.py)
+    add_weekend_shading(time_chart, daily_total['Toll Date'])
+    time_chart.add_annotation(
+        xref="paper",
+        yref="paper",
+        x=0.02,
+        y=0.02,
+        text="Gray areas indicate weekends",
+        showarrow=False,
+        font=dict(family="Arial", size=12, color="black"),
+        bgcolor="white",
+        borderwidth=1,
+        borderpad=4,
+        opacity=0.8
+    )
+    time_chart.update_traces(mode='lines+markers', marker=dict(size=6))
+    return time_chart
+
+
+def time_of_day_chart(cube):
+    import plotly.express as px
+
+    time_sums = cube.aggregate(['Toll Date', 'Time'])
+    # 'Time' categories are the slot labels in slot order, so the result is already time-sorted
+    df_avg_entries = time_sums.groupby('Time', observed=True)['CRZ Entries'].mean().reset_index()
+    df_avg_entries['Time'] = df_avg_entries['Time'].astype(str)
+
+    fig = px.line(
+        df_avg_entries,
+        x='Time',
+        y='CRZ Entries',
+        title='CRZ Entries by Time of Day (10-minute increments)',
+        labels={'Time': 'Time of Day (10-minute increments)', 'CRZ Entries': 'Average CRZ Entries'},
+        line_shape='linear',
+        render_mode=render_mode(len(df_avg_entries))
+    )
+
+    # Add commute hour shading
+    fig.add_vrect(x0="06:00", x1="10:00", fillcolor="lightblue", opacity=0.3, line_width=0,
+                  annotation_text="Morning Commute Hours", annotation_position="top left")
+    fig.add_vrect(x0="16:00", x1="20:00", fillcolor="lightblue", opacity=0.3, line_width=0,
+                  annotation_text="Evening Commute Hours", annotation_position="top left")
+
+    fig.update_layout(
+        template='simple_white',
+        title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
+        xaxis_title='Time of Day (10-minute increments)',
+        yaxis_title='Average CRZ Entries',
+        font=dict(family="Arial", size=14, color="black"),
+        width=1200,
+        height=600,
+        hovermode="x unified"
+    )
+    return fig
+
+
+def entries_over_time_chart(cube, resolution=None):
+    """Total CRZ entries over the whole study window, bucketed at ``resolution`` (by span when None)."""
+    dates = cube.aggregate(['Toll Date'], [ROWS])['Toll Date']
+    series, label = entry_series(cube, dates.iloc[0], dates.iloc[-1], resolution=resolution)
+    return entry_figure(series, 'CRZ', label)
+
+
+TIME_VIEWS = {
+    "Peak vs. Off-Peak": peak_chart,
+    "By Day of the Week": day_of_week_chart,
+    "Average Daily Entries Over Time": daily_time_chart,
+    "By Time of Day (10-minute increments)": time_of_day_chart,
+    "Total Entries Over Time": entries_over_time_chart,
+}
+
+
+# --- Section 7: Congestion Relief Zone vs. Excluded Roadway Entries ---
+def crz_vs_excluded_chart(cube, start='2025-01-05', end='2025-01-25'):
+    import plotly.express as px
+
+    # Sum CRZ and Excluded Roadway entries per day for Jan 5 - Jan 25, 2025 (as per your original logic)
+    daily_entries = cube.aggregate(['Toll Date'], MEASURES, start=start, end=end)
+
+    # Create the stacked bar chart
+    fig = px.bar(
+        daily_entries,
+        x='Toll Date',
+        y=['CRZ Entries', 'Excluded Roadway Entries'],
+        title='Daily Entries to CRZ and Excluded Roadways (Jan 5 - Jan 25)',
+        labels={'Toll Date': 'Date', 'value': 'Daily Entries', 'variable': 'Entry Type'},
+        color_discrete_sequence=['#0074CC', '#C1D3F7']
+    )
+
+    # Customize layout
+    fig.update_layout(
+        barmode='stack',
+        xaxis_title='Date',
+        yaxis_title='Daily Entries',
+        template='simple_white',
+        width=1200,
+        height=600,
+        title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
+        yaxis=dict(tickmode='array', tickvals=[0, 200000, 400000, 600000]),
+        font=dict(family="Arial", size=14, color="black")
+    )
+    return fig
+
+
+def daily_crz_share(cube, start='2025-01-05', end='2025-01-25'):
+    """Daily CRZ and Excluded Roadway entries with the CRZ share of their total."""
+    daily_entries = cube.aggregate(['Toll Date'], MEASURES, start=start, end=end)
+    daily_entries['Total Entries'] = daily_entries['CRZ Entries'] + daily_entries['Excluded Roadway Entries']
+    daily_entries['CRZ Percentage'] = (daily_entries['CRZ Entries'] / daily_entries['Total Entries']) * 100
+    return daily_entries
+
+
+def _weekday_totals(cube, keys, measures):
+    """Sums over Monday to Friday for ``keys`` (which must include 'Day of Week')."""
+    totals = cube.aggregate(keys, measures)
+    return totals[~totals['Day of Week'].isin(['Saturday', 'Sunday'])]
+
+
+def crossing_point_entries(cube):
+    """Average weekday CRZ and Excluded Roadway entries per row, by crossing point (Detection Group)."""
+    totals = _weekday_totals(cube, ['Day of Week', 'Detection Group'], [*MEASURES, ROWS])
+    totals = totals.groupby('Detection Group', observed=True)[[*MEASURES, ROWS]].sum()
+    return totals[MEASURES].div(totals[ROWS], axis=0).reset_index()
+
+
+def crossing_point_box(cube):
+    """Box plot statistics of daily weekday entries per crossing point and entry type.
+
+    The notebook melts the weekday rows into ``Entry Type``/``Entries`` for a
+    box plot; this gives the same box per crossing point and entry type, over
+    daily totals, as min/quartiles/max.
+    """
+    daily = _weekday_totals(cube, ['Toll Date', 'Day of Week', 'Detection Group'], MEASURES)
+    melted = pd.melt(daily, id_vars=['Detection Group'], value_vars=MEASURES, var_name='Entry Type', value_name='Entries')
+    grouped = melted.groupby(['Detection Group', 'Entry Type'], observed=True)['Entries']
+    box = grouped.quantile([0, 0.25, 0.5, 0.75, 1]).unstack()
+    box.columns = ['min', 'q1', 'median', 'q3', 'max']
+    return box.join(grouped.mean().rename('mean')).reset_index()
+
+
+def crossing_point_chart(cube):
+    import plotly.express as px
+
+    avg_entries_by_crossing = crossing_point_entries(cube)
+    fig = px.bar(avg_entries_by_crossing,
+                 x='Detection Group',
+                 y=MEASURES,
+                 title='Average Weekday Vehicle Entries to CRZ and Excluded Roadways by Crossing Point',
+                 labels={'Detection Group': 'Crossing Point', 'value': 'Average Vehicle Entries', 'variable': 'Entry Type'},
+                 color_discrete_sequence=['#0074CC', '#C1D3F7'])
+
+    fig.update_layout(
+        barmode='stack',
+        xaxis_title='Crossing Point',
+        yaxis_title='Average Vehicle Entries',
+        font=dict(family="Arial", size=14, color="black"),
+        hovermode="x unified"
+    )
+    return fig
+
+
+def vehicle_category_chart(cube):
+    import plotly.express as px
+
+    weekday_entries_by_category = _weekday_totals(cube, ['Day of Week', 'Vehicle Class'], MEASURES)
+    weekday_entries_by_category = weekday_entries_by_category.groupby('Vehicle Class', observed=True)[MEASURES].sum().reset_index()
+    fig = px.bar(weekday_entries_by_category,
+                 x='Vehicle Class',
+                 y=MEASURES,
+                 title='Weekday CRZ vs. Excluded Roadway Entries by Vehicle Category',
+                 labels={'Vehicle Class': 'Vehicle Category', 'value': 'Total Entries', 'variable': 'Entry Type'},
+                 color_discrete_sequence=['#0074CC', '#C1D3F7'])
+
+    fig.update_layout(
+        barmode='group',
+        xaxis_title='Vehicle Category',
+        yaxis_title='Total Entries',
+        font=dict(family="Arial", size=14, color="black"),
+        hovermode="x unified"
+    )
+    return fig
@@ -0,0 +1,59 @@
+"""Word cloud of entry points, rendered once and cached as PNG bytes.
+
+The WordCloud layout is the slowest thing on the page, and its input (the
+Detection Group frequency table) only changes with the data.  Images are
+cached in memory and under ``.cache/wordcloud/``, keyed by a hash of the
+frequencies and the render options; the directory keeps the
+``CLOUD_ENTRIES`` most recently used images.
+"""
+import hashlib
+import io
+import json
+import os
+
+from mta.cache import DiskCache, TieredCache, get_cache
+from mta.data import CACHE_DIR
+from mta.trace import traced
+
+CLOUD_DIR = os.path.join(CACHE_DIR, "wordcloud")
+CLOUD_ENTRIES = 64
+DEFAULT_OPTIONS = {'width': 800, 'height': 400, 'colormap': "Blues"}
+
+_cache = None
+
+
+def _png_cache():
+    """The memory and disk tiers, created on first use so importing this module writes nothing."""
+    global _cache
+    if _cache is None:
+        _cache = TieredCache(get_cache("wordcloud_png", maxsize=16), DiskCache(CLOUD_DIR, max_entries=CLOUD_ENTRIES))
+    return _cache
+
+
+def cloud_key(frequencies, options):
+    payload = json.dumps([sorted((str(k), int(v)) for k, v in frequencies.items()), sorted(options.items())])
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+@traced("wordcloud.render")
+def render_png(frequencies, **options):
+    """Lay out the word cloud and encode it as PNG, bypassing matplotlib."""
+    # Imported here: wordcloud pulls in matplotlib, which cached renders never need
+    from wordcloud import WordCloud
+
+    image = WordCloud(**options).generate_from_frequencies(frequencies).to_image()
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def wordcloud_png(frequencies, **options):
+    """PNG bytes of the word cloud for ``frequencies``, from cache when possible."""
+    options = {**DEFAULT_OPTIONS, **options}
+    key = cloud_key(frequencies, options)
+    cache = _png_cache()
+    png = cache.get(key)
+    if png is None:
+        png = render_png(frequencies, **options)
+        cache.set(key, png)
+    return png
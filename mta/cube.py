@@ -0,0 +1,394 @@
+"""Dense aggregate cube of CRZ entries.
+
+Every chart in the dashboard is a sum over some subset of
+(date, 10-minute slot, detection group, vehicle class, time period),
+sometimes followed by a mean over the result.  ``EntryCube`` scatters the
+raw rows into one dense ndarray per measure once at load; after that each
+chart is a handful of axis reductions whose cost depends on the cube size,
+not on the number of rows.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from mta.data import CUTOFF_DATE, MEASURES, SLOTS_PER_DAY, WEEKDAY_NAMES, day_dates, slot_labels, stream_entries
+from mta.trace import span, traced
+
+# Row count per cell, so empty cells can be told apart from cells that sum to 0
+ROWS = 'Rows'
+
+_AXES = ['Toll Date', 'Time', 'Detection Group', 'Vehicle Class', 'Time Period']
+KEYS = [*_AXES, 'Day of Week', 'Detection Region']
+
+
+# Output order of Day of Week (alphabetical, as a pandas groupby sorts it),
+# and the position of each Weekday key (0 = Monday) in that order
+WEEKDAYS = sorted(WEEKDAY_NAMES)
+_WEEKDAY_CODES = np.searchsorted(WEEKDAYS, WEEKDAY_NAMES)
+
+
+def _observed(col):
+    """Sorted labels that actually occur in ``col``."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.cat.remove_unused_categories()
+        return [str(c) for c in col.cat.categories]
+    return sorted(str(c) for c in col.dropna().unique())
+
+
+def _codes(col, labels):
+    """Positions of ``col``'s values in the sorted ``labels``, without materializing strings per row."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        lookup = np.searchsorted(labels, [str(c) for c in col.cat.categories])
+        return lookup[col.cat.codes.to_numpy()]
+    return np.searchsorted(labels, col.astype(str).to_numpy())
+
+
+def _recode(period, old, new):
+    """Per-block period codes into ``old`` re-expressed as codes into ``new`` (-1, no rows, stays -1)."""
+    lookup = np.append(np.searchsorted(new, old), -1).astype(np.int8)
+    return lookup[period]
+
+
+def _indicator(codes, n_out):
+    """One-hot matrix mapping each input position to its output code."""
+    matrix = np.zeros((len(codes), n_out), dtype=np.int64)
+    matrix[np.arange(len(codes)), codes] = 1
+    return matrix
+
+
+class EntryCube:
+    """Dense sums of the entry measures over date, slot, detection group and vehicle class.
+
+    ``data`` has shape ``(len(measures), days, 144, groups, classes)``; the
+    last measure is always the row count ``ROWS``.  Time Period is a function
+    of the toll time, so it is kept as one code into ``periods`` per (day,
+    slot) in ``period`` (-1 for a block with no rows) rather than as an axis,
+    and the cube has one cell per row of the export.  Rows can be folded in
+    incrementally with ``add``; every axis grows as new dates or labels appear.
+    """
+
+    def __init__(self, data, dates, groups, classes, periods, group_region, measures=MEASURES, version=None,
+                 period=None):
+        self.data = data
+        self.period = np.full(data.shape[1:3], -1, dtype=np.int8) if period is None else period
+        self.dates = pd.DatetimeIndex(dates)
+        self.groups = list(groups)
+        self.classes = list(classes)
+        self.periods = list(periods)
+        self.group_region = dict(group_region)
+        self.weekdays = WEEKDAYS
+        self.measures = [*measures, ROWS]
+        self.version = version
+
+    @property
+    def regions(self):
+        return sorted(set(self.group_region.values()))
+
+    @classmethod
+    def empty(cls, measures=MEASURES):
+        data = np.zeros((len(measures) + 1, 0, SLOTS_PER_DAY, 0, 0), dtype=np.int32)
+        return cls(data, [], [], [], [], {}, measures)
+
+    @classmethod
+    def from_frame(cls, df, measures=MEASURES):
+        """Build the cube from a prepared entries frame (see ``mta.data.prepare_entries``)."""
+        return cls.empty(measures).add(df)
+
+    @classmethod
+    def from_chunks(cls, chunks, measures=MEASURES):
+        """Build the cube by folding in an iterable of prepared frames one at a time."""
+        cube = cls.empty(measures)
+        for chunk in chunks:
+            cube.add(chunk)
+        return cube
+
+    def _regrid(self, axis, positions, size):
+        """Reallocate ``data`` with ``size`` cells on ``axis``, old cells moved to ``positions``."""
+        shape = list(self.data.shape)
+        shape[axis] = size
+        data = np.zeros(shape, dtype=self.data.dtype)
+        index = (slice(None),) * axis + (np.asarray(positions, dtype=np.intp),)
+        data[index] = self.data
+        self.data = data
+
+    def _extend_dates(self, first, last):
+        if len(self.dates):
+            first = min(first, self.dates[0])
+            last = max(last, self.dates[-1])
+            if first == self.dates[0] and last == self.dates[-1]:
+                return
+        dates = pd.date_range(first, last, freq='D')
+        offset = dates.searchsorted(self.dates[0]) if len(self.dates) else 0
+        positions = np.arange(len(self.dates)) + offset
+        self._regrid(1, positions, len(dates))
+        period = np.full((len(dates), SLOTS_PER_DAY), -1, dtype=np.int8)
+        period[positions] = self.period
+        self.period = period
+        self.dates = dates
+
+    def _extend_labels(self, attr, axis, labels):
+        old = getattr(self, attr)
+        if set(labels) <= set(old):
+            return
+        merged = sorted(set(old) | set(labels))
+        self._regrid(axis, np.searchsorted(merged, old), len(merged))
+        setattr(self, attr, merged)
+
+    def _extend_periods(self, labels):
+        if set(labels) <= set(self.periods):
+            return
+        merged = sorted(set(self.periods) | set(labels))
+        self.period = _recode(self.period, self.periods, merged)
+        self.periods = merged
+
+    @traced("cube.add")
+    def add(self, df, replace=False):
+        """Fold the rows of a prepared entries frame into the cube and return it.
+
+        With ``replace=True`` every 10-minute block present in ``df`` is
+        cleared first, so re-delivering or revising a block overwrites it
+        instead of double counting.  Blocks must be delivered whole (all
+        detection groups and vehicle classes for that toll time).  Raises
+        ValueError if a block would end up with rows in two time periods.
+        """
+        if df.empty:
+            return self
+        day = df['Day Index'].to_numpy()
+        first, last = day_dates([day.min(), day.max()])
+        self._extend_dates(first, last)
+        self._extend_labels('groups', 3, _observed(df['Detection Group']))
+        self._extend_labels('classes', 4, _observed(df['Vehicle Class']))
+        self._extend_periods(_observed(df['Time Period']))
+        pairs = df[['Detection Group', 'Detection Region']].drop_duplicates()
+        self.group_region.update(zip(pairs['Detection Group'].astype(str), pairs['Detection Region'].astype(str)))
+
+        # Scatter into the block of days this frame covers only
+        window = self.date_slice(first, last)
+        shape = (window.stop - window.start, *self.data.shape[2:])
+        codes = [
+            day - day.min(),
+            df['Slot'].to_numpy(),
+            _codes(df['Detection Group'], self.groups),
+            _codes(df['Vehicle Class'], self.classes),
+        ]
+        flat = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+
+        # One time period per 10-minute block, checked against the batch and the cube
+        blocks = codes[0] * SLOTS_PER_DAY + codes[1]
+        touched, first_row, inverse = np.unique(blocks, return_index=True, return_inverse=True)
+        period = _codes(df['Time Period'], self.periods).astype(np.int8)
+        if (period != period[first_row][inverse]).any():
+            raise ValueError("Time Period varies within a 10-minute block")
+        touched_days, touched_slots = touched // SLOTS_PER_DAY, touched % SLOTS_PER_DAY
+
+        block = self.data[:, window]
+        periods = self.period[window]
+        if replace:
+            block[:, touched_days, touched_slots] = 0
+            periods[touched_days, touched_slots] = -1
+        current = periods[touched_days, touched_slots]
+        if ((current >= 0) & (current != period[first_row])).any():
+            raise ValueError("Time Period of a 10-minute block differs from the one already in the cube")
+        periods[touched_days, touched_slots] = period[first_row]
+        for i, measure in enumerate(self.measures[:-1]):
+            sums = np.bincount(flat, weights=df[measure].to_numpy(dtype=np.float64), minlength=size)
+            block[i] += sums.astype(np.int64).reshape(shape).astype(block.dtype)
+        block[-1] += np.bincount(flat, minlength=size).reshape(shape).astype(block.dtype)
+        return self
+
+    def merge(self, other):
+        """Add another cube's sums into this one and return it.
+
+        Axes are aligned by label first, so partial cubes built from disjoint
+        (or overlapping) slices of the rows can be merged in any order; the
+        sums are integers, so the result is identical to building one cube
+        from all the rows.
+        """
+        if other.measures != self.measures:
+            raise ValueError(f"Cannot merge cubes with measures {other.measures} and {self.measures}")
+        if not len(other.dates):
+            return self
+        self._extend_dates(other.dates[0], other.dates[-1])
+        self._extend_labels('groups', 3, other.groups)
+        self._extend_labels('classes', 4, other.classes)
+        self._extend_periods(other.periods)
+        self.group_region.update(other.group_region)
+
+        window = self.date_slice(other.dates[0], other.dates[-1])
+        periods = self.period[window]
+        incoming = _recode(other.period, other.periods, self.periods)
+        if ((periods >= 0) & (incoming >= 0) & (periods != incoming)).any():
+            raise ValueError("Cannot merge cubes that disagree on the Time Period of a 10-minute block")
+        np.copyto(periods, incoming, where=incoming >= 0)
+
+        block = self.data[:, window]
+        positions = [
+            np.searchsorted(self.groups, other.groups),
+            np.searchsorted(self.classes, other.classes),
+        ]
+        if all(len(pos) == size for pos, size in zip(positions, block.shape[3:])):
+            block += other.data
+        else:
+            block[np.ix_(*(np.arange(n) for n in block.shape[:3]), *positions)] += other.data
+        return self
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    @property
+    def last_toll_date(self):
+        """Latest date with any rows, or None for an empty cube."""
+        if not len(self.dates):
+            return None
+        filled = np.flatnonzero((self.period >= 0).any(axis=1))
+        return self.dates[filled[-1]] if len(filled) else None
+
+    def save(self, path):
+        """Write the cube to ``path`` (.npz) atomically."""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                data=self.data,
+                period=self.period,
+                dates=self.dates.to_numpy(dtype='datetime64[D]'),
+                groups=np.array(self.groups, dtype=str),
+                classes=np.array(self.classes, dtype=str),
+                periods=np.array(self.periods, dtype=str),
+                region_groups=np.array(list(self.group_region), dtype=str),
+                regions=np.array(list(self.group_region.values()), dtype=str),
+                measures=np.array(self.measures[:-1], dtype=str),
+                version=np.array(self.version or "", dtype=str),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(
+                f['data'],
+                pd.DatetimeIndex(f['dates']),
+                f['groups'].tolist(),
+                f['classes'].tolist(),
+                f['periods'].tolist(),
+                dict(zip(f['region_groups'].tolist(), f['regions'].tolist())),
+                f['measures'].tolist(),
+                str(f['version']) or None,
+                f['period'],
+            )
+
+    @staticmethod
+    def stored_version(path):
+        """Version of a saved cube without loading its data."""
+        with np.load(path) as f:
+            return str(f['version']) or None
+
+    def date_slice(self, start=None, end=None):
+        """Positions of the inclusive [start, end] date window on the date axis."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start).normalize(), side='left')
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end).normalize(), side='right')
+        return slice(lo, hi)
+
+    def between(self, start=None, end=None):
+        """The cube restricted to the inclusive [start, end] date window; shares ``data``."""
+        window = self.date_slice(start, end)
+        return EntryCube(self.data[:, window], self.dates[window], self.groups, self.classes, self.periods,
+                         self.group_region, self.measures[:-1], self.version, self.period[window])
+
+    def aggregate(self, keys, measures=('CRZ Entries',), start=None, end=None):
+        """Equivalent of ``df.groupby(keys, observed=True)[measures].sum().reset_index()``.
+
+        ``keys`` may be any of Toll Date, Day of Week, Time, Detection Group,
+        Detection Region, Vehicle Class and Time Period.  ``start``/``end``
+        restrict the inclusive date window.
+        """
+        with span("cube.aggregate", keys=", ".join(keys)):
+            return self._aggregate(list(keys), list(measures), start, end)
+
+    def _aggregate(self, keys, measures, start, end):
+        unknown = [k for k in keys if k not in KEYS]
+        if unknown:
+            raise KeyError(f"Cannot aggregate the cube by {unknown}")
+
+        window = self.date_slice(start, end)
+        arr = self.data[:, window]
+        period = self.period[window]
+        dates = self.dates[window]
+
+        weekday_codes = _WEEKDAY_CODES[dates.dayofweek]
+        group_region_codes = np.searchsorted(self.regions, [self.group_region[g] for g in self.groups])
+
+        # Labels of each output axis, plus columns derived from a kept axis
+        axis_labels = [
+            ('Toll Date', dates),
+            ('Time', slot_labels()),
+            ('Detection Group', self.groups),
+            ('Vehicle Class', self.classes),
+            ('Time Period', self.periods),
+        ]
+        derived = {}
+        if 'Day of Week' in keys:
+            if 'Toll Date' in keys:
+                derived['Day of Week'] = (0, np.asarray(self.weekdays)[weekday_codes])
+            else:
+                axis_labels[0] = ('Day of Week', self.weekdays)
+        if 'Detection Region' in keys:
+            if 'Detection Group' in keys:
+                derived['Detection Region'] = (2, np.asarray(self.regions)[group_region_codes])
+            else:
+                axis_labels[2] = ('Detection Region', self.regions)
+
+        # One pass over the cube for every dropped axis, then roll up the small remainder
+        kept = [axis for axis, (name, _) in enumerate(axis_labels) if name in keys]
+        if 'Time Period' in keys:
+            # Spread each (day, slot) onto its period's position of a trailing axis
+            onehot = (period[:, :, None] == np.arange(len(self.periods))).astype(np.int64)
+            arr = np.einsum('mdsgc,dsp->m' + ''.join('dsgcp'[axis] for axis in kept), arr, onehot)
+            arr = arr.reshape([arr.shape[0], *(arr.shape[1 + kept.index(a)] if a in kept else 1 for a in range(5))])
+        else:
+            dropped = tuple(axis + 1 for axis in range(len(_AXES) - 1) if axis not in kept)
+            arr = arr.sum(axis=dropped, dtype=np.int64, keepdims=True)[..., np.newaxis]
+        for axis in kept:
+            name = axis_labels[axis][0]
+            if name == 'Day of Week':
+                matrix = _indicator(weekday_codes, len(self.weekdays))
+            elif name == 'Detection Region':
+                matrix = _indicator(group_region_codes, len(self.regions))
+            else:
+                continue
+            arr = np.moveaxis(np.tensordot(arr, matrix, axes=([axis + 1], [0])), -1, axis + 1)
+        arr = arr.reshape(arr.shape[0], -1)
+        observed = arr[-1] > 0
+        if not kept:
+            return pd.DataFrame({m: arr[self.measures.index(m)] for m in measures})
+        positions = np.indices([len(axis_labels[a][1]) for a in kept]).reshape(len(kept), -1)[:, observed]
+
+        out = {}
+        for pos, axis in zip(positions, kept):
+            name, labels = axis_labels[axis]
+            if name == 'Toll Date':
+                out[name] = labels[pos]
+            else:
+                out[name] = pd.Categorical.from_codes(pos, categories=labels)
+            for extra, (src_axis, mapped) in derived.items():
+                if src_axis == axis:
+                    values = mapped[pos]
+                    categories = self.weekdays if extra == 'Day of Week' else self.regions
+                    out[extra] = pd.Categorical(values, categories=categories)
+        for measure in measures:
+            out[measure] = arr[self.measures.index(measure), observed]
+
+        result = pd.DataFrame(out)
+        return result[keys + measures].sort_values(keys, kind='stable').reset_index(drop=True)
+
+
+def aggregate_csv(source, chunksize=500_000, start=None, end=CUTOFF_DATE, filters=None):
+    """Stream a raw MTA CSV into an ``EntryCube`` chunk by chunk.
+
+    Peak memory is one chunk plus the cube, however large the file is.  See
+    ``mta.data.stream_entries`` for the date window and filter arguments.
+    """
+    return EntryCube.from_chunks(stream_entries(source, chunksize, start=start, end=end, filters=filters))
@@ -0,0 +1,288 @@
+"""Plotly Dash dashboard of entries over a selected date range.
+
+The notebook builds this app around its own frame; ``python -m mta.dashboard``
+serves it from the local snapshot.  ``update_graph`` sends the browser one
+point per time bucket (see mta/timeseries.py) rather than every raw row.
+Zooming or panning the graph re-buckets the visible window, so the
+resolution steps from daily to hourly to 10-minute as the view narrows.
+
+Finished figures are cached as JSON, keyed by the data version and the
+normalized inputs, in an LRU of ``MTA_DASH_CACHE_SIZE`` entries; set
+``MTA_DASH_CACHE_DIR`` to also share them between worker processes through
+the filesystem.  Popular views are then served without touching the frame.
+Hit rates and evictions are at ``/_cache_stats``.
+
+``MTA_DASH_MODE=client`` instead ships one pre-aggregated payload (hourly
+totals per vehicle class, see ``entry_payload``) to the browser in a
+``dcc.Store`` and filters, buckets and plots it in a clientside callback,
+so interactions never reach the server.
+
+Given a ``PartitionedEntries`` dataset (mta/dataset.py) instead of a frame,
+each date-picker window reads only its own partitions and columns;
+``MTA_INGEST=partitioned python -m mta.dashboard`` serves it that way.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+from dash import Dash, Input, Output, ctx, dcc, html
+
+from mta.cache import DiskCache, TieredCache, get_cache
+from mta.timeseries import (
+    BUCKETS, ENTRY_COLUMNS, MAX_POINTS, MAX_SHAPES, WEBGL_POINTS, WEEKEND_FILL, entry_figure, entry_payload,
+    entry_series, visible_range,
+)
+
+POINT_BUDGET = int(os.environ.get("MTA_DASH_POINTS", MAX_POINTS))
+FIGURE_CACHE_SIZE = int(os.environ.get("MTA_DASH_CACHE_SIZE", "256"))
+FIGURE_CACHE_DIR = os.environ.get("MTA_DASH_CACHE_DIR")
+DASH_MODE = os.environ.get("MTA_DASH_MODE", "server")
+PAYLOAD_STEP = os.environ.get("MTA_DASH_STEP", "h")
+
+# Dropdown labels for the Vehicle Class values in the export
+VEHICLE_CLASS_LABELS = {
+    '1 - Cars, Pickups and Vans': 'Class 1 (Cars)',
+    '2 - Single-Unit Trucks': 'Class 2 (Small Trucks)',
+    '3 - Multi-Unit Trucks': 'Class 3 (Large Trucks)',
+    '4 - Buses': 'Class 4 (Buses)',
+    '5 - Motorcycles': 'Class 5 (Motorcycles)',
+    'TLC Taxi/FHV': 'TLC Taxis/FHVs',
+}
+
+# Browser-side equivalent of update_graph over an entry_payload: sums the
+# window's buckets for the class, re-buckets to the width BUCKETS picks for
+# the span and draws it like entry_figure (WebGL and merged weekend bands).
+_CLIENT_FIGURE_JS = """
+function (startDate, endDate, vehicleClass, entryType, relayout, payload) {
+    const C = __CONSTANTS__;
+    const DAY = 86400000;
+    if (!payload || !startDate || !endDate) {
+        return window.dash_clientside.no_update;
+    }
+    // Decode each entry type once per payload
+    const memo = (window._mtaEntries = window._mtaEntries || {});
+    if (memo.payload !== payload) {
+        memo.payload = payload;
+        memo.columns = {};
+    }
+    if (!memo.columns[entryType]) {
+        const bytes = Uint8Array.from(atob(payload.columns[entryType]), c => c.charCodeAt(0));
+        memo.columns[entryType] = new Int32Array(bytes.buffer);
+    }
+    const values = memo.columns[entryType];
+
+    let start = Date.parse(startDate.slice(0, 10));
+    let end = Date.parse(endDate.slice(0, 10)) + DAY;
+    // A zoom or pan narrows the window to the visible days
+    const ctx = window.dash_clientside.callback_context;
+    if (ctx && ctx.triggered.length && ctx.triggered[0].prop_id === 'entry-graph.relayoutData'
+            && relayout && relayout['xaxis.range[0]'] !== undefined) {
+        const day = s => Math.floor(Date.parse(String(s).slice(0, 10)) / DAY) * DAY;
+        const lo = Math.max(start, day(relayout['xaxis.range[0]']));
+        const hi = Math.min(end, day(relayout['xaxis.range[1]']) + DAY);
+        if (lo < hi) {
+            start = lo;
+            end = hi;
+        }
+    }
+
+    let [, width, label] = C.buckets.find(([longest]) => longest === null || end - start <= longest);
+    if (width < payload.step) {
+        [, width, label] = C.buckets.find(([, w]) => w === payload.step);
+    }
+    const nOut = Math.ceil((end - start) / width);
+    const totals = new Float64Array(nOut);
+    const present = new Uint8Array(nOut);
+    const lo = Math.max(0, Math.ceil((start - payload.start) / payload.step));
+    const hi = Math.min(payload.n, Math.ceil((end - payload.start) / payload.step));
+    const rows = vehicleClass === 'All' ? payload.classes.map((_, i) => i) : [payload.classes.indexOf(vehicleClass)];
+    for (const row of rows) {
+        if (row < 0) {
+            continue;
+        }
+        const base = row * payload.n;
+        for (let i = lo; i < hi; i++) {
+            const b = Math.floor((payload.start + i * payload.step - start) / width);
+            totals[b] += values[base + i];
+            present[b] = 1;
+        }
+    }
+    const x = [], y = [];
+    for (let b = 0; b < nOut; b++) {
+        if (present[b]) {
+            x.push(start + b * width);
+            y.push(totals[b]);
+        }
+    }
+
+    // Weekend bands: runs of consecutive Saturdays and Sundays among the plotted days
+    const bands = [];
+    let last = null;
+    for (const t of x) {
+        const d = Math.floor(t / DAY) * DAY;
+        const weekday = new Date(d).getUTCDay();
+        if ((weekday !== 0 && weekday !== 6) || d === last) {
+            continue;
+        }
+        if (bands.length && bands[bands.length - 1][1] === d) {
+            bands[bands.length - 1][1] = d + DAY;
+        } else {
+            bands.push([d, d + DAY]);
+        }
+        last = d;
+    }
+    const column = C.columns[entryType];
+    const data = [{type: x.length > C.webglPoints ? 'scattergl' : 'scatter', mode: 'lines', x: x, y: y,
+                   name: column, line: {color: '#636efa'}}];
+    const layout = {
+        title: {text: label + ' ' + entryType + ' Entries (Selected Date Range)'},
+        xaxis: {title: {text: 'Hour of Day'}, type: 'date'},
+        yaxis: {title: {text: 'Total ' + column}},
+        showlegend: false,
+        shapes: [],
+    };
+    if (bands.length <= C.maxShapes) {
+        layout.shapes = bands.map(([x0, x1]) => ({type: 'rect', x0: x0, x1: x1, y0: 0, y1: 1, yref: 'paper',
+            fillcolor: 'lightgray', opacity: 0.3, layer: 'below', line: {width: 0}}));
+    } else {
+        const top = y.reduce((a, b) => Math.max(a, b), 1);
+        const bx = [], by = [];
+        for (const [x0, x1] of bands) {
+            bx.push(x0, x0, x1, x1, null);
+            by.push(0, top, top, 0, null);
+        }
+        data.unshift({type: 'scatter', x: bx, y: by, fill: 'toself', fillcolor: C.weekendFill, mode: 'none',
+                      hoverinfo: 'skip', showlegend: false, name: 'Weekend'});
+    }
+    return {data: data, layout: layout};
+}
+"""
+
+
+def client_figure_js():
+    """The clientside callback source with this module's bucket and drawing constants filled in."""
+    constants = {
+        'buckets': [[None if longest is None else longest // pd.Timedelta(milliseconds=1),
+                     width // pd.Timedelta(milliseconds=1), label] for longest, width, label in BUCKETS],
+        'columns': ENTRY_COLUMNS,
+        'webglPoints': WEBGL_POINTS,
+        'maxShapes': MAX_SHAPES,
+        'weekendFill': WEEKEND_FILL,
+    }
+    return _CLIENT_FIGURE_JS.replace("__CONSTANTS__", json.dumps(constants))
+
+
+def frame_version(df):
+    """Fingerprint of the columns the graph reads, for frames without a data version."""
+    columns = ['Toll 10 Minute Block', 'Vehicle Class', *ENTRY_COLUMNS.values()]
+    hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+def vehicle_classes(df):
+    if hasattr(df, 'date_window'):
+        return df.distinct('Vehicle Class')
+    return sorted(df['Vehicle Class'].unique().astype(str))
+
+
+def vehicle_class_options(df):
+    return [{'label': 'All', 'value': 'All'},
+            *({'label': VEHICLE_CLASS_LABELS.get(c, c), 'value': c} for c in vehicle_classes(df))]
+
+
+def figure_cache(maxsize=FIGURE_CACHE_SIZE, directory=FIGURE_CACHE_DIR):
+    return TieredCache(get_cache("dash_figures", maxsize), DiskCache(directory) if directory else None)
+
+
+def create_app(df, max_points=POINT_BUDGET, version=None, cache=None, mode=DASH_MODE, step=PAYLOAD_STEP):
+    app = Dash(__name__)
+
+    # Layout for the dashboard
+    app.layout = html.Div([
+        # Title of the dashboard
+        html.H1("Vehicle Entries to CRZ and Excluded Roadways", style={'text-align': 'center'}),
+
+        # Dropdown for selecting Date Range
+        dcc.DatePickerRange(
+            id='date-picker-range',
+            start_date='2025-01-05',
+            end_date='2025-01-25',
+            display_format='YYYY-MM-DD',
+            style={'width': '50%', 'margin': 'auto'}
+        ),
+
+        # Dropdown for selecting Vehicle Class
+        dcc.Dropdown(
+            id='vehicle-class-dropdown',
+            options=vehicle_class_options(df),
+            value='All',
+            style={'width': '50%', 'margin': 'auto'}
+        ),
+
+        # Dropdown for selecting Entry Type
+        dcc.Dropdown(
+            id='entry-type-dropdown',
+            options=list(ENTRY_COLUMNS),
+            value='CRZ',
+            style={'width': '50%', 'margin': 'auto'}
+        ),
+
+        # Graph for showing the entries (interactive)
+        dcc.Graph(id='entry-graph')
+    ])
+
+    inputs = [Input('date-picker-range', 'start_date'),
+              Input('date-picker-range', 'end_date'),
+              Input('vehicle-class-dropdown', 'value'),
+              Input('entry-type-dropdown', 'value'),
+              Input('entry-graph', 'relayoutData')]
+
+    if mode == 'client':
+        # Sent once with the layout; every later interaction is handled in the browser
+        if hasattr(df, 'date_window'):
+            df = df.window(columns=['Vehicle Class', *ENTRY_COLUMNS.values()])
+        app.layout.children.append(dcc.Store(id='entry-payload', data=entry_payload(df, step)))
+        app.clientside_callback(client_figure_js(), Output('entry-graph', 'figure'),
+                                [*inputs, Input('entry-payload', 'data')])
+        return app
+    if mode != 'server':
+        raise ValueError(f"Unknown dashboard mode {mode!r}; use 'server' or 'client'")
+
+    version = version or getattr(df, 'version', None) or frame_version(df)
+    cache = cache or figure_cache()
+    app.figure_cache = cache
+
+    # Callback to update graph based on dropdown inputs
+    @app.callback(Output('entry-graph', 'figure'), inputs)
+    def update_graph(start_date, end_date, vehicle_class, entry_type, relayout):
+        # A zoom or pan narrows the window; any other change starts from the picked range
+        if ctx.triggered_id == 'entry-graph':
+            start_date, end_date = visible_range(relayout, start_date, end_date)
+        start, end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+        key = (version, start.date().isoformat(), end.date().isoformat(), vehicle_class, entry_type, max_points)
+        figure = cache.get(key)
+        if figure is None:
+            series, label = entry_series(df, start, end, vehicle_class, entry_type, max_points)
+            figure = entry_figure(series, entry_type, label).to_json()
+            cache.set(key, figure)
+        return json.loads(figure)
+
+    @app.server.route("/_cache_stats")
+    def cache_stats():
+        return cache.stats()
+
+    return app
+
+
+if __name__ == '__main__':
+    from mta.data import DATA_SOURCE, data_version, read_snapshot
+
+    version = data_version(DATA_SOURCE)
+    if os.environ.get("MTA_INGEST") == "partitioned":
+        from mta.dataset import PartitionedEntries
+
+        entries = PartitionedEntries.from_version(version)
+    else:
+        entries = read_snapshot(version)
+    create_app(entries, version=version).run(debug=True)
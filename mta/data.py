@@ -0,0 +1,373 @@
+"""Loading the MTA CRZ entries dataset.
+
+The raw CSV is parsed once per data version and materialized into a local
+Parquet snapshot under ``.cache/``.  Every later load (each Streamlit rerun,
+each notebook run) reads the snapshot instead of re-downloading and
+re-parsing the CSV.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from mta.trace import traced
+
+DATA_URL = "https://raw.githubusercontent.com/QMSS-G5063-2025/Group_G_ManhattanCRZ/main/MTA_Entries.csv"
+# Point the app at a local copy (or another mirror) without editing code
+DATA_SOURCE = os.environ.get("MTA_DATA_SOURCE", DATA_URL)
+CUTOFF_DATE = pd.to_datetime('2025-02-05 12:59:59')
+TOLL_HOUR_FORMAT = '%m/%d/%Y %I:%M:%S %p'
+# Toll times are New York wall-clock time without an offset
+TOLL_TIMEZONE = 'America/New_York'
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("MTA_CACHE_DIR", os.path.join(REPO_DIR, ".cache"))
+
+# Bump when the snapshot layout or ingest schema changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 6
+
+# How long a remote source is trusted before we ask the server whether it changed
+REMOTE_CHECK_SECONDS = 600
+
+_CHUNK = 1 << 20
+
+# --- Ingest schema ---
+# Only these columns are read from the CSV; everything else in the MTA export
+# (Toll Hour, Hour of Day, Toll Week, ...) is derivable or unused.  Toll Hour
+# is the block's time truncated to the hour, so the 10-minute block is the
+# only column that carries the time of day at full resolution.
+DIMENSIONS = ['Detection Group', 'Detection Region', 'Vehicle Class', 'Time Period', 'Day of Week']
+MEASURES = ['CRZ Entries', 'Excluded Roadway Entries']
+INGEST_COLUMNS = ['Toll 10 Minute Block', *DIMENSIONS, *MEASURES]
+# The block is read as a categorical too: the parser dedupes the strings, and
+# parse_toll_hours then only parses each distinct 10-minute block once.
+INGEST_DTYPES = {
+    'Toll 10 Minute Block': 'category',
+    **{col: 'category' for col in DIMENSIONS},
+    **{col: 'int32' for col in MEASURES},
+}
+
+# --- Integer time keys ---
+# Derived once from Toll 10 Minute Block at ingest; every section groups and
+# sorts on these, and 'HH:MM' / weekday labels are only produced for the final
+# result.  There is no stored hour-of-week key: (weekday, hour) is
+# (Weekday, Slot // 6), and every weekday/hour view is an axis reduction of
+# the cube's (day, slot) grid, so a fourth per-row column would never be read.
+TIME_KEYS = {'Day Index': 'int32', 'Slot': 'uint8', 'Weekday': 'int8'}
+SLOTS_PER_DAY = 144
+EPOCH = pd.Timestamp('1970-01-01')  # Day Index 0, a Thursday
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def slot_labels(slots=None):
+    """'HH:MM' label of each 10-minute slot of the day (or of the given slot numbers)."""
+    slots = np.arange(SLOTS_PER_DAY) if slots is None else np.asarray(slots)
+    return [f"{s // 6:02d}:{s % 6 * 10:02d}" for s in slots.tolist()]
+
+
+def day_dates(day_index):
+    """Midnight timestamps for Day Index values."""
+    return pd.DatetimeIndex(EPOCH + pd.to_timedelta(np.asarray(day_index, dtype=np.int64), unit='D'))
+
+
+def day_index(date):
+    """Day Index of a date."""
+    return (pd.Timestamp(date).normalize() - EPOCH).days
+
+
+def add_time_keys(df):
+    """Add Day Index, Slot (0-143) and Weekday (0 = Monday) from ``Toll 10 Minute Block``."""
+    minutes = df['Toll 10 Minute Block'].to_numpy().astype('datetime64[m]').astype(np.int64)
+    day, minute = np.divmod(minutes, 24 * 60)
+    weekday = (day + 3) % 7
+    df['Day Index'] = day.astype(TIME_KEYS['Day Index'])
+    df['Slot'] = (minute // 10).astype(TIME_KEYS['Slot'])
+    df['Weekday'] = weekday.astype(TIME_KEYS['Weekday'])
+    df['Toll Date'] = day.astype('datetime64[D]').astype(df['Toll 10 Minute Block'].dtype)
+    return df
+
+
+def _is_url(source):
+    return source.startswith(("http://", "https://"))
+
+
+def _meta_path():
+    return os.path.join(CACHE_DIR, "snapshot.json")
+
+
+def _read_meta():
+    try:
+        with open(_meta_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(meta):
+    tmp = _meta_path() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, _meta_path())
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _fetch(url, entry):
+    """Download ``url`` into the cache unless the server says it is unchanged.
+
+    Uses the ETag / Last-Modified headers from the previous download so an
+    unchanged file costs one round trip and no transfer.
+    """
+    raw_path = os.path.join(CACHE_DIR, "MTA_Entries.csv")
+    request = urllib.request.Request(url)
+    if os.path.exists(raw_path):
+        if entry.get("etag"):
+            request.add_header("If-None-Match", entry["etag"])
+        if entry.get("last_modified"):
+            request.add_header("If-Modified-Since", entry["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            tmp = raw_path + ".part"
+            with open(tmp, "wb") as f:
+                shutil.copyfileobj(response, f, _CHUNK)
+            os.replace(tmp, raw_path)
+            entry["etag"] = response.headers.get("ETag")
+            entry["last_modified"] = response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+    entry["checked_at"] = time.time()
+    return raw_path
+
+
+@traced("data.read_csv")
+def read_entries_csv(path, **kwargs):
+    """Read the raw CSV with the declared ingest schema (projected and typed)."""
+    return pd.read_csv(path, usecols=INGEST_COLUMNS, dtype=INGEST_DTYPES, **kwargs)
+
+
+@traced("data.parse_toll_hours")
+def parse_toll_hours(col, ambiguous='wall', hour_format=TOLL_HOUR_FORMAT):
+    """Parse toll time strings (``Toll 10 Minute Block``), each distinct value only once.
+
+    The column repeats one string per 10-minute block across every detection
+    group and vehicle class (``Toll Hour`` repeats one per hour), so the
+    distinct values are parsed and the result is broadcast back through the
+    factorized codes.
+
+    Values are New York wall-clock times and stay naive.  Malformed strings
+    and times that fall in the spring-forward gap raise ``ValueError`` listing
+    them, rather than becoming NaT.  For the repeated fall-back hour the
+    string cannot say which pass it belongs to: ``ambiguous='wall'`` keeps
+    both passes on the same wall-clock time, ``ambiguous='raise'`` rejects them.
+    ``hour_format`` is the export's format by default (the SODA API sends
+    ISO timestamps, see mta/soda.py).
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes, uniques = col.cat.codes.to_numpy(), col.cat.categories
+    else:
+        codes, uniques = pd.factorize(col)
+    missing = codes < 0
+    if missing.any():
+        raise ValueError(f"{int(missing.sum())} rows have no {col.name}")
+
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), format=hour_format, errors='coerce')
+    problems = {'unparseable': parsed.isna()}
+    valid = parsed.notna()
+    gap = parsed.tz_localize(TOLL_TIMEZONE, ambiguous=np.zeros(len(parsed), dtype=bool), nonexistent='NaT').isna()
+    problems['nonexistent (DST gap)'] = gap & valid
+    if ambiguous == 'raise':
+        overlap = parsed.tz_localize(TOLL_TIMEZONE, ambiguous='NaT', nonexistent='shift_forward').isna()
+        problems['ambiguous (DST overlap)'] = overlap & valid
+    elif ambiguous != 'wall':
+        raise ValueError(f"ambiguous must be 'wall' or 'raise', not {ambiguous!r}")
+
+    report = []
+    for kind, bad in problems.items():
+        bad = np.asarray(bad)
+        if bad.any():
+            rows = int(np.isin(codes, np.flatnonzero(bad)).sum())
+            examples = ', '.join(repr(str(v)) for v in uniques[bad][:5])
+            report.append(f"{bad.sum()} {kind} values in {rows} rows (e.g. {examples})")
+    if report:
+        raise ValueError(f"Invalid {col.name} values: " + "; ".join(report))
+    return pd.Series(parsed.to_numpy()[codes], index=col.index, name=col.name)
+
+
+@traced("data.prepare_entries")
+def prepare_entries(df, start=None, end=CUTOFF_DATE, hour_format=TOLL_HOUR_FORMAT):
+    """Parse timestamps, derive the helper columns and apply the study window.
+
+    Rows outside ``start <= Toll 10 Minute Block <= end`` are dropped; ``None``
+    leaves that side open.  Rows come back sorted by the block so date windows
+    can be cut with ``time_slice``/``date_range``, with the integer keys of
+    ``add_time_keys``.  ``Toll Date`` is kept as a midnight ``datetime64``
+    rather than Python ``date`` objects so it stays a fixed-width column.
+    """
+    df['Toll 10 Minute Block'] = parse_toll_hours(df['Toll 10 Minute Block'], hour_format=hour_format)
+    if not df['Toll 10 Minute Block'].is_monotonic_increasing:
+        df = df.sort_values('Toll 10 Minute Block', kind='stable')
+    df = time_slice(df.reset_index(drop=True), start, end).reset_index(drop=True)
+    return add_time_keys(df)
+
+
+def time_slice(df, start=None, end=None):
+    """Rows of ``df`` with ``start <= Toll 10 Minute Block <= end``, found by binary search.
+
+    ``df`` must be sorted by the block (as ``prepare_entries`` leaves it);
+    the result is a positional slice, so no rows are scanned or copied.
+    ``None`` leaves that side open.
+    """
+    hours = df['Toll 10 Minute Block'].to_numpy()
+    lo = 0 if start is None else hours.searchsorted(np.datetime64(pd.Timestamp(start)), side='left')
+    hi = len(hours) if end is None else hours.searchsorted(np.datetime64(pd.Timestamp(end)), side='right')
+    return df.iloc[lo:hi]
+
+
+def date_range(df, start=None, end=None):
+    """Rows of ``df`` whose ``Toll Date`` falls in the inclusive ``[start, end]`` day window."""
+    if end is not None:
+        end = pd.Timestamp(end).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+    return time_slice(df, None if start is None else pd.Timestamp(start).normalize(), end)
+
+
+def stream_entries(source, chunksize=500_000, start=None, end=CUTOFF_DATE, filters=None):
+    """Yield prepared chunks of ``source`` without ever holding the whole file.
+
+    Each chunk is typed, restricted to the ``[start, end]`` window and to
+    ``filters`` (a mapping of column -> allowed values) before it is yielded,
+    so callers can fold it into running aggregates and drop it.
+    """
+    for chunk in read_entries_csv(source, chunksize=chunksize):
+        chunk = prepare_entries(chunk, start=start, end=end)
+        for col, values in (filters or {}).items():
+            chunk = chunk[chunk[col].isin(values)]
+        if len(chunk):
+            yield chunk
+
+
+def memory_footprint(df):
+    """Total in-memory size of ``df`` in bytes, including string payloads."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(path):
+    """Compare an untyped ``read_csv`` of ``path`` with the typed ingest."""
+    inferred = pd.read_csv(path)
+    inferred['Toll Hour'] = pd.to_datetime(inferred['Toll Hour'], format=TOLL_HOUR_FORMAT)
+    inferred['Toll Date'] = inferred['Toll Hour'].dt.date
+    inferred['Time'] = inferred['Toll Hour'].dt.strftime('%H:%M')
+    before = memory_footprint(inferred)
+    del inferred
+    after = memory_footprint(prepare_entries(read_entries_csv(path)))
+    return {'inferred_bytes': before, 'typed_bytes': after, 'reduction': round(before / after, 2)}
+
+
+def _build_snapshot(raw_path, version):
+    df = prepare_entries(read_entries_csv(raw_path))
+    path = snapshot_path(version)
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path, memory_footprint(df)
+
+
+def _drop_old_snapshots(meta):
+    keep = {entry.get("snapshot") for entry in meta.values()}
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith("mta_entries-") and name.endswith(".parquet") and name not in keep:
+            os.remove(os.path.join(CACHE_DIR, name))
+
+
+def current_versions():
+    """Versions some source currently resolves to; caches of any other version are stale."""
+    return {entry["version"] for entry in _read_meta().values() if "version" in entry}
+
+
+def raw_csv_path(source=DATA_SOURCE):
+    """Local path of the raw CSV for ``source`` (the cached download for URLs)."""
+    return os.path.join(CACHE_DIR, "MTA_Entries.csv") if _is_url(source) else source
+
+
+@traced("data.version")
+def data_version(source=DATA_SOURCE, build_snapshot=True):
+    """Return the content version of ``source``, refreshing the snapshot if needed.
+
+    Local files are checked by size and mtime first and only re-hashed when
+    those change.  Remote files are re-checked at most every
+    ``REMOTE_CHECK_SECONDS``.  The version is the first 16 hex digits of the
+    SHA-256 of the raw CSV.  With ``build_snapshot=False`` only the raw file
+    is fetched and versioned, for callers that stream it instead.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta = _read_meta()
+    entry = meta.get(source, {})
+    snapshot = entry.get("snapshot")
+    snapshot_ok = (
+        snapshot is not None
+        and entry.get("format") == SNAPSHOT_FORMAT
+        and os.path.exists(os.path.join(CACHE_DIR, snapshot))
+    )
+    up_to_date = "version" in entry and (snapshot_ok or not build_snapshot)
+
+    if _is_url(source):
+        if up_to_date and time.time() - entry.get("checked_at", 0) < REMOTE_CHECK_SECONDS:
+            return entry["version"]
+        raw_path = _fetch(source, entry)
+    else:
+        raw_path = source
+        stat = os.stat(raw_path)
+        if up_to_date and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["version"]
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+
+    version = _file_sha256(raw_path)[:16]
+    if version != entry.get("version"):
+        snapshot_ok = False
+        entry.pop("snapshot", None)
+    if build_snapshot and not snapshot_ok:
+        path, entry["memory_bytes"] = _build_snapshot(raw_path, version)
+        entry["snapshot"] = os.path.basename(path)
+        entry["format"] = SNAPSHOT_FORMAT
+    entry["version"] = version
+    meta[source] = entry
+    _write_meta(meta)
+    _drop_old_snapshots(meta)
+    return version
+
+
+def snapshot_path(version):
+    """Path of the Parquet snapshot for a version returned by ``data_version``."""
+    return os.path.join(CACHE_DIR, f"mta_entries-{version}.parquet")
+
+
+@traced("data.read_snapshot")
+def read_snapshot(version):
+    """Read the Parquet snapshot for a version returned by ``data_version``."""
+    return pd.read_parquet(snapshot_path(version))
+
+
+def load_entries(source=DATA_SOURCE):
+    """Load the prepared entries DataFrame from the local snapshot."""
+    return read_snapshot(data_version(source))
+
+
+if __name__ == "__main__":
+    import sys
+
+    report = memory_report(sys.argv[1] if len(sys.argv) > 1 else DATA_SOURCE)
+    print(f"inferred dtypes: {report['inferred_bytes'] / 1e6:.1f} MB")
+    print(f"typed ingest:    {report['typed_bytes'] / 1e6:.1f} MB  ({report['reduction']}x smaller)")
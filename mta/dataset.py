@@ -0,0 +1,199 @@
+"""Hive-partitioned Parquet dataset of the prepared entries.
+
+The snapshot is one file, so a date window (section 7's Jan 5 - Jan 25,
+the study cutoff, the Dash date picker) means reading every row and
+masking.  Here the rows are laid out as::
+
+    .cache/dataset-<version>/month=2025-01/Detection Region=Brooklyn/part-0.parquet
+
+and ``PartitionedEntries.window`` turns the window and region filters into
+a pyarrow dataset filter: partitions outside them are never opened, and
+inside a partition, row groups whose ``Toll 10 Minute Block`` min/max
+statistics miss the window are skipped (the rows are written in time
+order, so every row group covers a short time range).  Only the requested columns are read::
+
+    python -m mta.dataset --start 2025-01-20 --end 2025-01-26   # build, then report bytes touched
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from mta.data import (
+    CACHE_DIR, DATA_SOURCE, INGEST_DTYPES, add_time_keys, current_versions, data_version, read_snapshot,
+)
+from mta.trace import traced
+
+# Rows per row group; small enough that a week is a few row groups per partition
+ROW_GROUP_ROWS = 16_384
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string()), ('Detection Region', pa.string())]), flavor='hive')
+
+
+def dataset_path(version):
+    """Directory of the partitioned dataset for a version returned by ``data_version``."""
+    return os.path.join(CACHE_DIR, f"dataset-{version}")
+
+
+def write_dataset(df, path, row_group_rows=ROW_GROUP_ROWS):
+    """Write the prepared frame ``df`` (sorted by Toll 10 Minute Block) as the partitioned dataset at ``path``."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Format each distinct month once rather than every row
+    months, codes = np.unique(df['Toll 10 Minute Block'].to_numpy().astype('datetime64[M]'), return_inverse=True)
+    month = pa.DictionaryArray.from_arrays(pa.array(codes.astype(np.int32)), pa.array([str(m) for m in months]))
+    table = table.append_column('month', month.cast(pa.string()))
+    region = table.schema.get_field_index('Detection Region')
+    table = table.set_column(region, 'Detection Region', table['Detection Region'].cast(pa.string()))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    ds.write_dataset(table, tmp, format='parquet', partitioning=PARTITIONING, preserve_order=True,
+                     min_rows_per_group=row_group_rows, max_rows_per_group=row_group_rows,
+                     existing_data_behavior='error')
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def _drop_old_datasets(keep):
+    """Delete dataset directories other than ``keep`` and those of current versions (as for snapshots)."""
+    keep = {os.path.basename(dataset_path(version)) for version in {*current_versions(), *keep}}
+    for name in os.listdir(CACHE_DIR):
+        # Skip other writers' in-progress .tmp directories
+        if name.startswith("dataset-") and not name.endswith(".tmp") and name not in keep:
+            shutil.rmtree(os.path.join(CACHE_DIR, name), ignore_errors=True)
+
+
+def _timestamp(value):
+    return pa.scalar(pd.Timestamp(value).to_pydatetime(), pa.timestamp('us'))
+
+
+class PartitionedEntries:
+    """Windowed reads of a partitioned entries dataset."""
+
+    def __init__(self, path, version=None):
+        self.path = path
+        self.version = version
+        self.dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+
+    @classmethod
+    def from_version(cls, version):
+        """The dataset for ``version``, written from its snapshot the first time.
+
+        Writing a new version deletes the datasets of versions no source
+        resolves to any more.
+        """
+        path = dataset_path(version)
+        if not os.path.isdir(path):
+            write_dataset(read_snapshot(version), path)
+            _drop_old_datasets({version})
+        return cls(path, version)
+
+    def filter(self, start=None, end=None, regions=None):
+        """Dataset filter for ``start <= Toll 10 Minute Block <= end`` and the given Detection Regions.
+
+        The month bounds prune partitions; the block bounds are checked
+        against row group statistics and then row by row.
+        """
+        conditions = []
+        if start is not None:
+            conditions.append(ds.field('month') >= pd.Timestamp(start).strftime('%Y-%m'))
+        if end is not None:
+            conditions.append(ds.field('month') <= pd.Timestamp(end).strftime('%Y-%m'))
+        if regions is not None:
+            conditions.append(ds.field('Detection Region').isin(list(regions)))
+        return _all([*conditions, _row_filter(start, end)])
+
+    @traced("dataset.window")
+    def window(self, start=None, end=None, regions=None, columns=None):
+        """Prepared rows with ``start <= Toll 10 Minute Block <= end`` (and the given regions), in time order.
+
+        ``columns`` projects the read (the block is always included); the
+        integer time keys are derived again after reading.
+        """
+        if columns is not None:
+            columns = ['Toll 10 Minute Block',
+                       *(col for col in columns if col in INGEST_DTYPES and col != 'Toll 10 Minute Block')]
+        table = self.dataset.to_table(columns=columns, filter=self.filter(start, end, regions))
+        df = table.to_pandas()
+        df = df.drop(columns=['month'], errors='ignore')
+        for col, dtype in INGEST_DTYPES.items():
+            if col in df and col != 'Toll 10 Minute Block' and df[col].dtype != dtype:
+                df[col] = df[col].astype(dtype)
+        # Fragments come back partition by partition; restore global time order
+        df = df.sort_values('Toll 10 Minute Block', kind='stable').reset_index(drop=True)
+        return add_time_keys(df)
+
+    def date_window(self, start=None, end=None, regions=None, columns=None):
+        """Like ``window`` for the inclusive ``[start, end]`` day range (as ``data.date_range``)."""
+        if end is not None:
+            end = pd.Timestamp(end).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, 'us')
+        return self.window(None if start is None else pd.Timestamp(start).normalize(), end, regions, columns)
+
+    def distinct(self, column):
+        """Sorted distinct values of ``column`` (read from that one column only)."""
+        values = self.dataset.to_table(columns=[column])[column].unique()
+        return sorted(str(v) for v in values.to_pylist())
+
+    def scan_stats(self, start=None, end=None, regions=None, columns=None):
+        """Files, row groups and compressed bytes a windowed read touches, against reading everything."""
+        columns = None if columns is None else {'Toll 10 Minute Block', *columns}
+        touched = _tally(self.dataset, self.filter(start, end, regions), _row_filter(start, end), columns)
+        total = _tally(self.dataset, None, None, None)
+        return {'touched': touched, 'total': total, 'fraction': touched['bytes'] / total['bytes'] if total['bytes'] else 0.0}
+
+
+def _all(conditions):
+    expression = None
+    for condition in conditions:
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _row_filter(start, end):
+    """The time part of a window, which row group statistics can answer."""
+    return _all([
+        None if start is None else ds.field('Toll 10 Minute Block') >= _timestamp(start),
+        None if end is None else ds.field('Toll 10 Minute Block') <= _timestamp(end),
+    ])
+
+
+def _tally(dataset, expression, row_expression, columns):
+    """Files, row groups and compressed bytes of ``columns`` (all if None) left after pruning.
+
+    ``expression`` prunes partitions; ``row_expression`` prunes row groups
+    by their statistics.
+    """
+    files = groups = size = 0
+    fragments = dataset.get_fragments() if expression is None else dataset.get_fragments(filter=expression)
+    for fragment in fragments:
+        files += 1
+        metadata = fragment.metadata
+        pieces = fragment.split_by_row_group() if row_expression is None else fragment.split_by_row_group(row_expression)
+        for piece in pieces:
+            for row_group in piece.row_groups:
+                groups += 1
+                chunks = metadata.row_group(row_group.id)
+                size += sum(chunks.column(c).total_compressed_size for c in range(chunks.num_columns)
+                            if columns is None or chunks.column(c).path_in_schema in columns)
+    return {'files': files, 'row_groups': groups, 'bytes': size}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=DATA_SOURCE)
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--region", action="append", dest="regions")
+    parser.add_argument("--columns", nargs="*", default=['Vehicle Class', 'CRZ Entries'])
+    args = parser.parse_args()
+
+    entries = PartitionedEntries.from_version(data_version(args.source))
+    stats = entries.scan_stats(args.start, args.end, args.regions, args.columns)
+    rows = len(entries.window(args.start, args.end, args.regions, args.columns))
+    print(f"{entries.path}: {rows:,} rows; read {stats['touched']['files']}/{stats['total']['files']} files, "
+          f"{stats['touched']['row_groups']}/{stats['total']['row_groups']} row groups, "
+          f"{stats['touched']['bytes']:,}/{stats['total']['bytes']:,} bytes ({stats['fraction']:.1%})")
@@ -0,0 +1,170 @@
+"""DuckDB backend: section aggregates answered by SQL over the Parquet snapshot.
+
+``DuckEntries`` has the same ``aggregate`` method as ``EntryCube``, so every
+builder in mta/charts.py and mta/maps.py runs on either backend unchanged.
+Instead of scattering the rows into an in-memory cube, each aggregate is
+one ``GROUP BY`` over the snapshot, which DuckDB scans in parallel and
+column-projected; nothing but the small results is held in Python.
+
+Select it with ``MTA_BACKEND=duckdb`` (snapshot ingest only; needs
+``pip install duckdb``).  ``python -m mta.duck`` checks that both backends
+return identical aggregates for every section.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from mta.cube import KEYS, ROWS, WEEKDAYS
+from mta.data import DATA_SOURCE, MEASURES, WEEKDAY_NAMES, data_version, slot_labels, snapshot_path
+from mta.trace import span
+
+BACKEND = os.environ.get("MTA_BACKEND", "pandas")
+if BACKEND not in ("pandas", "duckdb"):
+    raise ValueError(f"Unknown MTA_BACKEND {BACKEND!r}; use 'pandas' or 'duckdb'")
+
+# SQL expression for each aggregation key; Time and Day of Week group on the
+# integer keys and are labelled after the query
+_KEY_SQL = {
+    'Toll Date': '"Toll Date"',
+    'Time': '"Slot"',
+    'Day of Week': '"Weekday"',
+    'Detection Group': 'CAST("Detection Group" AS VARCHAR)',
+    'Detection Region': 'CAST("Detection Region" AS VARCHAR)',
+    'Vehicle Class': 'CAST("Vehicle Class" AS VARCHAR)',
+    'Time Period': 'CAST("Time Period" AS VARCHAR)',
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DuckEntries:
+    """Aggregates of a prepared entries Parquet file, computed by DuckDB."""
+
+    def __init__(self, path, version=None):
+        import duckdb
+
+        self.path = path
+        self.version = version
+        self._con = duckdb.connect()
+        self._con.execute(f"CREATE VIEW entries AS SELECT * FROM read_parquet('{path.replace(chr(39), chr(39) * 2)}')")
+        self._lock = threading.Lock()
+        self.labels = {
+            col: self._distinct(col)
+            for col in ['Detection Group', 'Detection Region', 'Vehicle Class', 'Time Period']
+        }
+        self.labels['Time'] = slot_labels()
+        self.labels['Day of Week'] = WEEKDAYS
+
+    @classmethod
+    def from_version(cls, version):
+        return cls(snapshot_path(version), version)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, params).df()
+        finally:
+            cursor.close()
+
+    def _distinct(self, col):
+        return sorted(self._query(f"SELECT DISTINCT CAST({_quote(col)} AS VARCHAR) AS v FROM entries")['v'].tolist())
+
+    def aggregate(self, keys, measures=('CRZ Entries',), start=None, end=None):
+        """Same result as ``EntryCube.aggregate``, from one SQL ``GROUP BY``."""
+        keys = list(keys)
+        measures = list(measures)
+        unknown = [k for k in keys if k not in KEYS]
+        if unknown:
+            raise KeyError(f"Cannot aggregate the entries by {unknown}")
+
+        with span("duckdb.aggregate", keys=", ".join(keys)):
+            select = [f"{_KEY_SQL[key]} AS {_quote(key)}" for key in keys]
+            select += [
+                f"COUNT(*)::BIGINT AS {_quote(m)}" if m == ROWS else f"COALESCE(SUM({_quote(m)}), 0)::BIGINT AS {_quote(m)}"
+                for m in measures
+            ]
+            where, params = [], []
+            if start is not None:
+                where.append('"Toll Date" >= ?')
+                params.append(pd.Timestamp(start).normalize().to_pydatetime())
+            if end is not None:
+                where.append('"Toll Date" <= ?')
+                params.append(pd.Timestamp(end).normalize().to_pydatetime())
+            sql = f"SELECT {', '.join(select)} FROM entries"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            if keys:
+                sql += " GROUP BY " + ", ".join(_KEY_SQL[key] for key in keys)
+            result = self._query(sql, params)
+            return self._label(result, keys, measures)
+
+    def _label(self, result, keys, measures):
+        """Give the key columns the same dtypes and order as the cube's output."""
+        for key in keys:
+            if key == 'Toll Date':
+                result[key] = pd.to_datetime(result[key])
+            elif key == 'Time':
+                result[key] = pd.Categorical.from_codes(result[key].to_numpy(dtype=np.int64), categories=self.labels[key])
+            elif key == 'Day of Week':
+                names = np.asarray(WEEKDAY_NAMES)[result[key].to_numpy(dtype=np.int64)]
+                result[key] = pd.Categorical(names, categories=self.labels[key])
+            else:
+                result[key] = pd.Categorical(result[key], categories=self.labels[key])
+        for measure in measures:
+            result[measure] = result[measure].astype(np.int64)
+        if not keys:
+            return result[measures]
+        return result[keys + measures].sort_values(keys, kind='stable').reset_index(drop=True)
+
+
+# (keys, measures, start, end) of the aggregates the sections ask for
+PARITY_KEYSETS = [
+    (['Detection Group'], [ROWS], None, None),
+    (['Detection Group'], ['CRZ Entries'], None, None),
+    (['Detection Region'], ['CRZ Entries'], None, None),
+    (['Toll Date', 'Vehicle Class'], ['CRZ Entries'], None, None),
+    (['Toll Date', 'Time Period', 'Detection Group'], ['CRZ Entries'], None, None),
+    (['Toll Date', 'Day of Week', 'Time Period'], ['CRZ Entries'], None, None),
+    (['Toll Date', 'Time'], ['CRZ Entries'], None, None),
+    (['Toll Date'], MEASURES, '2025-01-05', '2025-01-25'),
+    (['Day of Week', 'Detection Region', 'Time'], [*MEASURES, ROWS], None, None),
+    ([], MEASURES, None, None),
+]
+
+
+def parity(cube, duck, keysets=PARITY_KEYSETS):
+    """Keysets (with date windows) whose aggregates differ between the two backends."""
+    mismatches = []
+    for keys, measures, start, end in keysets:
+        a = cube.aggregate(keys, measures, start=start, end=end)
+        b = duck.aggregate(keys, measures, start=start, end=end)
+        if 'Toll Date' in keys:
+            a['Toll Date'] = a['Toll Date'].astype('datetime64[ns]')
+            b['Toll Date'] = b['Toll Date'].astype('datetime64[ns]')
+        if not a.equals(b):
+            mismatches.append((keys, measures, start, end))
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from mta.cube import EntryCube
+    from mta.data import read_snapshot
+
+    version = data_version(sys.argv[1] if len(sys.argv) > 1 else DATA_SOURCE)
+    t = time.perf_counter()
+    cube = EntryCube.from_frame(read_snapshot(version))
+    print(f"cube built in {time.perf_counter() - t:.2f}s")
+    duck = DuckEntries.from_version(version)
+    mismatches = parity(cube, duck)
+    for mismatch in mismatches:
+        print("MISMATCH:", mismatch)
+    print("backends agree" if not mismatches else f"{len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
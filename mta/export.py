@@ -0,0 +1,142 @@
+"""Headless export of every notebook analysis to static files.
+
+The notebook only runs in Colab; this renders the same analyses from a
+local source without a browser or Streamlit: the word cloud (PNG), the
+three folium maps (HTML), the region table and the other tables (JSON and
+HTML), and every Plotly chart (HTML and figure JSON, plus PNG with
+``--png``, which needs ``pip install kaleido``).  The cube is built once,
+saved next to the output, and a pool of ``--workers`` processes loads it
+and renders one artifact per task::
+
+    python -m mta.export site/ --source MTA_Entries.csv --workers 4
+
+``manifest.json`` in the output directory lists every file written, the
+data version and how long each artifact took.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from mta import charts, cloud, maps
+from mta.cube import EntryCube
+from mta.data import DATA_SOURCE, data_version, read_snapshot
+from mta.parallel import from_frame_parallel
+from mta.trace import span
+
+# Artifact name -> (kind, builder taking the cube); the kind decides which files are written
+ARTIFACTS = {
+    'wordcloud': ('png', lambda cube: cloud.wordcloud_png(charts.detection_counts(cube))),
+    'detection_counts': ('json', charts.detection_counts),
+    'map_heatmap': ('html', partial(maps.map_html, view=maps.MAP_VIEWS[0])),
+    'map_heatmap_markers': ('html', partial(maps.map_html, view=maps.MAP_VIEWS[1])),
+    'map_bubbles': ('html', partial(maps.map_html, view=maps.MAP_VIEWS[2])),
+    'region_table': ('table', charts.region_table),
+    'region_table_styled': ('html', charts.region_table_html),
+    'region_chart': ('figure', charts.region_chart),
+    'vehicle_chart': ('figure', charts.vehicle_chart),
+    'peak_chart': ('figure', charts.peak_chart),
+    'day_of_week_chart': ('figure', charts.day_of_week_chart),
+    'daily_time_chart': ('figure', charts.daily_time_chart),
+    'time_of_day_chart': ('figure', charts.time_of_day_chart),
+    'entries_over_time_chart': ('figure', charts.entries_over_time_chart),
+    'crz_vs_excluded_chart': ('figure', charts.crz_vs_excluded_chart),
+    'daily_crz_share': ('table', charts.daily_crz_share),
+    'crossing_point_chart': ('figure', charts.crossing_point_chart),
+    'crossing_point_box': ('table', charts.crossing_point_box),
+    'vehicle_category_chart': ('figure', charts.vehicle_category_chart),
+}
+
+_cube = None
+
+
+def _write(path, data):
+    """Write ``data`` (str or bytes) to ``path`` atomically."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb" if isinstance(data, bytes) else "w", encoding=None if isinstance(data, bytes) else "utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def _init(cube_path):
+    global _cube
+    _cube = EntryCube.load(cube_path)
+
+
+def export_artifact(name, out_dir, png=False):
+    """Render artifact ``name`` from the worker's cube into ``out_dir``; returns (name, files, seconds)."""
+    kind, builder = ARTIFACTS[name]
+    start = time.perf_counter()
+    with span("export.artifact", artifact=name):
+        result = builder(_cube)
+        base = os.path.join(out_dir, name)
+        if kind == 'png':
+            files = [_write(f"{base}.png", result)]
+        elif kind == 'html':
+            files = [_write(f"{base}.html", result)]
+        elif kind == 'json':
+            files = [_write(f"{base}.json", json.dumps(result, indent=2))]
+        elif kind == 'table':
+            files = [
+                _write(f"{base}.json", result.to_json(orient='records', date_format='iso', indent=2)),
+                _write(f"{base}.html", result.to_html(index=False)),
+            ]
+        else:
+            files = [
+                _write(f"{base}.html", result.to_html(include_plotlyjs='cdn', full_html=True)),
+                _write(f"{base}.json", result.to_json()),
+            ]
+            if png:
+                result.write_image(f"{base}.png")
+                files.append(f"{base}.png")
+    return name, [os.path.basename(f) for f in files], time.perf_counter() - start
+
+
+def export_all(cube, out_dir, workers=os.cpu_count(), names=None, png=False):
+    """Render ``names`` (default: every artifact) from ``cube`` into ``out_dir`` with a process pool."""
+    names = list(names or ARTIFACTS)
+    os.makedirs(out_dir, exist_ok=True)
+    cube_path = os.path.join(out_dir, ".cube.npz")
+    cube.save(cube_path)
+    try:
+        if workers <= 1:
+            _init(cube_path)
+            results = [export_artifact(name, out_dir, png) for name in names]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(names)), initializer=_init,
+                                     initargs=(cube_path,)) as pool:
+                results = list(pool.map(export_artifact, names, [out_dir] * len(names), [png] * len(names)))
+    finally:
+        os.remove(cube_path)
+    manifest = {
+        'version': cube.version,
+        'artifacts': {name: {'files': files, 'seconds': round(seconds, 3)} for name, files, seconds in results},
+    }
+    _write(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, indent=2))
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--source", default=DATA_SOURCE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--png", action="store_true", help="also write PNGs of the Plotly charts (needs kaleido)")
+    parser.add_argument("artifacts", nargs="*", help=f"artifacts to export (default: all of {', '.join(ARTIFACTS)})")
+    args = parser.parse_args()
+    unknown = sorted(set(args.artifacts) - set(ARTIFACTS))
+    if unknown:
+        parser.error(f"unknown artifacts: {', '.join(unknown)}")
+
+    t = time.perf_counter()
+    version = data_version(args.source)
+    cube = from_frame_parallel(read_snapshot(version), workers=args.workers)
+    cube.version = version
+    print(f"cube built in {time.perf_counter() - t:.2f}s")
+    manifest = export_all(cube, args.out_dir, args.workers, args.artifacts, args.png)
+    for name, artifact in manifest['artifacts'].items():
+        print(f"{name:<24} {artifact['seconds']:6.2f}s  {', '.join(artifact['files'])}")
+    print(f"exported {len(manifest['artifacts'])} artifacts in {time.perf_counter() - t:.2f}s")
@@ -0,0 +1,110 @@
+"""Import-time report for the app's modules.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and reports its cumulative import time, the slowest packages it pulled in,
+and whether any of the heavy plotting/mapping packages came along.  A
+``.py`` entry stands for a script: its unconditional top-level imports
+are probed together, so ``visualization.py`` is checked without running
+the app.  Those
+are only meant to load when a section first renders, so the check exits
+non-zero if one is imported eagerly or a module exceeds ``--budget-ms``::
+
+    python -m mta.importtime
+    python -m mta.importtime --budget-ms 1500 --json importtime.json
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['mta.data', 'mta.cube', 'mta.cache', 'mta.trace', 'mta.charts', 'mta.maps', 'mta.cloud',
+           'mta.timeseries', 'mta.duck', 'mta.store', 'mta.dataset', 'mta.export', 'mta.dashboard',
+           'mta.parallel', 'mta.refresh', 'visualization.py']
+# Packages that must only be imported lazily, when a figure, map or word cloud is built
+# (or, for duckdb and the partitioned dataset, when that backend or ingest is selected)
+LAZY = ['matplotlib', 'wordcloud', 'folium', 'branca', 'plotly', 'PIL', 'duckdb', 'pyarrow.dataset']
+# Lazy packages a module cannot avoid: dash and streamlit import plotly (and with it PIL)
+# themselves, and pyarrow.dataset is what mta.dataset is for
+ALLOWED = {'mta.dashboard': ['plotly', 'PIL'], 'visualization.py': ['plotly', 'PIL'], 'mta.dataset': ['pyarrow.dataset']}
+
+# Written to stderr after the measured imports, so the probe's own imports are not counted
+_MARK = "-- probe done --"
+_PROBE = ("{imports}; import sys; print({mark!r}, file=sys.stderr); import json; "
+          "print(json.dumps([m for m in {lazy!r} if m in sys.modules]))")
+
+
+def _parse(stderr):
+    """(module, self_us, cumulative_us, depth) per line of ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def _imports(module):
+    """Import statements to probe: the module itself, or a script's unconditional top-level imports."""
+    if not module.endswith(".py"):
+        return f"import {module}"
+    with open(os.path.join(REPO_DIR, module), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "; ".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure(module):
+    """Import ``module`` in a fresh interpreter and summarize what it cost."""
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(imports=_imports(module), mark=_MARK, lazy=LAZY)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    rows = _parse(result.stderr.split(_MARK)[0])
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    top = {}
+    for name, self_us, _, _ in rows:
+        package = name.split(".")[0]
+        top[package] = top.get(package, 0) + self_us
+    return {
+        'module': module,
+        'cumulative_ms': total / 1000,
+        'top_packages_ms': {name: us / 1000 for name, us in sorted(top.items(), key=lambda kv: -kv[1])[:5]},
+        'eager_heavy_imports': json.loads(result.stdout),
+    }
+
+
+def report(modules=MODULES, budget_ms=None):
+    """Measure every module; returns the rows and a list of failed checks."""
+    rows = [measure(module) for module in modules]
+    failures = []
+    for row in rows:
+        eager = [name for name in row['eager_heavy_imports'] if name not in ALLOWED.get(row['module'], ())]
+        if eager:
+            failures.append(f"{row['module']} imports {', '.join(eager)} at import time")
+        if budget_ms is not None and row['cumulative_ms'] > budget_ms:
+            failures.append(f"{row['module']} takes {row['cumulative_ms']:.0f} ms to import (budget {budget_ms:.0f} ms)")
+    return rows, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--budget-ms", type=float, help="fail if any module takes longer than this to import")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    rows, failures = report(args.modules, args.budget_ms)
+    for row in rows:
+        top = ", ".join(f"{name} {ms:.0f}" for name, ms in row['top_packages_ms'].items())
+        print(f"{row['module']:<16} {row['cumulative_ms']:8.0f} ms   ({top})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'modules': rows, 'failures': failures}, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
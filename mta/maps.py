@@ -0,0 +1,107 @@
+"""Folium maps of CRZ entries per entry point.
+
+Each map is built from column arrays in one pass: the heat layer takes the
+whole ``[lat, lon, weight]`` array at once, and markers/bubbles are a single
+GeoJSON layer instead of one folium object per point.  ``map_html`` renders
+a map to a standalone HTML page so the app can cache the result per view.
+folium and branca are imported when a map is first built.
+"""
+import numpy as np
+
+from mta import charts
+from mta.trace import traced
+
+MAP_CENTER = [40.758, -73.985]
+MAP_VIEWS = ["Basic Heatmap", "Heatmap with Labels and Markers", "Bubble Map with Branca Colormap"]
+
+
+def _features(entry_data, **columns):
+    """GeoJSON point features for every entry point, with extra per-point properties."""
+    names = entry_data['Detection Group'].to_numpy()
+    entries = entry_data['CRZ Entries'].to_numpy()
+    coords = entry_data[['lon', 'lat']].to_numpy().tolist()
+    extra = {key: np.asarray(values).tolist() for key, values in columns.items()}
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': coord},
+                'properties': {
+                    'name': str(name),
+                    'entries': f"{int(count):,}",
+                    **{key: values[i] for key, values in extra.items()},
+                },
+            }
+            for i, (name, count, coord) in enumerate(zip(names, entries, coords))
+        ],
+    }
+
+
+def _popup():
+    import folium
+
+    return folium.GeoJsonPopup(fields=['name', 'entries'], aliases=['Entry Point:', 'Number of Entries:'], max_width=200)
+
+
+def heatmap(entry_data, markers=False):
+    """Heatmap of CRZ entries, optionally with one labelled marker per entry point."""
+    import folium
+    from folium.plugins import HeatMap
+
+    entry_map = folium.Map(location=MAP_CENTER, zoom_start=12)
+    HeatMap(entry_data[['lat', 'lon', 'CRZ Entries']].to_numpy(dtype=float).tolist()).add_to(entry_map)
+    if markers:
+        folium.GeoJson(
+            _features(entry_data),
+            name='Entry points',
+            marker=folium.Marker(icon=folium.Icon(color='blue', icon='info-sign')),
+            popup=_popup(),
+            tooltip=folium.GeoJsonTooltip(fields=['name'], labels=False),
+        ).add_to(entry_map)
+    return entry_map
+
+
+def bubble_map(entry_data):
+    """Bubbles sized by sqrt(entries) and coloured with a branca colormap."""
+    import branca.colormap as cm
+    import folium
+
+    entry_map = folium.Map(location=MAP_CENTER, zoom_start=12)
+    entries = entry_data['CRZ Entries'].to_numpy(dtype=float)
+    colormap = cm.LinearColormap(['blue', 'purple', 'orange', 'red'], vmin=entries.min(), vmax=entries.max())
+    entry_map.add_child(colormap)
+
+    radius = (np.sqrt(entries) / 35).astype(int)
+    colors = [colormap(value) for value in entries]
+    folium.GeoJson(
+        _features(entry_data, radius=radius, color=colors),
+        name='Entry points',
+        marker=folium.CircleMarker(fill=True),
+        style_function=lambda feature: {
+            'radius': feature['properties']['radius'],
+            'color': feature['properties']['color'],
+            'fillColor': feature['properties']['color'],
+            'fillOpacity': 0.7,
+            'weight': 1,
+        },
+        popup=_popup(),
+        tooltip=folium.GeoJsonTooltip(fields=['name', 'entries'], aliases=['', 'Entries:']),
+    ).add_to(entry_map)
+    return entry_map
+
+
+def build_map(entry_data, view):
+    if view == "Basic Heatmap":
+        return heatmap(entry_data)
+    if view == "Heatmap with Labels and Markers":
+        return heatmap(entry_data, markers=True)
+    if view == "Bubble Map with Branca Colormap":
+        return bubble_map(entry_data)
+    raise ValueError(f"Unknown map view {view!r}")
+
+
+@traced("maps.render_html")
+def map_html(cube, view):
+    """Standalone HTML page of the ``view`` map for ``cube``."""
+    return build_map(charts.entry_data(cube), view).get_root().render()
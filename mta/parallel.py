@@ -0,0 +1,175 @@
+"""Build the aggregate cube in parallel, one process per month or week.
+
+The entries frame is sorted by ``Toll 10 Minute Block`` (see
+``prepare_entries``), so each calendar partition is a contiguous slice.
+Workers are sent only a partition's bounds: they memory-map the rows from
+an Arrow store (mta/store.py), scatter their slice into a partial
+``EntryCube`` covering only its own days, and the partials are merged with
+``EntryCube.merge``.  All sums are integers, so
+merging is associative and the result is bit-for-bit the cube the serial
+``EntryCube.from_frame`` builds.  Streaming ingest works the same way:
+``aggregate_csv_parallel`` reads chunks in the parent and folds them in
+worker processes.
+
+Set ``MTA_WORKERS`` to the number of processes the app should use (1, the
+default, keeps everything in-process).  ``python -m mta.parallel`` times
+both paths on a source and checks that they agree.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from mta.cube import EntryCube
+from mta.data import CUTOFF_DATE, DATA_SOURCE, DIMENSIONS, MEASURES, raw_csv_path, stream_entries, time_slice
+
+WORKERS = int(os.environ.get("MTA_WORKERS", "1"))
+
+# Columns EntryCube.add reads; the temporary store for a frame holds only these
+CUBE_COLUMNS = ['Toll 10 Minute Block', 'Day Index', 'Slot', *DIMENSIONS, *MEASURES]
+
+
+def partition_bounds(df, by='month'):
+    """Start timestamps of the month (or Monday-to-Sunday week) partitions covering ``df``."""
+    if df.empty:
+        return []
+    first, last = df['Toll 10 Minute Block'].iloc[0], df['Toll 10 Minute Block'].iloc[-1]
+    if by == 'month':
+        return list(pd.date_range(first.to_period('M').start_time, last, freq='MS'))
+    if by == 'week':
+        return list(pd.date_range(first.normalize() - pd.Timedelta(days=first.dayofweek), last, freq='7D'))
+    raise ValueError(f"Unknown partition {by!r}; use 'month' or 'week'")
+
+
+def partitions(df, by='month'):
+    """Contiguous row slices of the sorted frame ``df``, one per partition."""
+    bounds = partition_bounds(df, by)
+    ends = [*bounds[1:], None]
+    for start, end in zip(bounds, ends):
+        part = time_slice(df, start, None if end is None else end - pd.Timedelta(1, 'ns'))
+        if len(part):
+            yield part
+
+
+def _partial(part, measures):
+    return EntryCube.from_frame(part, measures)
+
+
+def _partial_from_store(path, start, end, measures):
+    from mta.store import open_entries
+
+    _, df = open_entries(path, start, end)
+    return EntryCube.from_frame(df, measures)
+
+
+def _from_store(path, bounds, workers, measures):
+    """Merge the partials of the partitions starting at ``bounds``, built by workers from the store at ``path``."""
+    ends = [end - pd.Timedelta(1, 'ns') for end in bounds[1:]] + [None]
+    n = len(bounds)
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, n))) as pool:
+        return merge_all(pool.map(_partial_from_store, [path] * n, bounds, ends, [measures] * n), measures)
+
+
+def merge_all(cubes, measures=MEASURES):
+    """Merge partial cubes into one.
+
+    The merged axes are sized once up front, so no partial triggers a
+    reallocation; the order of ``cubes`` does not affect the result.
+    """
+    cubes = [cube for cube in cubes if len(cube.dates)]
+    merged = EntryCube.empty(measures)
+    if not cubes:
+        return merged
+    merged._extend_dates(min(cube.dates[0] for cube in cubes), max(cube.dates[-1] for cube in cubes))
+    for attr, axis in (('groups', 3), ('classes', 4)):
+        merged._extend_labels(attr, axis, sorted(set().union(*(getattr(cube, attr) for cube in cubes))))
+    merged._extend_periods(sorted(set().union(*(cube.periods for cube in cubes))))
+    for cube in cubes:
+        merged.merge(cube)
+    return merged
+
+
+def from_frame_parallel(df, by='month', workers=WORKERS, measures=MEASURES):
+    """Parallel equivalent of ``EntryCube.from_frame(df)`` over calendar partitions.
+
+    The frame's cube columns are written once to a temporary Arrow store
+    that the workers memory-map, so no rows are pickled.
+    """
+    if workers <= 1 or df.empty:
+        return EntryCube.from_frame(df, measures)
+    from mta.store import publish
+
+    with tempfile.TemporaryDirectory(prefix="mta-parallel-") as tmp:
+        path = publish(df[CUBE_COLUMNS], "partitions", os.path.join(tmp, "entries.arrow"))
+        return _from_store(path, partition_bounds(df, by), workers, measures)
+
+
+def from_store_parallel(path, by='month', workers=WORKERS, measures=MEASURES):
+    """Like ``from_frame_parallel`` for the shared Arrow store at ``path`` (see mta/store.py).
+
+    Workers memory-map the store and cut their own partition, so only the
+    partition bounds cross process boundaries instead of pickled rows.
+    """
+    from mta.store import open_entries
+
+    _, df = open_entries(path)
+    if workers <= 1:
+        return EntryCube.from_frame(df, measures)
+    return _from_store(path, partition_bounds(df, by), workers, measures)
+
+
+def aggregate_csv_parallel(source, workers=WORKERS, chunksize=500_000, start=None, end=CUTOFF_DATE, filters=None):
+    """Parallel equivalent of ``mta.cube.aggregate_csv``.
+
+    The parent parses chunks while up to ``workers`` processes scatter them
+    into partial cubes; at most ``2 * workers`` chunks are in flight.
+    """
+    chunks = stream_entries(source, chunksize, start=start, end=end, filters=filters)
+    if workers <= 1:
+        return EntryCube.from_chunks(chunks)
+    cube = EntryCube.empty()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(_partial, chunk[CUBE_COLUMNS], MEASURES))
+            if len(pending) >= 2 * workers:
+                cube.merge(pending.pop(0).result())
+        for future in pending:
+            cube.merge(future.result())
+    return cube
+
+
+def same_cube(a, b):
+    """True when two cubes hold identical labels and identical sums."""
+    return (
+        list(a.dates) == list(b.dates)
+        and (a.groups, a.classes, a.periods, a.measures) == (b.groups, b.classes, b.periods, b.measures)
+        and a.group_region == b.group_region
+        and a.data.dtype == b.data.dtype
+        and np.array_equal(a.data, b.data)
+        and np.array_equal(a.period, b.period)
+    )
+
+
+if __name__ == "__main__":
+    from mta.data import prepare_entries, read_entries_csv
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=DATA_SOURCE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--by", choices=["month", "week"], default="month")
+    args = parser.parse_args()
+
+    df = prepare_entries(read_entries_csv(raw_csv_path(args.source)), end=None)
+    t = time.perf_counter()
+    serial = EntryCube.from_frame(df)
+    t_serial = time.perf_counter() - t
+    t = time.perf_counter()
+    parallel = from_frame_parallel(df, args.by, args.workers)
+    t_parallel = time.perf_counter() - t
+    print(f"serial {t_serial:.3f}s, {args.workers} workers by {args.by} {t_parallel:.3f}s, "
+          f"identical: {same_cube(serial, parallel)}")
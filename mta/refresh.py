@@ -0,0 +1,170 @@
+"""Incremental maintenance of the stored aggregate cube.
+
+The MTA publishes new 10-minute rows every day.  Instead of re-reading the
+whole history, ``refresh`` folds a batch of new (or re-delivered, or
+revised) rows into the cube stored under ``CUBE_PATH``.  Each 10-minute
+block in the batch replaces whatever the cube held for it, so applying the
+same batch twice leaves the cube (and its version, which keys every
+memoized section) unchanged.  A refresh with no stored cube starts from an
+empty one.
+
+The cube is stored as one ``YYYY-MM.npz`` chunk per calendar month next to
+a ``cube.json`` holding the version, so a batch reads and rewrites only the
+months it touches and its cost depends on the batch size, not on the
+length of the history.  ``load_cube`` merges the chunks back into one cube.
+
+Seed the store once from the full history, then apply daily batches::
+
+    python -m mta.refresh --seed MTA_Entries.csv
+    python -m mta.refresh new_rows.csv
+"""
+import argparse
+import copy
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from mta.cube import EntryCube
+from mta.data import (
+    CACHE_DIR, DATA_SOURCE, INGEST_COLUMNS, INGEST_DTYPES,
+    data_version, prepare_entries, raw_csv_path, read_entries_csv, time_slice,
+)
+from mta.parallel import aggregate_csv_parallel, merge_all, partition_bounds, same_cube
+
+CUBE_PATH = os.environ.get("MTA_CUBE_PATH", os.path.join(CACHE_DIR, "entry_cube"))
+
+
+def _batch_digest(df):
+    return pd.util.hash_pandas_object(df[INGEST_COLUMNS], index=False).to_numpy().tobytes()
+
+
+def _chunk_path(cube_path, month):
+    return os.path.join(cube_path, f"{month:%Y-%m}.npz")
+
+
+def _meta_path(cube_path):
+    return os.path.join(cube_path, "cube.json")
+
+
+def _read_meta(cube_path):
+    with open(_meta_path(cube_path)) as f:
+        return json.load(f)
+
+
+def _write_meta(cube_path, meta):
+    tmp = _meta_path(cube_path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, _meta_path(cube_path))
+
+
+def _isoformat(date):
+    return None if date is None else f"{date:%Y-%m-%d}"
+
+
+def cube_version(cube_path=CUBE_PATH):
+    """Version of the stored cube; raises FileNotFoundError if it was never seeded."""
+    return _read_meta(cube_path)['version']
+
+
+def load_cube(cube_path=CUBE_PATH):
+    """Merge every month chunk under ``cube_path`` into one cube."""
+    meta = _read_meta(cube_path)
+    cube = merge_all(EntryCube.load(path) for path in sorted(glob.glob(os.path.join(cube_path, "*.npz"))))
+    cube.version = meta['version']
+    return cube
+
+
+def save_cube(cube, cube_path=CUBE_PATH):
+    """Write ``cube`` as month chunks under ``cube_path``, replacing whatever was stored."""
+    os.makedirs(cube_path, exist_ok=True)
+    months = []
+    if len(cube.dates):
+        months = pd.date_range(cube.dates[0].to_period('M').start_time, cube.dates[-1], freq='MS')
+    written = set()
+    for month in months:
+        path = _chunk_path(cube_path, month)
+        cube.between(month, month + pd.offsets.MonthEnd(0)).save(path)
+        written.add(path)
+    for path in set(glob.glob(os.path.join(cube_path, "*.npz"))) - written:
+        os.remove(path)
+    _write_meta(cube_path, {'version': cube.version, 'last_toll_date': _isoformat(cube.last_toll_date)})
+
+
+def seed(source=DATA_SOURCE, cube_path=CUBE_PATH):
+    """Build the stored cube from the full history of ``source``."""
+    cube = aggregate_csv_parallel(raw_csv_path(source), end=None)
+    cube.version = data_version(source, build_snapshot=False)
+    save_cube(cube, cube_path)
+    return cube
+
+
+def refresh(batch, cube_path=CUBE_PATH):
+    """Fold a batch of new or revised rows into the stored cube.
+
+    ``batch`` is a CSV path or a raw DataFrame in the MTA export schema.
+    Only the month chunks holding the batch's days are read and, if their
+    sums change, rewritten.  Returns a summary of what changed, including
+    the new ``version``.
+    """
+    if isinstance(batch, pd.DataFrame):
+        batch = batch[INGEST_COLUMNS].astype(INGEST_DTYPES)
+    else:
+        batch = read_entries_csv(batch)
+    batch = prepare_entries(batch, end=None)
+
+    try:
+        meta = _read_meta(cube_path)
+    except FileNotFoundError:
+        meta = {'version': None, 'last_toll_date': None}
+    last = None if meta['last_toll_date'] is None else pd.Timestamp(meta['last_toll_date'])
+    days = batch['Toll Date'].unique()
+
+    changed = {}
+    for month in partition_bounds(batch, 'month'):
+        path = _chunk_path(cube_path, month)
+        chunk = EntryCube.load(path) if os.path.exists(path) else EntryCube.empty()
+        # Kept to tell a revision from a redelivery
+        before = copy.deepcopy(chunk)
+        chunk.add(time_slice(batch, month, month + pd.offsets.MonthBegin(1) - pd.Timedelta(1, 'ns')), replace=True)
+        if not same_cube(chunk, before):
+            changed[path] = chunk
+
+    summary = {
+        'rows': len(batch),
+        'new_days': int(sum(last is None or d > last for d in days)),
+        'revised_days': int(sum(last is not None and d <= last for d in days)),
+        'changed': bool(changed),
+        'version': meta['version'],
+    }
+    if changed:
+        digest = hashlib.sha256((meta['version'] or "").encode())
+        digest.update(_batch_digest(batch))
+        summary['version'] = digest.hexdigest()[:16]
+        os.makedirs(cube_path, exist_ok=True)
+        for path, chunk in changed.items():
+            chunk.save(path)
+        latest = max(d for d in [last, *(chunk.last_toll_date for chunk in changed.values())] if d is not None)
+        # The version is written last: readers key their caches on it
+        _write_meta(cube_path, {'version': summary['version'], 'last_toll_date': _isoformat(latest)})
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=DATA_SOURCE, help="CSV of new rows (or the full history with --seed)")
+    parser.add_argument("--seed", action="store_true", help="rebuild the stored cube from the full history")
+    parser.add_argument("--cube", default=CUBE_PATH, help="directory of the stored cube")
+    args = parser.parse_args()
+
+    if args.seed:
+        cube = seed(args.source, args.cube)
+        print(f"Seeded {args.cube}: {len(cube.dates)} days, version {cube.version}")
+    else:
+        summary = refresh(args.source, args.cube)
+        print(f"Applied {summary['rows']} rows ({summary['new_days']} new days, "
+              f"{summary['revised_days']} revised); version {summary['version']}"
+              f"{'' if summary['changed'] else ' (unchanged)'}")
@@ -0,0 +1,233 @@
+"""Ingest from the NY Open Data SODA API (data.ny.gov dataset t6yz-b64h).
+
+The GitHub CSV mirror is a frozen copy; the live dataset is served by the
+SODA API.  ``ingest`` splits the requested dates into one ``$where`` window
+per day, fetches up to ``concurrency`` windows at once (each paged with
+``$limit``/``$offset`` in a stable ``$order``) and asks only for the
+ingest columns, gzip-compressed, so a backfill is limited by bandwidth
+rather than by round trips.  Failed requests (timeouts, 429, 5xx) are
+retried with exponential backoff, honouring ``Retry-After``.
+
+Every finished day is checkpointed as a prepared Parquet part under
+``.cache/soda/``, so an interrupted backfill resumes where it stopped and
+a daily run only downloads new days (the latest day in the dataset may
+still be filling in, so it is always fetched again).  The parts are then
+published to the shared Arrow store (see mta/store.py)::
+
+    python -m mta.soda                                  # backfill to the study cutoff
+    python -m mta.soda --start 2025-01-05 --end '' --concurrency 16
+    MTA_INGEST=shared streamlit run visualization.py
+
+``python -m mta.soda_mock`` serves a local stand-in for offline runs.
+Set ``MTA_SODA_APP_TOKEN`` to send a Socrata app token (higher rate limits).
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from mta.data import CACHE_DIR, CUTOFF_DATE, INGEST_COLUMNS, INGEST_DTYPES, prepare_entries, time_slice
+from mta.store import STORE_PATH, publish
+from mta.trace import span, traced
+
+DATASET = "t6yz-b64h"
+SODA_URL = os.environ.get("MTA_SODA_URL", f"https://data.ny.gov/resource/{DATASET}.csv")
+APP_TOKEN = os.environ.get("MTA_SODA_APP_TOKEN")
+SODA_DIR = os.path.join(CACHE_DIR, "soda")
+
+PAGE_SIZE = 50_000
+CONCURRENCY = 8
+RETRIES = 5
+TIMEOUT = 120
+# Floating timestamps as the API returns them
+SODA_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+# SODA field name -> column name in the CSV export
+SODA_FIELDS = {
+    'toll_date': 'Toll Date',
+    'toll_hour': 'Toll Hour',
+    'toll_10_minute_block': 'Toll 10 Minute Block',
+    'minute_of_hour': 'Minute of Hour',
+    'hour_of_day': 'Hour of Day',
+    'day_of_week_int': 'Day of Week Int',
+    'day_of_week': 'Day of Week',
+    'toll_week': 'Toll Week',
+    'time_period': 'Time Period',
+    'vehicle_class': 'Vehicle Class',
+    'detection_group': 'Detection Group',
+    'detection_region': 'Detection Region',
+    'crz_entries': 'CRZ Entries',
+    'excluded_roadway_entries': 'Excluded Roadway Entries',
+}
+_FIELD_OF = {column: field for field, column in SODA_FIELDS.items()}
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def _soda_time(ts):
+    return pd.Timestamp(ts).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def soda_get(url, params, retries=RETRIES, timeout=TIMEOUT):
+    """Body of one SODA request (decompressed), retrying transient failures.
+
+    Returns ``(body, wire_bytes)`` where ``wire_bytes`` is what was
+    actually transferred.
+    """
+    request = urllib.request.Request(f"{url}?{urllib.parse.urlencode(params)}")
+    request.add_header("Accept-Encoding", "gzip")
+    if APP_TOKEN:
+        request.add_header("X-App-Token", APP_TOKEN)
+    for attempt in range(retries + 1):
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                raw = response.read()
+                gzipped = response.headers.get("Content-Encoding") == "gzip"
+            return (gzip.decompress(raw) if gzipped else raw), len(raw)
+        except urllib.error.HTTPError as e:
+            if e.code not in _RETRY_STATUS or attempt == retries:
+                raise
+            wait = e.headers.get("Retry-After")
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            if attempt == retries:
+                raise
+            wait = None
+        # Exponential backoff with jitter, unless the server said how long to wait
+        time.sleep(float(wait) if wait and wait.isdigit() else min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1))
+
+
+def date_bounds(url=SODA_URL):
+    """First and last Toll Date in the dataset."""
+    body, _ = soda_get(url, {'$select': 'min(toll_date) AS first, max(toll_date) AS last'})
+    bounds = pd.read_csv(io.BytesIO(body))
+    return pd.Timestamp(bounds['first'].iloc[0]).normalize(), pd.Timestamp(bounds['last'].iloc[0]).normalize()
+
+
+@traced("soda.fetch_window")
+def fetch_window(url, start, end, page_size=PAGE_SIZE):
+    """Prepared rows with ``start <= Toll 10 Minute Block < end``, paged; returns ``(df, wire_bytes)``."""
+    params = {
+        '$select': ', '.join(_FIELD_OF[col] for col in INGEST_COLUMNS),
+        '$where': (f"toll_10_minute_block >= '{_soda_time(start)}' "
+                   f"AND toll_10_minute_block < '{_soda_time(end)}'"),
+        '$order': ':id',
+        '$limit': page_size,
+    }
+    dtypes = {_FIELD_OF[col]: dtype for col, dtype in INGEST_DTYPES.items()}
+    pages, wire, offset = [], 0, 0
+    while True:
+        body, size = soda_get(url, {**params, '$offset': offset})
+        wire += size
+        page = pd.read_csv(io.BytesIO(body), dtype=dtypes)
+        pages.append(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    df = pd.concat(pages, ignore_index=True) if len(pages) > 1 else pages[0]
+    df = df.rename(columns=SODA_FIELDS)[INGEST_COLUMNS]
+    for col, dtype in INGEST_DTYPES.items():
+        if dtype == 'category':
+            df[col] = df[col].astype('category')
+    return prepare_entries(df, end=None, hour_format=SODA_TIME_FORMAT), wire
+
+
+def checkpoint_dir(url=SODA_URL, directory=SODA_DIR):
+    """Directory of the per-day parts for ``url`` (one per source, so mirrors never mix)."""
+    return os.path.join(directory, hashlib.sha256(url.encode()).hexdigest()[:12])
+
+
+def _part_path(parts, day):
+    return os.path.join(parts, f"{day:%Y-%m-%d}.parquet")
+
+
+def _write_part(path, df):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _assemble(frames):
+    """Concatenate day frames (oldest first) into one prepared frame with shared categories."""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return prepare_entries(pd.DataFrame({col: pd.Series(dtype='object') for col in INGEST_COLUMNS}), end=None)
+    df = pd.concat(frames, ignore_index=True)
+    for col, dtype in INGEST_DTYPES.items():
+        if dtype == 'category' and col != 'Toll 10 Minute Block':
+            df[col] = df[col].astype('category')
+    return df
+
+
+def frame_version(df):
+    """Content version of a prepared frame (16 hex digits, like ``data_version``)."""
+    hashes = pd.util.hash_pandas_object(df[INGEST_COLUMNS], index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+def ingest(url=SODA_URL, start=None, end=CUTOFF_DATE, concurrency=CONCURRENCY, page_size=PAGE_SIZE,
+           directory=SODA_DIR, store=STORE_PATH, force=False):
+    """Fetch ``[start, end]`` from the SODA API into day parts and publish them to ``store``.
+
+    Days already checkpointed are skipped unless ``force``.  Returns a dict
+    with the published version and what was transferred.
+    """
+    t = time.perf_counter()
+    first, last = date_bounds(url)
+    lo = first if start is None else max(first, pd.Timestamp(start).normalize())
+    hi = last if end is None else min(last, pd.Timestamp(end).normalize())
+    days = list(pd.date_range(lo, hi, freq='D'))
+    parts = checkpoint_dir(url, directory)
+    os.makedirs(parts, exist_ok=True)
+    todo = [day for day in days if force or day >= last or not os.path.exists(_part_path(parts, day))]
+
+    def fetch(day):
+        df, wire = fetch_window(url, day, day + pd.Timedelta(days=1), page_size)
+        if day < last:
+            _write_part(_part_path(parts, day), df)
+        return day, df, wire
+
+    fresh = {}
+    wire = 0
+    with span("soda.ingest", days=len(days), fetched=len(todo)):
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for day, df, size in pool.map(fetch, todo):
+                fresh[day] = df
+                wire += size
+        frames = [fresh[day] if day in fresh else pd.read_parquet(_part_path(parts, day)) for day in days]
+        df = time_slice(_assemble(frames), start, end).reset_index(drop=True)
+        version = frame_version(df)
+        publish(df, version, store)
+    return {
+        'version': version,
+        'rows': len(df),
+        'days': len(days),
+        'fetched_days': len(todo),
+        'wire_bytes': wire,
+        'seconds': time.perf_counter() - t,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=SODA_URL)
+    parser.add_argument("--start", default=None, help="first Toll Date (default: the dataset's first)")
+    parser.add_argument("--end", default=str(CUTOFF_DATE), help="last toll time; '' for everything")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--force", action="store_true", help="refetch days that are already checkpointed")
+    args = parser.parse_args()
+
+    result = ingest(args.url, args.start, args.end or None, args.concurrency, args.page_size,
+                    store=args.store, force=args.force)
+    print(f"{result['rows']:,} rows over {result['days']} days ({result['fetched_days']} fetched, "
+          f"{result['wire_bytes'] / 1e6:.1f} MB) in {result['seconds']:.1f}s -> {args.store} "
+          f"version {result['version']}")
@@ -0,0 +1,154 @@
+"""Local stand-in for the data.ny.gov SODA API, for running mta.soda offline.
+
+Serves a frame in the CSV export schema (a local CSV, or synthetic days
+from mta/synthetic.py) at ``/resource/t6yz-b64h.csv`` and understands the
+part of SoQL that mta.soda sends: ``$select`` of fields or ``min()``/``max()``
+aggregates, ``$where`` comparisons joined by ``AND``, ``$limit``,
+``$offset`` and gzip.  ``failure_rate`` answers a share of requests with
+503/429 and ``latency`` delays every response, to exercise retries and
+bounded concurrency::
+
+    python -m mta.soda_mock --days 31 --port 8765 --failure-rate 0.1 --latency 0.2
+    python -m mta.soda --url http://127.0.0.1:8765/resource/t6yz-b64h.csv
+"""
+import argparse
+import gzip
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from mta.data import TOLL_HOUR_FORMAT
+from mta.soda import DATASET, SODA_FIELDS
+from mta.synthetic import DATE_FORMAT, generate
+
+_ISO = '%Y-%m-%dT%H:%M:%S.000'
+_AGGREGATE = re.compile(r"(min|max)\((\w+)\)\s+AS\s+(\w+)", re.IGNORECASE)
+_CONDITION = re.compile(r"(\w+)\s*(>=|<=|>|<|=)\s*'([^']*)'")
+_COMPARE = {
+    '>=': lambda col, v: col >= v, '<=': lambda col, v: col <= v,
+    '>': lambda col, v: col > v, '<': lambda col, v: col < v, '=': lambda col, v: col == v,
+}
+
+
+def to_soda(df):
+    """An export-schema frame with SODA field names and floating timestamps."""
+    soda = df.rename(columns={column: field for field, column in SODA_FIELDS.items()})
+    for field in ('toll_date', 'toll_week'):
+        soda[field] = pd.to_datetime(soda[field], format=DATE_FORMAT)
+    for field in ('toll_hour', 'toll_10_minute_block'):
+        soda[field] = pd.to_datetime(soda[field], format=TOLL_HOUR_FORMAT)
+    return soda.reset_index(drop=True)
+
+
+class MockSodaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, frame, port=0, failure_rate=0.0, latency=0.0, seed=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.frame = to_soda(frame)
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.requests = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/resource/{DATASET}.csv"
+
+    def start(self):
+        """Serve from a background thread; returns the server."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self.shutdown()
+        super().__exit__(*exc)
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.failure_rate
+            self.failures += fail
+            return fail
+
+    def query(self, params):
+        """CSV body answering the SoQL ``params``."""
+        frame = self.frame
+        where = params.get('$where', [''])[0]
+        if where:
+            mask = pd.Series(True, index=frame.index)
+            for field, op, value in _CONDITION.findall(where):
+                col = frame[field]
+                if pd.api.types.is_datetime64_any_dtype(col):
+                    value = pd.Timestamp(value)
+                elif pd.api.types.is_numeric_dtype(col):
+                    value = float(value)
+                mask &= _COMPARE[op](col, value)
+            frame = frame[mask]
+
+        select = params.get('$select', ['*'])[0]
+        aggregates = _AGGREGATE.findall(select)
+        if aggregates:
+            row = {alias: getattr(frame[field], func.lower())() for func, field, alias in aggregates}
+            return pd.DataFrame([row]).to_csv(index=False, date_format=_ISO)
+        if select.strip() != '*':
+            frame = frame[[field.strip() for field in select.split(',')]]
+
+        offset = int(params.get('$offset', ['0'])[0])
+        limit = int(params.get('$limit', ['1000'])[0])
+        return frame.iloc[offset:offset + limit].to_csv(index=False, date_format=_ISO)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        if url.path != f"/resource/{DATASET}.csv":
+            self.send_error(404)
+            return
+        if server.latency:
+            time.sleep(server.latency)
+        if server.should_fail():
+            self.send_response(random.choice([429, 503]))
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        body = server.query(parse_qs(url.query)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", help="serve this export CSV (default: synthetic data)")
+    parser.add_argument("--start", default="2025-01-05", help="first synthetic Toll Date")
+    parser.add_argument("--days", type=int, default=31, help="synthetic days to serve")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    frame = pd.read_csv(args.csv) if args.csv else pd.concat(generate(args.start, args.days), ignore_index=True)
+    with MockSodaServer(frame, args.port, args.failure_rate, args.latency) as server:
+        print(f"serving {len(frame):,} rows at {server.url}")
+        server.serve_forever()
@@ -0,0 +1,94 @@
+"""Memory-mapped Arrow IPC store of the prepared entries, shared by processes.
+
+Every app worker (Streamlit server processes, Dash/gunicorn workers, the
+pool in mta/parallel.py) opens the same uncompressed Arrow IPC (Feather v2)
+file with ``mmap``.  Numeric and timestamp columns come back as read-only
+views of the mapping, so the OS page cache holds one copy of the data
+however many processes read it, and opening costs no parse or decode.
+
+A new data version is published by writing a temporary file next to the
+store and ``os.replace``-ing it over ``STORE_PATH``.  Readers always see a
+complete file: processes that already mapped the old one keep their
+inode until they reopen, and the version recorded in the file's schema
+metadata tells them when to::
+
+    python -m mta.store            # publish the current snapshot
+    MTA_INGEST=shared streamlit run visualization.py
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from mta.data import CACHE_DIR, DATA_SOURCE, data_version, read_snapshot
+from mta.trace import traced
+
+STORE_PATH = os.environ.get("MTA_STORE_PATH", os.path.join(CACHE_DIR, "entries.arrow"))
+_VERSION_KEY = b"mta_version"
+
+
+def publish(df, version, path=STORE_PATH):
+    """Atomically replace the store at ``path`` with ``df`` as ``version``."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _VERSION_KEY: version.encode()})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def stored_version(path=STORE_PATH):
+    """Version of the published store (read from the file footer), or None if there is none."""
+    try:
+        with pa.memory_map(path, "r") as source:
+            metadata = ipc.open_file(source).schema.metadata or {}
+    except FileNotFoundError:
+        return None
+    version = metadata.get(_VERSION_KEY)
+    return version.decode() if version else None
+
+
+@traced("store.open")
+def open_entries(path=STORE_PATH, start=None, end=None):
+    """``(version, DataFrame)`` of the store, backed by a read-only memory map.
+
+    The frame is read-only where it is zero-copy; pandas copies a column on
+    the first write, so callers can still derive new columns.  ``start`` and
+    ``end`` keep only rows with ``start <= Toll 10 Minute Block <= end``
+    (the store is sorted, as ``prepare_entries`` leaves the frame), cut
+    before any column is converted.
+    """
+    source = pa.memory_map(path, "r")
+    table = ipc.open_file(source).read_all()
+    version = (table.schema.metadata or {}).get(_VERSION_KEY, b"").decode() or None
+    if start is not None or end is not None:
+        blocks = table.column('Toll 10 Minute Block').to_numpy()
+        lo = 0 if start is None else blocks.searchsorted(np.datetime64(pd.Timestamp(start)), side='left')
+        hi = len(blocks) if end is None else blocks.searchsorted(np.datetime64(pd.Timestamp(end)), side='right')
+        table = table.slice(lo, hi - lo)
+    return version, table.to_pandas(split_blocks=True)
+
+
+def publish_snapshot(source=DATA_SOURCE, path=STORE_PATH):
+    """Publish the current Parquet snapshot of ``source`` unless the store already holds it."""
+    version = data_version(source)
+    if stored_version(path) != version:
+        publish(read_snapshot(version), version, path)
+    return version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=DATA_SOURCE)
+    parser.add_argument("--store", default=STORE_PATH)
+    args = parser.parse_args()
+    print(f"{args.store}: version {publish_snapshot(args.source, args.store)}")
@@ -0,0 +1,199 @@
+"""Deterministic synthetic MTA_Entries data in the exact export schema.
+
+For benchmarks and tests at sizes the real extract does not reach.  Each
+day is drawn from its own ``(seed, day)`` random stream, so the output is
+identical however it is chunked, and any day can be regenerated alone.
+Counts are Poisson around a per entry point daily profile: weekday
+commute peaks (AM-heavy into Manhattan from New Jersey and Brooklyn,
+PM-heavy on the 60th St crossings), a flatter midday weekend hump, and
+excluded roadway traffic only on FDR Drive and the West Side Highway::
+
+    python -m mta.synthetic MTA_Entries.csv --days 365
+    python -m mta.synthetic entries.parquet --rows 1e8
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from mta.data import TOLL_HOUR_FORMAT, TOLL_TIMEZONE
+
+COLUMNS = [
+    'Toll Date', 'Toll Hour', 'Toll 10 Minute Block', 'Minute of Hour', 'Hour of Day',
+    'Day of Week Int', 'Day of Week', 'Toll Week', 'Time Period', 'Vehicle Class',
+    'Detection Group', 'Detection Region', 'CRZ Entries', 'Excluded Roadway Entries',
+]
+DATE_FORMAT = '%m/%d/%Y'
+
+# Detection Group -> (Detection Region, mean entries per weekday, AM share of commute peaks)
+ENTRY_POINTS = {
+    'Brooklyn Bridge': ('Brooklyn', 45_000, 0.65),
+    'Manhattan Bridge': ('Brooklyn', 40_000, 0.65),
+    'Williamsburg Bridge': ('Brooklyn', 38_000, 0.6),
+    'Hugh L. Carey Tunnel': ('Brooklyn', 25_000, 0.65),
+    'Queensboro Bridge': ('Queens', 42_000, 0.6),
+    'Queens Midtown Tunnel': ('Queens', 30_000, 0.6),
+    'Lincoln Tunnel': ('New Jersey', 50_000, 0.75),
+    'Holland Tunnel': ('New Jersey', 35_000, 0.75),
+    'East 60th St': ('East 60th St', 48_000, 0.4),
+    'West 60th St': ('West 60th St', 30_000, 0.4),
+    'FDR Drive at 60th St': ('FDR Drive', 20_000, 0.45),
+    'West Side Highway at 60th St': ('West Side Highway', 18_000, 0.45),
+}
+# Vehicle Class -> share of entries
+VEHICLE_CLASSES = {
+    '1 - Cars, Pickups and Vans': 0.72,
+    '2 - Single-Unit Trucks': 0.04,
+    '3 - Multi-Unit Trucks': 0.01,
+    '4 - Buses': 0.02,
+    '5 - Motorcycles': 0.01,
+    'TLC Taxi/FHV': 0.20,
+}
+# Excluded roadway entries relative to CRZ entries, by Detection Group
+EXCLUDED_RATIO = {'FDR Drive at 60th St': 1.5, 'West Side Highway at 60th St': 1.2}
+WEEKEND_FACTOR = 0.8
+
+_GROUPS = np.array(list(ENTRY_POINTS))
+_REGIONS = np.array([region for region, _, _ in ENTRY_POINTS.values()])
+_CLASSES = np.array(list(VEHICLE_CLASSES))
+# Blocks on an ordinary day; New York DST days have 138 (spring) or 150 (fall)
+BLOCKS_PER_DAY = 144
+ROWS_PER_DAY = BLOCKS_PER_DAY * len(_GROUPS) * len(_CLASSES)
+
+
+def _bump(hours, center, width):
+    return np.exp(-0.5 * ((hours - center) / width) ** 2)
+
+
+def daily_profile(weekend, hours=None):
+    """Share of each entry point's daily entries falling in each 10-minute block, shape (blocks, groups).
+
+    ``hours`` is the wall-clock hour at the middle of each block (an
+    ordinary 144-block day by default).
+    """
+    hours = (np.arange(BLOCKS_PER_DAY) + 0.5) / 6 if hours is None else np.asarray(hours)
+    base = 0.15 + 0.85 * _bump(hours, 13.5, 4.5)
+    if weekend:
+        profile = np.repeat(base[:, None], len(_GROUPS), axis=1)
+    else:
+        am_share = np.array([am for _, _, am in ENTRY_POINTS.values()])
+        peaks = am_share * _bump(hours, 8, 1.3)[:, None] + (1 - am_share) * _bump(hours, 17.5, 1.5)[:, None]
+        profile = 0.5 * base[:, None] + 1.5 * peaks
+    return profile / profile.sum(axis=0)
+
+
+def is_peak(dates, hours):
+    """Congestion pricing peak: 5am-9pm on weekdays, 9am-9pm on weekends."""
+    weekend = dates.dayofweek >= 5
+    return (hours < 21) & (hours >= np.where(weekend, 9, 5))
+
+
+def generate_day(date, seed=0):
+    """All rows for one day, in time order, as a DataFrame in the export schema."""
+    date = pd.Timestamp(date).normalize()
+    day = (date - pd.Timestamp('1970-01-01')).days
+    rng = np.random.default_rng([seed, day])
+    weekend = date.dayofweek >= 5
+
+    volume = np.array([daily for _, daily, _ in ENTRY_POINTS.values()], dtype=float)
+    volume *= (WEEKEND_FACTOR if weekend else 1.0) * rng.lognormal(0, 0.05)
+    shares = np.array(list(VEHICLE_CLASSES.values()))
+    # Blocks follow New York wall-clock time: the spring-forward day skips
+    # 2:00-2:50 AM and the fall-back day repeats 1:00-1:50 AM.
+    local = pd.date_range(date.tz_localize(TOLL_TIMEZONE), (date + pd.Timedelta(days=1)).tz_localize(TOLL_TIMEZONE),
+                          freq='10min', inclusive='left')
+    blocks = local.tz_localize(None)
+    n_blocks = len(blocks)
+    wall_hours = blocks.hour.to_numpy() + (blocks.minute.to_numpy() + 5) / 60
+
+    expected = daily_profile(weekend, wall_hours)[:, :, None] * volume[None, :, None] * shares[None, None, :]
+    crz = rng.poisson(expected).astype(np.int32)
+    excluded_ratio = np.array([EXCLUDED_RATIO.get(g, 0.0) for g in _GROUPS])
+    excluded = rng.poisson(expected * excluded_ratio[None, :, None]).astype(np.int32)
+
+    block_labels = np.asarray(blocks.strftime(TOLL_HOUR_FORMAT), dtype=object)
+    hour_labels = np.asarray(blocks.floor('h').strftime(TOLL_HOUR_FORMAT), dtype=object)
+    peak = np.where(is_peak(blocks, blocks.hour.to_numpy()), 'Peak', 'Overnight').astype(object)
+    week_start = date - pd.Timedelta(days=(date.dayofweek + 1) % 7)
+
+    per_block = len(_GROUPS) * len(_CLASSES)
+    b = np.repeat(np.arange(n_blocks), per_block)
+    g = np.tile(np.repeat(np.arange(len(_GROUPS)), len(_CLASSES)), n_blocks)
+    c = np.tile(np.arange(len(_CLASSES)), n_blocks * len(_GROUPS))
+    n = len(b)
+    return pd.DataFrame({
+        'Toll Date': np.full(n, date.strftime(DATE_FORMAT), dtype=object),
+        'Toll Hour': hour_labels[b],
+        'Toll 10 Minute Block': block_labels[b],
+        'Minute of Hour': (blocks.minute.to_numpy()[b]).astype(np.int32),
+        'Hour of Day': (blocks.hour.to_numpy()[b]).astype(np.int32),
+        'Day of Week Int': np.full(n, (date.dayofweek + 1) % 7 + 1, dtype=np.int32),
+        'Day of Week': np.full(n, date.day_name(), dtype=object),
+        'Toll Week': np.full(n, week_start.strftime(DATE_FORMAT), dtype=object),
+        'Time Period': peak[b],
+        'Vehicle Class': _CLASSES[c].astype(object),
+        'Detection Group': _GROUPS[g].astype(object),
+        'Detection Region': _REGIONS[g].astype(object),
+        'CRZ Entries': crz.reshape(-1),
+        'Excluded Roadway Entries': excluded.reshape(-1),
+    }, columns=COLUMNS)
+
+
+def days_for_rows(rows):
+    """Number of days for about ``rows`` rows (exact away from DST changes)."""
+    return max(1, -(-int(rows) // ROWS_PER_DAY))
+
+
+def generate(start='2025-01-05', days=31, seed=0, chunk_days=7):
+    """Yield the synthetic export ``chunk_days`` days at a time, oldest first."""
+    dates = pd.date_range(start, periods=days, freq='D')
+    for first in range(0, days, chunk_days):
+        yield pd.concat([generate_day(d, seed) for d in dates[first:first + chunk_days]], ignore_index=True)
+
+
+def write_csv(path, **kwargs):
+    """Stream the synthetic export to a CSV at ``path`` (see ``generate`` for arguments)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="") as f:
+        for i, chunk in enumerate(generate(**kwargs)):
+            chunk.to_csv(f, header=i == 0, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def write_parquet(path, **kwargs):
+    """Stream the synthetic export to a Parquet file at ``path``, one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer = None
+    try:
+        for chunk in generate(**kwargs):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="output file (.csv or .parquet)")
+    parser.add_argument("--start", default="2025-01-05", help="first Toll Date")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--days", type=int, default=31)
+    size.add_argument("--rows", type=float, help="generate at least this many rows instead of --days")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-days", type=int, default=7, help="days held in memory at a time")
+    args = parser.parse_args()
+
+    days = days_for_rows(args.rows) if args.rows else args.days
+    write = write_parquet if args.path.endswith(".parquet") else write_csv
+    write(args.path, start=args.start, days=days, seed=args.seed, chunk_days=args.chunk_days)
+    print(f"Wrote {days * ROWS_PER_DAY:,} rows ({days} days) to {args.path}")
@@ -0,0 +1,242 @@
+"""Entry time series for the Dash dashboard, sized for the browser.
+
+``update_graph`` used to hand every filtered raw row to ``px.line``, so the
+payload grew with the date range and the number of vehicle classes.  Here
+the rows are summed into one value per time bucket (the bucket widens with
+the selected span) and, if that is still more than ``MAX_POINTS`` values,
+thinned with Largest-Triangle-Three-Buckets, which keeps peaks and troughs.
+
+Long spans stay cheap in the browser too: lines with more than
+``WEBGL_POINTS`` points are drawn as WebGL ``scattergl`` traces, and
+weekends are shaded with one rectangle per run of consecutive weekend days
+(or, past ``MAX_SHAPES`` runs, a single filled background trace) instead of
+one shape per date.
+
+``entry_series`` also takes an ``EntryCube`` (the Streamlit app's section
+6), whose per-slot totals stand in for the rows, and an explicit
+resolution instead of the span-based one.
+
+``entry_payload`` packs the same totals, per vehicle class and per hour (or
+10-minute block), into base64 typed arrays for the Dash client-side mode.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+from mta.data import SLOTS_PER_DAY, date_range, day_index
+
+MAX_POINTS = 2000
+# Lines longer than this are drawn with WebGL
+WEBGL_POINTS = 1000
+# Weekend bands drawn as layout shapes; more than this become one background trace
+MAX_SHAPES = 60
+WEEKEND_FILL = 'rgba(211, 211, 211, 0.3)'
+
+ENTRY_COLUMNS = {'CRZ': 'CRZ Entries', 'Excluded Roadway': 'Excluded Roadway Entries'}
+
+# (longest span, bucket width, label) from finest to coarsest
+BUCKETS = [
+    (pd.Timedelta(days=3), pd.Timedelta(minutes=10), '10-Minute'),
+    (pd.Timedelta(days=45), pd.Timedelta(hours=1), 'Hourly'),
+    (pd.Timedelta(days=730), pd.Timedelta(days=1), 'Daily'),
+    (None, pd.Timedelta(days=7), 'Weekly'),
+]
+# Bucket width by label, for a fixed resolution
+RESOLUTIONS = {label: width for _, width, label in BUCKETS}
+
+
+def bucket_for_span(start, end):
+    """Bucket width and label for a date window ``[start, end]``."""
+    span = pd.Timestamp(end) - pd.Timestamp(start) + pd.Timedelta(days=1)
+    for longest, width, label in BUCKETS:
+        if longest is None or span <= longest:
+            return width, label
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling of ``(x, y)`` to ``n_out`` points.
+
+    ``x`` must be increasing and numeric.  The first and last points are
+    always kept; every bucket in between contributes the point forming the
+    largest triangle with the previous pick and the next bucket's mean.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    picks = np.empty(n_out, dtype=np.intp)
+    picks[0], picks[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(area.argmax())
+        picks[i + 1] = prev
+    return picks
+
+
+def day_bands(dates):
+    """Merge dates into ``(start, end)`` bands of consecutive days, ``end`` exclusive."""
+    days = pd.DatetimeIndex(pd.unique(pd.DatetimeIndex(dates).normalize())).sort_values()
+    if days.empty:
+        return []
+    breaks = np.flatnonzero(np.diff(days.to_numpy().astype('datetime64[D]').astype(np.int64)) != 1) + 1
+    starts = days[np.concatenate([[0], breaks])]
+    ends = days[np.concatenate([breaks - 1, [len(days) - 1]])] + pd.Timedelta(days=1)
+    return list(zip(starts, ends))
+
+
+def weekend_bands(dates):
+    """Bands of consecutive Saturdays and Sundays among ``dates``."""
+    dates = pd.DatetimeIndex(dates)
+    return day_bands(dates[dates.dayofweek >= 5])
+
+
+def add_weekend_shading(fig, dates, max_shapes=MAX_SHAPES):
+    """Shade the weekends among ``dates`` behind the traces of ``fig``.
+
+    Up to ``max_shapes`` bands become layout rectangles, added in one
+    update; longer spans get one filled scatter trace under the data, so
+    the figure grows by five numbers per weekend rather than a shape each.
+    """
+    bands = weekend_bands(dates)
+    if len(bands) <= max_shapes:
+        fig.update_layout(shapes=[
+            *fig.layout.shapes,
+            *(dict(type="rect", x0=x0, x1=x1, y0=0, y1=1, yref="paper", fillcolor="lightgray",
+                   opacity=0.3, layer="below", line_width=0) for x0, x1 in bands),
+        ])
+        return fig
+
+    import plotly.graph_objects as go
+
+    top = max((np.nanmax(np.asarray(trace.y, dtype=float)) for trace in fig.data if trace.y is not None and len(trace.y)),
+              default=1.0)
+    x, y = [], []
+    for x0, x1 in bands:
+        x += [x0, x0, x1, x1, None]
+        y += [0, top, top, 0, None]
+    background = go.Scatter(x=x, y=y, fill='toself', fillcolor=WEEKEND_FILL, mode='none',
+                            hoverinfo='skip', showlegend=False, name='Weekend')
+    fig.add_trace(background)
+    fig.data = (fig.data[-1], *fig.data[:-1])
+    return fig
+
+
+def render_mode(n_points):
+    """Plotly Express ``render_mode`` for a line of ``n_points`` points."""
+    return 'webgl' if n_points > WEBGL_POINTS else 'svg'
+
+
+def visible_range(relayout, start_date, end_date):
+    """Date window shown after a zoom or pan (Dash ``relayoutData``), clipped to the selection."""
+    start, end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+    if not relayout or 'xaxis.range[0]' not in relayout:
+        return start, end
+    lo = max(start, pd.Timestamp(relayout['xaxis.range[0]']).normalize())
+    hi = min(end, pd.Timestamp(relayout['xaxis.range[1]']).normalize())
+    return (lo, hi) if lo <= hi else (start, end)
+
+
+def _cube_rows(cube, start, end, column, vehicle_class):
+    """Per (day, slot) totals of an ``EntryCube`` window, with the time keys ``entry_series`` reads."""
+    keys = ['Toll Date', 'Time'] + ([] if vehicle_class == 'All' else ['Vehicle Class'])
+    rows = cube.aggregate(keys, [column], start=start, end=end)
+    rows['Day Index'] = rows['Toll Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    # Time categories are the slot labels in slot order
+    rows['Slot'] = rows['Time'].cat.codes
+    return rows
+
+
+def entry_series(df, start_date, end_date, vehicle_class='All', entry_type='CRZ', max_points=MAX_POINTS,
+                 resolution=None):
+    """Total entries per time bucket for the selected window and vehicle class.
+
+    ``df`` is a prepared frame, a ``PartitionedEntries`` dataset or an
+    ``EntryCube``.  ``resolution`` (a ``RESOLUTIONS`` label) fixes the bucket
+    width; by default it widens with the span.
+
+    Returns ``(series, label)`` where ``series`` has ``Toll Hour`` and the
+    entry column, at most ``max_points`` rows.
+    """
+    column = ENTRY_COLUMNS[entry_type]
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    if isinstance(df, pd.DataFrame):
+        rows = date_range(df, start, end)
+    elif hasattr(df, 'date_window'):
+        # A partitioned dataset (mta/dataset.py): read only this window's partitions and columns
+        rows = df.date_window(start, end, columns=['Vehicle Class', column])
+    else:
+        rows = _cube_rows(df, start, end, column, vehicle_class)
+    if vehicle_class != 'All':
+        rows = rows[rows['Vehicle Class'] == vehicle_class]
+
+    width, label = bucket_for_span(start, end) if resolution is None else (RESOLUTIONS[resolution], resolution)
+    if rows.empty:
+        return pd.DataFrame({'Toll Hour': pd.DatetimeIndex([]), column: []}), label
+
+    # Bucket number from the integer time keys: 10-minute slots since ``start``
+    slots = (rows['Day Index'].to_numpy(dtype=np.int64) - day_index(start)) * SLOTS_PER_DAY + rows['Slot'].to_numpy()
+    codes = slots // (width // pd.Timedelta(minutes=10))
+    totals = np.bincount(codes, weights=rows[column].to_numpy(dtype=np.float64))
+    present = np.bincount(codes) > 0
+    buckets = np.flatnonzero(present)
+    times = start + pd.to_timedelta(buckets * width.value)
+    values = totals[present].astype(np.int64)
+
+    keep = lttb(buckets, values, max_points)
+    return pd.DataFrame({'Toll Hour': times[keep], column: values[keep]}), label
+
+
+# Bucket widths the browser payload can be packed at
+PAYLOAD_STEPS = {'10min': pd.Timedelta(minutes=10), 'h': pd.Timedelta(hours=1)}
+
+
+def entry_payload(df, step='h'):
+    """Entries per ``step`` bucket and vehicle class for both entry types, packed for the browser.
+
+    The grid is dense from the first to the last bucket with any rows; each
+    entry type is a little-endian int32 array of ``len(classes) * n`` values
+    (class-major), base64-encoded so it survives a JSON ``dcc.Store``.
+    ``start`` and ``step`` are in milliseconds since the epoch, with toll
+    times taken as naive wall-clock time.
+    """
+    width = PAYLOAD_STEPS[step]
+    slots_per_bucket = width // pd.Timedelta(minutes=10)
+    buckets = (df['Day Index'].to_numpy(dtype=np.int64) * SLOTS_PER_DAY + df['Slot'].to_numpy()) // slots_per_bucket
+    vehicle = pd.Categorical(df['Vehicle Class'].astype(str))
+    classes = list(vehicle.categories)
+    if not len(buckets):
+        first, n = 0, 0
+    else:
+        first = int(buckets.min())
+        n = int(buckets.max()) - first + 1
+    cells = vehicle.codes.astype(np.int64) * n + (buckets - first)
+    columns = {}
+    for entry_type, column in ENTRY_COLUMNS.items():
+        totals = np.bincount(cells, weights=df[column].to_numpy(dtype=np.float64), minlength=len(classes) * n)
+        if len(totals) and totals.max() > np.iinfo(np.int32).max:
+            raise ValueError(f"{column} per {step} bucket overflows int32; use a finer step")
+        columns[entry_type] = base64.b64encode(totals.astype('<i4').tobytes()).decode('ascii')
+    step_ms = width // pd.Timedelta(milliseconds=1)
+    return {'start': first * step_ms, 'step': step_ms, 'n': n, 'classes': classes, 'columns': columns}
+
+
+def entry_figure(series, entry_type, label):
+    import plotly.express as px
+
+    column = ENTRY_COLUMNS[entry_type]
+    fig = px.line(series,
+                  x='Toll Hour',
+                  y=column,
+                  title=f'{label} {entry_type} Entries (Selected Date Range)',
+                  labels={'Toll Hour': 'Hour of Day', column: f'Total {column}'},
+                  render_mode=render_mode(len(series)))
+    return add_weekend_shading(fig, series['Toll Hour'])
@@ -0,0 +1,157 @@
+"""Lightweight tracing spans for load, aggregation and render steps.
+
+Off by default; ``span`` then returns a shared no-op context after a single
+flag check.  Set ``MTA_TRACE=path.jsonl`` (or call ``enable``) to record
+spans.  Each finished span is appended to the file as one JSON object
+using OpenTelemetry's span field names (traceId, spanId, parentSpanId,
+startTimeUnixNano, ...) and kept in a small in-memory ring for the app's
+debug panel::
+
+    with span("cube.aggregate", keys="Toll Date"):
+        ...
+
+``begin`` starts a root span for work that cannot sit in one ``with``
+block, such as a Streamlit rerun; every span opened before its ``end``
+shares its trace id, so ``recent_spans(root.trace_id)`` is that rerun alone.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+
+_state = {'enabled': False, 'path': None}
+_recent = deque(maxlen=500)
+_lock = threading.Lock()
+_current = contextvars.ContextVar("mta_trace_span", default=None)
+_NOOP = contextlib.nullcontext()
+
+
+def enable(path=None, keep=500):
+    """Start recording spans, appending them to ``path`` (JSONL) if given."""
+    global _recent
+    with _lock:
+        if keep != _recent.maxlen:
+            _recent = deque(_recent, maxlen=keep)
+        _state['path'] = path or _state['path']
+        _state['enabled'] = True
+
+
+def disable():
+    _state['enabled'] = False
+
+
+def enabled():
+    return _state['enabled']
+
+
+class _Span:
+    __slots__ = ('name', 'attributes', 'root', 'trace_id', 'span_id', 'parent_id', 'start', '_token')
+
+    def __init__(self, name, attributes, root=False):
+        self.name = name
+        self.attributes = attributes
+        self.root = root
+
+    def __enter__(self):
+        parent = None if self.root else _current.get()
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = secrets.token_hex(8)
+        self._token = _current.set(self)
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.time_ns()
+        if self.root:
+            # A root left open by an interrupted run must not outlive it
+            _current.set(None)
+        else:
+            _current.reset(self._token)
+        record = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start,
+            'endTimeUnixNano': end,
+            'attributes': {key: value if isinstance(value, (bool, int, float)) else str(value)
+                           for key, value in self.attributes.items()},
+            'status': {'code': 'ERROR', 'message': repr(exc)} if exc_type else {'code': 'OK'},
+        }
+        _export(record)
+        return False
+
+    def end(self):
+        self.__exit__(None, None, None)
+
+
+class _NoSpan:
+    trace_id = None
+
+    def end(self):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _export(record):
+    with _lock:
+        _recent.append(record)
+        path = _state['path']
+        if path:
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+def span(name, **attributes):
+    """Context manager timing the enclosed block as a span (a no-op while tracing is off)."""
+    if not _state['enabled']:
+        return _NOOP
+    return _Span(name, attributes)
+
+
+def begin(name, **attributes):
+    """Start a span that opens a new trace, whatever span is current; call ``end()`` on it when done."""
+    if not _state['enabled']:
+        return _NO_SPAN
+    return _Span(name, attributes, root=True).__enter__()
+
+
+def traced(name=None):
+    """Decorator recording each call of the function as a span."""
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def recent_spans(trace_id=None):
+    """Finished spans still in the in-memory ring, oldest first, with durations in ms.
+
+    With ``trace_id`` only the spans of that trace (e.g. one ``begin`` root).
+    """
+    with _lock:
+        records = [r for r in _recent if trace_id is None or r['traceId'] == trace_id]
+    return [
+        {'name': r['name'], 'ms': (r['endTimeUnixNano'] - r['startTimeUnixNano']) / 1e6,
+         'trace': r['traceId'][:8], **r['attributes']}
+        for r in records
+    ]
+
+
+if os.environ.get("MTA_TRACE"):
+    enable(os.environ["MTA_TRACE"])
@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+import pytest
+
+# mta.data reads MTA_CACHE_DIR at import; keep test snapshots out of the repo's .cache
+os.environ.setdefault("MTA_CACHE_DIR", tempfile.mkdtemp(prefix="mta-test-cache-"))
+
+from mta.synthetic import generate  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def synthetic_week():
+    """A week of synthetic rows in the raw export schema; copy before ingesting (it parses in place)."""
+    return next(generate('2025-01-05', days=7, chunk_days=7))
+
+
+@pytest.fixture
+def raw_entries(synthetic_week):
+    """A fresh copy of ``synthetic_week`` per test."""
+    return synthetic_week.copy()
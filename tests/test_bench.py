@@ -0,0 +1,11 @@
+from mta import bench
+
+
+def test_run_records_every_case(capsys):
+    results = bench.run(20_000, repeat=1)
+
+    names = {name for name, _, _ in bench.section_cases()}
+    assert {'load/prepare', 'cube/from_frame', 'dash/entry_series_all'} <= set(results)
+    assert {f'{name}/{step}' for name in names for step in ('aggregate', 'build')} <= set(results)
+    assert all(r['best_s'] >= 0 and r['peak_bytes'] > 0 for r in results.values())
+    assert 'section4/region/build' in capsys.readouterr().out
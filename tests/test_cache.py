@@ -0,0 +1,39 @@
+from mta import charts
+from mta.cache import LRUCache, cache_stats, memoize
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1, 'hit_rate': 0.5}
+
+
+def test_memoize_reuses_results_per_version(raw_entries):
+    cube = EntryCube.from_frame(prepare_entries(raw_entries, end=None))
+    calls = []
+
+    def region_table(version, region):
+        calls.append((version, region))
+        table = charts.region_table(cube)
+        return table[table['Detection Region'] == region]
+
+    first = memoize(maxsize=2, name="test.region_table")(region_table)
+    assert first("v1", "Brooklyn") is first("v1", "Brooklyn")
+    # A Streamlit rerun re-decorates the function and finds the same entries
+    rerun = memoize(maxsize=2, name="test.region_table")(region_table)
+    assert rerun.cache is first.cache and rerun("v1", "Brooklyn") is first("v1", "Brooklyn")
+    rerun("v2", "Brooklyn")
+    rerun("v2", "Queens")
+
+    assert calls == [("v1", "Brooklyn"), ("v2", "Brooklyn"), ("v2", "Queens")]
+    assert cache_stats()["test.region_table"] == {
+        'size': 2, 'maxsize': 2, 'hits': 3, 'misses': 3, 'evictions': 1, 'hit_rate': 0.5,
+    }
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from mta import charts, cloud
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+
+
+@pytest.fixture
+def cloud_dir(tmp_path, monkeypatch):
+    directory = str(tmp_path / "wordcloud")
+    monkeypatch.setattr(cloud, "CLOUD_DIR", directory)
+    monkeypatch.setattr(cloud, "_cache", None)
+    cloud.get_cache("wordcloud_png").clear()
+    return directory
+
+
+def test_disk_tier_created_on_first_render(cloud_dir, raw_entries, monkeypatch):
+    frequencies = charts.detection_counts(EntryCube.from_frame(prepare_entries(raw_entries, end=None)))
+    renders = []
+    render = cloud.render_png
+
+    def counting_render(*args, **kwargs):
+        renders.append(args)
+        return render(*args, **kwargs)
+
+    monkeypatch.setattr(cloud, "render_png", counting_render)
+    assert not os.path.exists(cloud_dir)
+
+    png = cloud.wordcloud_png(frequencies, width=200, height=100)
+    assert png.startswith(b"\x89PNG") and len(os.listdir(cloud_dir)) == 1
+    # A fresh process finds the image on disk
+    cloud.get_cache("wordcloud_png").clear()
+    assert cloud.wordcloud_png(frequencies, width=200, height=100) == png
+    assert len(renders) == 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mta.cube import ROWS, EntryCube, aggregate_csv
+from mta.data import MEASURES, prepare_entries, read_entries_csv, slot_labels
+
+
+@pytest.fixture(scope="module")
+def entries(synthetic_week):
+    return prepare_entries(synthetic_week.copy(), end=None)
+
+
+@pytest.fixture(scope="module")
+def cube(entries):
+    return EntryCube.from_frame(entries)
+
+
+def test_one_cell_per_row(entries, cube):
+    assert entries['Slot'].nunique() == 144
+    assert cube.data[0].size == len(entries)
+    assert (cube.data[-1] == 1).all()
+
+
+@pytest.mark.parametrize("keys", [
+    ['Detection Group'],
+    ['Detection Region', 'Vehicle Class'],
+    ['Toll Date', 'Time Period'],
+    ['Day of Week', 'Time Period', 'Detection Group'],
+    ['Time', 'Vehicle Class'],
+    ['Time Period'],
+])
+def test_aggregate_matches_groupby(entries, cube, keys):
+    frame = entries.assign(Time=np.asarray(slot_labels())[entries['Slot']])
+    expected = frame.groupby(keys, observed=True)[MEASURES].sum().reset_index()
+    result = cube.aggregate(keys, MEASURES)
+
+    assert len(result) == len(expected)
+    for key in keys:
+        assert result[key].astype(expected[key].dtype).tolist() == expected[key].tolist()
+    for measure in MEASURES:
+        assert result[measure].tolist() == expected[measure].tolist()
+
+
+def test_rows_per_time_period(entries, cube):
+    result = cube.aggregate(['Time Period'], [ROWS])
+    assert dict(zip(result['Time Period'].astype(str), result[ROWS])) == entries['Time Period'].value_counts().to_dict()
+
+
+def test_block_with_two_periods_is_rejected(entries):
+    block = entries[entries['Toll 10 Minute Block'] == '2025-01-06 08:00'].copy()
+    block['Time Period'] = np.where(np.arange(len(block)) % 2, 'Peak', 'Overnight')
+    with pytest.raises(ValueError, match="varies within a 10-minute block"):
+        EntryCube.from_frame(block)
+
+
+def test_replace_clears_only_the_delivered_blocks(entries, cube):
+    revised = entries[entries['Toll 10 Minute Block'] == '2025-01-06 08:10'].assign(**{'CRZ Entries': 1})
+    updated = EntryCube.from_frame(entries).add(revised, replace=True)
+
+    changed = np.argwhere((updated.data != cube.data).any(axis=(0, 3, 4)))
+    assert changed.tolist() == [[1, 49]]
+    assert (updated.data[0, 1, 49] == 1).all()
+    assert np.array_equal(updated.period, cube.period)
+
+
+def test_streamed_cube_matches_the_in_memory_one(tmp_path, synthetic_week):
+    source = str(tmp_path / "MTA_Entries.csv")
+    synthetic_week.to_csv(source, index=False)
+    keys = ['Toll Date', 'Time', 'Detection Group', 'Vehicle Class']
+    expected = EntryCube.from_frame(prepare_entries(read_entries_csv(source), end=None))
+
+    streamed = aggregate_csv(source, chunksize=10_000, end=None)
+    pd.testing.assert_frame_equal(streamed.aggregate(keys), expected.aggregate(keys))
+
+    classes = ['1 - Cars, Pickups and Vans', '5 - Motorcycles']
+    window = aggregate_csv(source, chunksize=10_000, start='2025-01-07', end='2025-01-08 23:59',
+                           filters={'Vehicle Class': classes})
+    result = window.aggregate(['Toll Date', 'Vehicle Class'])
+    assert result['Toll Date'].unique().tolist() == list(pd.to_datetime(['2025-01-07', '2025-01-08']))
+    assert sorted(result['Vehicle Class'].astype(str).unique()) == classes
+    totals = expected.aggregate(['Vehicle Class'], start='2025-01-07', end='2025-01-08')
+    assert result['CRZ Entries'].sum() == totals[totals['Vehicle Class'].isin(classes)]['CRZ Entries'].sum()
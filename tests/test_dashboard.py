@@ -0,0 +1,57 @@
+import os
+
+import pytest
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+
+from mta import dashboard
+from mta.cache import DiskCache, LRUCache, TieredCache
+from mta.dashboard import VEHICLE_CLASS_LABELS, create_app, vehicle_class_options
+from mta.data import prepare_entries
+
+
+@pytest.fixture(scope="module")
+def entries(synthetic_week):
+    return prepare_entries(synthetic_week.copy(), end=None)
+
+
+def test_vehicle_class_options_come_from_the_data(entries):
+    options = vehicle_class_options(entries[entries['Vehicle Class'] != '4 - Buses'])
+    assert options[0] == {'label': 'All', 'value': 'All'}
+    assert [o['value'] for o in options[1:]] == sorted(set(VEHICLE_CLASS_LABELS) - {'4 - Buses'})
+    assert all(o['label'] == VEHICLE_CLASS_LABELS[o['value']] for o in options[1:])
+
+
+def _update_graph(app):
+    """The server-side figure callback, called as if the vehicle class dropdown triggered it."""
+    context_value.set(AttributeDict(triggered_inputs=[{'prop_id': 'vehicle-class-dropdown.value', 'value': 'All'}]))
+    return app.callback_map['entry-graph.figure']['callback'].__wrapped__
+
+
+def test_disk_cache_evicts_the_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=2)
+    for i, key in enumerate(['a', 'b']):
+        cache.set(key, key * 3)
+        os.utime(cache._path(key), (i, i))
+    assert cache.get('a') == b'aaa'  # refreshes the mtime, so 'b' is now the oldest
+    cache.set('c', 'ccc')
+
+    assert cache.get('b') is None and len(cache) == 2
+    assert DiskCache(str(tmp_path)).get('c') == b'ccc'
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1, 'hit_rate': 0.5}
+
+
+def test_figures_are_shared_through_the_disk_tier(entries, tmp_path, monkeypatch):
+    builds = []
+    series = dashboard.entry_series
+    monkeypatch.setattr(dashboard, "entry_series", lambda *args: builds.append(args[1:]) or series(*args))
+    workers = [create_app(entries, version="v1", cache=TieredCache(LRUCache(4), DiskCache(str(tmp_path))))
+               for _ in range(2)]
+
+    figure = _update_graph(workers[0])('2025-01-06', '2025-01-08', 'All', 'CRZ', None)
+    assert _update_graph(workers[0])('2025-01-06T00:00:00', '2025-01-08', 'All', 'CRZ', None) == figure
+    # A second worker process with an empty memory tier finds the figure on disk
+    assert _update_graph(workers[1])('2025-01-06', '2025-01-08', 'All', 'CRZ', None) == figure
+    assert len(builds) == 1 and len(figure['data'][-1]['x']) == 3 * 144
+    stats = workers[1].server.test_client().get('/_cache_stats').json
+    assert stats['memory']['misses'] == 1 and stats['disk']['hits'] == 1
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mta import data
+from mta.data import SLOTS_PER_DAY, add_time_keys, day_dates, prepare_entries, slot_labels
+from mta.synthetic import generate
+
+
+def test_time_keys_follow_the_10_minute_block(raw_entries):
+    df = prepare_entries(raw_entries, end=None)
+    block = df['Toll 10 Minute Block']
+
+    assert sorted(df['Slot'].unique()) == list(range(SLOTS_PER_DAY))
+    assert (df['Slot'] == block.dt.hour * 6 + block.dt.minute // 10).all()
+    assert (df['Weekday'] == block.dt.dayofweek).all()
+    assert (day_dates(df['Day Index'].to_numpy()) == block.dt.normalize()).all()
+    assert (np.asarray(slot_labels())[df['Slot']] == block.dt.strftime('%H:%M')).all()
+
+
+def test_time_keys_on_hour_boundaries():
+    df = add_time_keys(pd.DataFrame({'Toll 10 Minute Block': pd.to_datetime(
+        ['2025-01-05 00:00', '2025-01-05 00:50', '2025-01-05 23:50', '2025-01-06 00:10'])}))
+    assert df['Slot'].tolist() == [0, 5, 143, 1]
+    assert df['Weekday'].tolist() == [6, 6, 6, 0]
+    assert df['Toll Date'].tolist() == list(pd.to_datetime(['2025-01-05'] * 3 + ['2025-01-06']))
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(data, "CACHE_DIR", str(directory))
+    return directory
+
+
+def test_snapshot_follows_the_csv_content(cache_dir, tmp_path, raw_entries, monkeypatch):
+    source = str(tmp_path / "MTA_Entries.csv")
+    raw_entries.to_csv(source, index=False)
+    version = data.data_version(source)
+
+    # Unchanged file: the snapshot is reused without parsing the CSV again
+    builds = []
+    build = data._build_snapshot
+    monkeypatch.setattr(data, "_build_snapshot", lambda *args: builds.append(args) or build(*args))
+    assert data.data_version(source) == version and builds == []
+    pd.testing.assert_frame_equal(data.read_snapshot(version), prepare_entries(data.read_entries_csv(source)))
+    assert data.current_versions() == {version}
+
+    raw_entries.iloc[:-144].to_csv(source, index=False)
+    updated = data.data_version(source)
+    assert updated != version and len(builds) == 1
+    assert data.current_versions() == {updated}
+    assert sorted(os.listdir(cache_dir)) == [f"mta_entries-{updated}.parquet", "snapshot.json"]
+
+
+def test_ingest_reads_only_the_typed_columns(tmp_path, raw_entries):
+    source = str(tmp_path / "MTA_Entries.csv")
+    raw_entries.to_csv(source, index=False)
+    df = data.read_entries_csv(source)
+
+    assert sorted(df.columns) == sorted(data.INGEST_COLUMNS)
+    assert all(isinstance(df[col].dtype, pd.CategoricalDtype) for col in ['Toll 10 Minute Block', *data.DIMENSIONS])
+    assert (df[data.MEASURES].dtypes == 'int32').all()
+    assert df[data.MEASURES].sum().tolist() == raw_entries[data.MEASURES].sum().tolist()
+    assert data.memory_report(source)['reduction'] > 2
+
+
+def test_windows_are_inclusive_binary_search_slices(raw_entries):
+    df = prepare_entries(raw_entries, end=None)
+    block = df['Toll 10 Minute Block']
+
+    window = data.time_slice(df, '2025-01-06 08:00', '2025-01-06 09:00')
+    assert window.equals(df[(block >= '2025-01-06 08:00') & (block <= '2025-01-06 09:00')])
+    assert window['Slot'].unique().tolist() == list(range(48, 55))
+    # A positional slice of the sorted frame, not a filtered copy
+    assert window.index[0] == block.searchsorted(pd.Timestamp('2025-01-06 08:00'))
+
+    days = data.date_range(df, '2025-01-07', '2025-01-08')
+    assert days['Toll Date'].unique().tolist() == list(pd.to_datetime(['2025-01-07', '2025-01-08']))
+    assert days['Slot'].iloc[[0, -1]].tolist() == [0, SLOTS_PER_DAY - 1]
+    assert len(data.date_range(df, '2025-01-07 15:00', '2025-01-07 16:00')) == len(df) // 7
+    assert data.date_range(df).equals(df) and data.time_slice(df, '2025-02-01').empty
+
+
+def test_prepare_sorts_and_cuts_the_window(raw_entries):
+    shuffled = raw_entries.sample(frac=1, random_state=0)
+    df = prepare_entries(shuffled, start='2025-01-06', end='2025-01-10 23:59:59')
+    assert df['Toll 10 Minute Block'].is_monotonic_increasing
+    assert df['Toll Date'].unique().tolist() == list(pd.date_range('2025-01-06', '2025-01-10'))
+    assert df.index.equals(pd.RangeIndex(len(df)))
+
+
+def test_each_distinct_block_is_parsed_once(raw_entries, monkeypatch):
+    col = raw_entries['Toll 10 Minute Block'].astype('category')
+    parsed = []
+    to_datetime = pd.to_datetime
+    monkeypatch.setattr(pd, "to_datetime", lambda values, **kwargs: parsed.append(len(values)) or to_datetime(values, **kwargs))
+
+    result = data.parse_toll_hours(col)
+    assert parsed == [7 * SLOTS_PER_DAY]
+    assert result.equals(to_datetime(raw_entries['Toll 10 Minute Block'], format=data.TOLL_HOUR_FORMAT))
+
+
+def test_dst_gap_and_bad_strings_are_rejected(raw_entries):
+    col = raw_entries['Toll 10 Minute Block'].copy()
+    col.iloc[:3] = ['03/09/2025 02:10:00 AM', '03/09/2025 02:10:00 AM', 'not a time']
+    with pytest.raises(ValueError) as error:
+        data.parse_toll_hours(col)
+    message = str(error.value)
+    assert "1 unparseable values in 1 rows (e.g. 'not a time')" in message
+    assert "1 nonexistent (DST gap) values in 2 rows (e.g. '03/09/2025 02:10:00 AM')" in message
+
+
+def test_fall_back_hour_is_kept_on_the_wall_clock_unless_rejected():
+    (day,) = generate('2025-11-02', days=1)
+    parsed = data.parse_toll_hours(day['Toll 10 Minute Block'])
+    # The repeated 1:00-1:50 AM blocks land on the same wall-clock times
+    counts = parsed.value_counts()
+    assert len(counts) == SLOTS_PER_DAY and counts.max() == 2 * counts.min()
+    assert counts[counts == counts.max()].index.hour.unique().tolist() == [1]
+    with pytest.raises(ValueError, match=r"6 ambiguous \(DST overlap\) values"):
+        data.parse_toll_hours(day['Toll 10 Minute Block'], ambiguous='raise')
@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+
+from mta.data import data_version, read_snapshot, time_slice
+from mta.dataset import PartitionedEntries, dataset_path
+
+
+def test_window_matches_snapshot(tmp_path, raw_entries):
+    source = str(tmp_path / "entries.csv")
+    raw_entries.to_csv(source, index=False)
+    version = data_version(source)
+    entries = PartitionedEntries.from_version(version)
+
+    start, end = pd.Timestamp('2025-01-07 06:00'), pd.Timestamp('2025-01-08 18:00')
+    window = entries.window(start, end, regions=['Brooklyn'])
+    snapshot = time_slice(read_snapshot(version), start, end)
+    expected = snapshot[snapshot['Detection Region'] == 'Brooklyn']
+    assert len(window) == len(expected)
+    assert window['CRZ Entries'].sum() == expected['CRZ Entries'].sum()
+    assert entries.scan_stats(start, end, ['Brooklyn'])['fraction'] < 0.5
+
+
+def test_new_version_drops_stale_datasets(tmp_path, raw_entries):
+    source = str(tmp_path / "entries.csv")
+    hours = pd.to_datetime(raw_entries['Toll Hour'], format='%m/%d/%Y %I:%M:%S %p')
+    raw_entries[hours < '2025-01-08'].to_csv(source, index=False)
+    old = PartitionedEntries.from_version(data_version(source))
+
+    raw_entries[hours < '2025-01-10'].to_csv(source, index=False)
+    new = PartitionedEntries.from_version(data_version(source))
+    assert new.version != old.version
+    assert os.path.isdir(dataset_path(new.version))
+    assert not os.path.exists(dataset_path(old.version))
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from mta import charts
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+from mta.duck import PARITY_KEYSETS, DuckEntries, parity
+
+pytest.importorskip('duckdb')
+
+
+@pytest.fixture(scope="module")
+def backends(synthetic_week, tmp_path_factory):
+    df = prepare_entries(synthetic_week.copy(), end=None)
+    path = str(tmp_path_factory.mktemp("duck") / "entries.parquet")
+    df.to_parquet(path, index=False)
+    return EntryCube.from_frame(df), DuckEntries(path)
+
+
+@pytest.mark.parametrize("keyset", PARITY_KEYSETS, ids=lambda k: " x ".join(k[0]) or "total")
+def test_aggregate_parity(backends, keyset):
+    cube, duck = backends
+    assert parity(cube, duck, [keyset]) == []
+
+
+@pytest.mark.parametrize("builder", [charts.detection_counts, charts.region_table, charts.daily_crz_share,
+                                     charts.crossing_point_box])
+def test_section_tables_match(backends, builder):
+    cube, duck = backends
+    a, b = builder(cube), builder(duck)
+    if isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    else:
+        assert a == b
+
+
+def test_unknown_backend_is_rejected():
+    env = {**os.environ, 'MTA_BACKEND': 'duckbd'}
+    result = subprocess.run([sys.executable, '-c', 'import mta.duck'], capture_output=True, text=True, env=env)
+    assert result.returncode != 0 and "Unknown MTA_BACKEND 'duckbd'" in result.stderr
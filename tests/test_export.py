@@ -0,0 +1,30 @@
+import json
+import os
+
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+from mta.export import ARTIFACTS, export_all
+
+
+def test_manifest_lists_every_written_file(tmp_path, raw_entries):
+    cube = EntryCube.from_frame(prepare_entries(raw_entries, end=None))
+    cube.version = 'week'
+    out = tmp_path / "site"
+    manifest = export_all(cube, str(out), workers=2)
+
+    assert manifest == json.loads((out / "manifest.json").read_text())
+    assert manifest['version'] == 'week' and set(manifest['artifacts']) == set(ARTIFACTS)
+    listed = {name for artifact in manifest['artifacts'].values() for name in artifact['files']}
+    assert listed | {"manifest.json"} == set(os.listdir(out))
+    assert manifest['artifacts']['region_table']['files'] == ['region_table.json', 'region_table.html']
+    assert (out / "wordcloud.png").read_bytes().startswith(b"\x89PNG")
+
+
+def test_serial_export_of_a_subset(tmp_path, raw_entries):
+    cube = EntryCube.from_frame(prepare_entries(raw_entries, end=None))
+    manifest = export_all(cube, str(tmp_path), workers=1, names=['detection_counts', 'vehicle_chart'])
+
+    assert sorted(manifest['artifacts']) == ['detection_counts', 'vehicle_chart']
+    counts = json.loads((tmp_path / "detection_counts.json").read_text())
+    assert sum(counts.values()) == len(raw_entries)
+    assert json.loads((tmp_path / "vehicle_chart.json").read_text())['data']
@@ -0,0 +1,13 @@
+from mta.importtime import LAZY, MODULES, _imports, report
+
+
+def test_no_lazy_package_is_imported_eagerly():
+    rows, failures = report(MODULES)
+    assert [row['module'] for row in rows] == MODULES
+    assert failures == [], f"eagerly imported (of {', '.join(LAZY)}): {failures}"
+
+
+def test_app_probe_skips_ingest_branch_imports():
+    imports = _imports('visualization.py')
+    assert 'import streamlit as st' in imports and 'from mta.parallel import' in imports
+    assert 'mta.store' not in imports and 'mta.dataset' not in imports and 'mta.refresh' not in imports
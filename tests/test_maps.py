@@ -0,0 +1,48 @@
+import folium
+import numpy as np
+import pytest
+from folium.plugins import HeatMap
+
+from mta import charts, maps
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+
+
+@pytest.fixture(scope="module")
+def cube(synthetic_week):
+    return EntryCube.from_frame(prepare_entries(synthetic_week.copy(), end=None))
+
+
+@pytest.fixture(scope="module")
+def entry_data(cube):
+    return charts.entry_data(cube)
+
+
+def _layers(entry_map, kind):
+    return [child for child in entry_map._children.values() if isinstance(child, kind)]
+
+
+def test_heatmap_takes_one_weighted_point_per_entry_point(entry_data):
+    (heat,) = _layers(maps.build_map(entry_data, maps.MAP_VIEWS[0]), HeatMap)
+    assert np.array_equal(heat.data, entry_data[['lat', 'lon', 'CRZ Entries']].to_numpy(dtype=float))
+
+
+def test_markers_and_bubbles_are_one_geojson_layer(entry_data):
+    (markers,) = _layers(maps.build_map(entry_data, maps.MAP_VIEWS[1]), folium.GeoJson)
+    (bubbles,) = _layers(maps.build_map(entry_data, maps.MAP_VIEWS[2]), folium.GeoJson)
+
+    features = markers.data['features']
+    assert [f['properties']['name'] for f in features] == entry_data['Detection Group'].astype(str).tolist()
+    assert [f['geometry']['coordinates'] for f in features] == entry_data[['lon', 'lat']].to_numpy().tolist()
+    assert features[0]['properties']['entries'] == f"{entry_data['CRZ Entries'].iloc[0]:,}"
+    radius = [f['properties']['radius'] for f in bubbles.data['features']]
+    assert radius == (np.sqrt(entry_data['CRZ Entries'].to_numpy()) / 35).astype(int).tolist()
+
+
+def test_map_html_renders_every_view(cube):
+    pages = [maps.map_html(cube, view) for view in maps.MAP_VIEWS]
+    assert all(page.startswith("<!DOCTYPE html>") for page in pages)
+    assert "heatLayer" in pages[0] and "Brooklyn Bridge" not in pages[0]
+    assert all("Brooklyn Bridge" in page for page in pages[1:])
+    with pytest.raises(ValueError, match="Unknown map view"):
+        maps.map_html(cube, "Choropleth")
@@ -0,0 +1,29 @@
+import pytest
+
+from mta.cube import EntryCube, aggregate_csv
+from mta.data import prepare_entries
+from mta.parallel import aggregate_csv_parallel, from_frame_parallel, from_store_parallel, partition_bounds, same_cube
+from mta.store import publish
+
+
+@pytest.fixture(scope="module")
+def entries(synthetic_week):
+    return prepare_entries(synthetic_week.copy(), end=None)
+
+
+@pytest.mark.parametrize("by", ["month", "week"])
+def test_from_frame_parallel_matches_serial(entries, by):
+    assert same_cube(from_frame_parallel(entries, by, workers=2), EntryCube.from_frame(entries))
+
+
+def test_from_store_parallel_matches_serial(entries, tmp_path):
+    path = publish(entries, "test", str(tmp_path / "entries.arrow"))
+    assert len(partition_bounds(entries, 'week')) == 2
+    assert same_cube(from_store_parallel(path, 'week', workers=2), EntryCube.from_frame(entries))
+
+
+def test_aggregate_csv_parallel_matches_serial(synthetic_week, tmp_path):
+    path = str(tmp_path / "entries.csv")
+    synthetic_week.to_csv(path, index=False)
+    serial = aggregate_csv(path, chunksize=20_000, end=None)
+    assert same_cube(aggregate_csv_parallel(path, workers=2, chunksize=20_000, end=None), serial)
@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+from mta.parallel import same_cube
+from mta.refresh import cube_version, load_cube, refresh, save_cube
+from mta.synthetic import generate
+
+
+def _blocks(raw):
+    return pd.to_datetime(raw['Toll 10 Minute Block'], format='%m/%d/%Y %I:%M:%S %p')
+
+
+def test_refresh_into_empty_path(tmp_path, raw_entries):
+    path = str(tmp_path / "cube" / "entry_cube")
+    summary = refresh(raw_entries, path)
+
+    assert summary['new_days'] == 7 and summary['revised_days'] == 0 and summary['changed']
+    assert summary['version'] is not None and cube_version(path) == summary['version']
+    cube = load_cube(path)
+    assert cube.last_toll_date == pd.Timestamp('2025-01-11')
+    assert same_cube(cube, EntryCube.from_frame(prepare_entries(raw_entries, end=None)))
+
+
+def test_empty_cube_has_no_last_date():
+    assert EntryCube.empty().last_toll_date is None
+
+
+def test_redelivery_keeps_version(tmp_path, raw_entries):
+    path = str(tmp_path / "entry_cube")
+    blocks = _blocks(raw_entries)
+    refresh(raw_entries[blocks < '2025-01-09'], path)
+    version = refresh(raw_entries[blocks >= '2025-01-09'], path)['version']
+
+    summary = refresh(raw_entries[blocks >= '2025-01-10'], path)
+    assert not summary['changed'] and summary['revised_days'] == 2
+    assert summary['version'] == version == cube_version(path)
+
+
+def test_revision_replaces_blocks(tmp_path, raw_entries):
+    path = str(tmp_path / "entry_cube")
+    version = refresh(raw_entries, path)['version']
+
+    block = _blocks(raw_entries) == '2025-01-08 08:10'
+    revised = raw_entries[block].assign(**{'CRZ Entries': 1})
+    summary = refresh(revised, path)
+    assert summary['changed'] and summary['version'] != version
+
+    expected = raw_entries.copy()
+    expected.loc[block, 'CRZ Entries'] = 1
+    assert same_cube(load_cube(path), EntryCube.from_frame(prepare_entries(expected, end=None)))
+
+
+def test_refresh_leaves_untouched_months_alone(tmp_path):
+    # Two days in each of three months stand in for a long history
+    raw = pd.concat([next(generate(start, days=2, chunk_days=2)) for start in ['2024-11-04', '2024-12-09', '2025-01-13']],
+                    ignore_index=True)
+    blocks = _blocks(raw)
+    path = str(tmp_path / "entry_cube")
+    history = EntryCube.from_frame(prepare_entries(raw[blocks < '2025-01-14'].copy(), end=None))
+    history.version = 'seed'
+    save_cube(history, path)
+    chunks = {name: os.stat(tmp_path / "entry_cube" / name) for name in ['2024-11.npz', '2024-12.npz']}
+
+    summary = refresh(raw[blocks >= '2025-01-14'], path)
+    assert summary['new_days'] == 1 and summary['changed']
+    assert sorted(os.listdir(path)) == ['2024-11.npz', '2024-12.npz', '2025-01.npz', 'cube.json']
+    for name, before in chunks.items():
+        after = os.stat(tmp_path / "entry_cube" / name)
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+    assert same_cube(load_cube(path), EntryCube.from_frame(prepare_entries(raw.copy(), end=None)))
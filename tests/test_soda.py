@@ -0,0 +1,29 @@
+import io
+
+import pandas as pd
+
+from mta.data import prepare_entries, read_entries_csv
+from mta.soda import ingest
+from mta.soda_mock import MockSodaServer
+from mta.store import open_entries
+
+
+def test_ingest_matches_csv_and_resumes(tmp_path, raw_entries):
+    buffer = io.StringIO()
+    raw_entries.to_csv(buffer, index=False)
+    buffer.seek(0)
+    expected = prepare_entries(read_entries_csv(buffer), end=None)
+
+    store = str(tmp_path / "entries.arrow")
+    options = dict(start=None, end=None, concurrency=4, page_size=2_000, directory=str(tmp_path / "parts"), store=store)
+    with MockSodaServer(raw_entries, failure_rate=0.2).start() as server:
+        first = ingest(server.url, **options)
+        assert server.failures > 0
+        version, df = open_entries(store)
+        assert first['fetched_days'] == first['days'] == 7 and version == first['version']
+        pd.testing.assert_frame_equal(df[expected.columns], expected)
+
+        second = ingest(server.url, **options)
+    # Checkpointed days are read back; only the last (possibly still filling) day is fetched again
+    assert second['fetched_days'] == 1
+    assert second['version'] == first['version']
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from mta.data import prepare_entries, time_slice
+from mta.store import open_entries, publish, stored_version
+
+
+def test_open_returns_the_version_it_read(tmp_path, raw_entries):
+    df = prepare_entries(raw_entries, end=None)
+    path = str(tmp_path / "entries.arrow")
+    publish(df, "v1", path)
+
+    version, opened = open_entries(path)
+    publish(df.iloc[:10], "v2", path)
+    # The earlier open still maps the file it read, and reports that file's version
+    assert version == "v1" and len(opened) == len(df)
+    assert stored_version(path) == "v2" and open_entries(path)[0] == "v2"
+
+
+def test_open_window_matches_time_slice(tmp_path, raw_entries):
+    df = prepare_entries(raw_entries, end=None)
+    path = publish(df, "v1", str(tmp_path / "entries.arrow"))
+
+    _, window = open_entries(path, '2025-01-07', '2025-01-08 23:59')
+    expected = time_slice(df, '2025-01-07', '2025-01-08 23:59').reset_index(drop=True)
+    assert window['Toll Date'].unique().tolist() == list(pd.to_datetime(['2025-01-07', '2025-01-08']))
+    pd.testing.assert_frame_equal(window, expected)
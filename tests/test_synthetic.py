@@ -0,0 +1,33 @@
+import pandas as pd
+
+from mta import synthetic
+from mta.data import MEASURES, prepare_entries, read_entries_csv
+
+
+def test_output_does_not_depend_on_chunking(synthetic_week):
+    chunks = list(synthetic.generate('2025-01-05', days=7, chunk_days=3))
+    assert [len(chunk) for chunk in chunks] == [3 * synthetic.ROWS_PER_DAY] * 2 + [synthetic.ROWS_PER_DAY]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), synthetic_week)
+    pd.testing.assert_frame_equal(synthetic.generate_day('2025-01-08'), chunks[1].iloc[:synthetic.ROWS_PER_DAY])
+    assert not synthetic.generate_day('2025-01-08', seed=1).equals(chunks[1].iloc[:synthetic.ROWS_PER_DAY])
+
+
+def test_rows_follow_the_export_schema(tmp_path, synthetic_week):
+    path = synthetic.write_csv(str(tmp_path / "MTA_Entries.csv"), start='2025-01-05', days=7)
+    assert pd.read_csv(path, nrows=0).columns.tolist() == synthetic.COLUMNS
+
+    df = prepare_entries(read_entries_csv(path), end=None)
+    assert df[MEASURES].sum().tolist() == synthetic_week[MEASURES].sum().tolist()
+    assert (df['Day of Week'].astype(str) == df['Toll Date'].dt.day_name()).all()
+    excluded = df.groupby('Detection Group', observed=True)['Excluded Roadway Entries'].sum()
+    assert sorted(excluded[excluded > 0].index) == sorted(synthetic.EXCLUDED_RATIO)
+    blocks = pd.DatetimeIndex(df['Toll 10 Minute Block'])
+    peak = synthetic.is_peak(blocks, blocks.hour.to_numpy())
+    assert ((df['Time Period'] == 'Peak') == peak).all()
+
+
+def test_days_for_rows():
+    assert synthetic.days_for_rows(1) == 1
+    assert synthetic.days_for_rows(synthetic.ROWS_PER_DAY) == 1
+    assert synthetic.days_for_rows(synthetic.ROWS_PER_DAY + 1) == 2
+    assert synthetic.days_for_rows(1e8) == -(-100_000_000 // synthetic.ROWS_PER_DAY)
@@ -0,0 +1,89 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mta import charts
+from mta.cube import EntryCube
+from mta.data import prepare_entries
+from mta.timeseries import (
+    ENTRY_COLUMNS, PAYLOAD_STEPS, RESOLUTIONS, WEBGL_POINTS, entry_payload, entry_series, lttb, render_mode,
+)
+
+
+@pytest.fixture(scope="module")
+def entries(synthetic_week):
+    return prepare_entries(synthetic_week.copy(), end=None)
+
+
+@pytest.fixture(scope="module")
+def cube(entries):
+    return EntryCube.from_frame(entries)
+
+
+@pytest.mark.parametrize("resolution", [None, *RESOLUTIONS])
+@pytest.mark.parametrize("vehicle_class", ['All', '2 - Single-Unit Trucks'])
+def test_cube_series_matches_rows(entries, cube, resolution, vehicle_class):
+    args = ('2025-01-06', '2025-01-08', vehicle_class, 'CRZ')
+    from_rows = entry_series(entries, *args, resolution=resolution)
+    from_cube = entry_series(cube, *args, resolution=resolution)
+    assert from_cube[1] == from_rows[1] == (resolution or '10-Minute')
+    pd.testing.assert_frame_equal(from_cube[0], from_rows[0])
+
+
+def test_section6_views_pick_render_mode(cube):
+    assert render_mode(WEBGL_POINTS) == 'svg' and render_mode(WEBGL_POINTS + 1) == 'webgl'
+    assert charts.time_of_day_chart(cube).data[0].type == 'scatter'
+    assert charts.entries_over_time_chart(cube, '10-Minute').data[-1].type == 'scattergl'
+    assert len(charts.entries_over_time_chart(cube, 'Daily').data[-1].x) == 7
+    assert len(charts.entries_over_time_chart(cube).data[-1].x) == 7 * 24
+
+
+def test_lttb_keeps_the_ends_and_a_spike(entries):
+    series, label = entry_series(entries, '2025-01-05', '2025-01-11', max_points=10**6, resolution='10-Minute')
+    x = series['Toll Hour'].to_numpy().astype(np.int64)
+    y = series['CRZ Entries'].to_numpy().copy()
+    y[500] = 10 * y.max()
+    picks = lttb(x, y, 200)
+
+    assert label == '10-Minute' and len(x) == 7 * 144
+    assert len(picks) == 200 and picks[0] == 0 and picks[-1] == len(x) - 1
+    assert (np.diff(picks) > 0).all() and 500 in picks
+    assert np.array_equal(lttb(x, y, len(x)), np.arange(len(x)))
+
+
+def test_series_is_thinned_to_the_point_budget(entries):
+    full, label = entry_series(entries, '2025-01-06', '2025-01-08', max_points=10**6)
+    thinned, _ = entry_series(entries, '2025-01-06', '2025-01-08', max_points=100)
+    picks = lttb(full['Toll Hour'].to_numpy().astype(np.int64), full['CRZ Entries'].to_numpy(), 100)
+
+    assert label == '10-Minute' and len(full) == 3 * 144
+    pd.testing.assert_frame_equal(thinned, full.iloc[picks].reset_index(drop=True))
+    assert len(entry_series(entries, '2025-01-05', '2025-01-11', max_points=500)[0]) == 7 * 24
+
+
+@pytest.mark.parametrize("step", list(PAYLOAD_STEPS))
+def test_payload_round_trips_the_bucket_totals(entries, step):
+    payload = json.loads(json.dumps(entry_payload(entries, step)))
+    n, classes = payload['n'], payload['classes']
+    width = PAYLOAD_STEPS[step]
+
+    assert classes == sorted(entries['Vehicle Class'].unique().astype(str))
+    assert payload['step'] == width // pd.Timedelta(milliseconds=1) and n == pd.Timedelta(days=7) // width
+    assert pd.Timestamp(payload['start'], unit='ms') == pd.Timestamp('2025-01-05')
+    for entry_type, column in ENTRY_COLUMNS.items():
+        values = np.frombuffer(base64.b64decode(payload['columns'][entry_type]), dtype='<i4').reshape(len(classes), n)
+        expected = (entries.groupby([entries['Vehicle Class'].astype(str), entries['Toll 10 Minute Block'].dt.floor(width)])
+                    [column].sum().unstack(fill_value=0))
+        assert np.array_equal(values, expected.loc[classes].to_numpy())
+
+
+def test_payload_rejects_int32_overflow(entries):
+    # Scale so the busiest 10-minute bucket just fits in int32 and its hour does not
+    per_block = entries.groupby(['Vehicle Class', 'Toll 10 Minute Block'], observed=True)['CRZ Entries'].sum()
+    busy = entries.assign(**{'CRZ Entries': entries['CRZ Entries'] * (np.iinfo(np.int32).max // per_block.max())})
+    entry_payload(busy, '10min')
+    with pytest.raises(ValueError, match="CRZ Entries per h bucket overflows int32; use a finer step"):
+        entry_payload(busy, 'h')
@@ -0,0 +1,30 @@
+from mta import trace
+from mta.trace import span
+
+
+def test_begin_groups_one_run():
+    trace.enable()
+    try:
+        first = trace.begin("app.rerun")
+        with span("section.build"):
+            pass
+        # A run that stops without end() must not adopt the next run's spans
+        second = trace.begin("app.rerun")
+        with span("section.render"):
+            pass
+        second.end()
+        with span("outside"):
+            pass
+    finally:
+        trace.disable()
+
+    assert first.trace_id != second.trace_id
+    assert [s['name'] for s in trace.recent_spans(second.trace_id)] == ['section.render', 'app.rerun']
+    assert [s['name'] for s in trace.recent_spans(first.trace_id)] == ['section.build']
+    assert trace.recent_spans()[-1]['trace'] not in (first.trace_id[:8], second.trace_id[:8])
+
+
+def test_begin_is_a_no_op_while_disabled():
+    root = trace.begin("app.rerun")
+    assert root.trace_id is None
+    root.end()
@@ -1,15 +1,14 @@
 import streamlit as st
 import os
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-import plotly.express as px
-import folium
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
-import branca.colormap as cm
-import datetime
+import streamlit.components.v1 as components
+from mta import charts, maps, trace
+from mta.cache import cache_stats, memoize
+from mta.cloud import wordcloud_png
+from mta.data import CUTOFF_DATE, MEASURES, data_version, prepare_entries, raw_csv_path, read_entries_csv, read_snapshot
+from mta.duck import BACKEND, DuckEntries
+from mta.parallel import aggregate_csv_parallel, from_frame_parallel
+from mta.timeseries import RESOLUTIONS
+from mta.trace import span
 
 # --- Page Configuration ---
 st.set_page_config(page_title="MTA Congestion Visualization", page_icon="🗽", layout="wide")
@@ -27,26 +26,93 @@ Source: <a href='https://new.mta.info/' target='_blank'>MTA Official Website</a>
 """, unsafe_allow_html=True)
 
 # --- Load Data ---
-df = pd.read_csv("https://raw.githubusercontent.com/QMSS-G5063-2025/Group_G_ManhattanCRZ/main/MTA_Entries.csv")
-df['Toll Hour'] = pd.to_datetime(df['Toll Hour'], format='%m/%d/%Y %I:%M:%S %p')
-df['Toll Date'] = df['Toll Hour'].dt.date
-df['Time'] = df['Toll Hour'].dt.strftime('%H:%M')
-cutoff_date = pd.to_datetime('2025-02-05 12:59:59')
-df = df[df['Toll Hour'] <= cutoff_date]
-
-# --- Define Entry Point Locations ---
-entry_points = {
-    'Brooklyn Bridge': {'lat': 40.70563, 'lon': -73.99635},
-    'Queensboro Bridge': {'lat': 40.759, 'lon': -73.955},
-    'East 60th St': {'lat': 40.76305, 'lon': -73.96818},
-    'Manhattan Bridge': {'lat': 40.7075, 'lon': -73.99077},
-    'Lincoln Tunnel': {'lat': 40.760128, 'lon': -74.003065},
-    'West Side Highway at 60th St': {'lat': 40.7714, 'lon': -73.9905},
-    'Queens Midtown Tunnel': {'lat': 40.7407, 'lon': -73.9588},
-    'Williamsburg Bridge': {'lat': 40.71369, 'lon': -73.97262},
-    'Holland Tunnel': {'lat': 40.727399, 'lon': -74.021338},
-    'Hugh L. Carey Tunnel': {'lat': 40.6958, 'lon': -74.0136},
-}
+# The CSV is parsed once per data version into a local Parquet snapshot (see mta/data.py);
+# reruns only read that snapshot, and the frame itself is shared across sessions.
+# MTA_INGEST=stream skips the snapshot and streams the raw CSV into the aggregate cube
+# chunk by chunk, for archives too large to hold in memory. MTA_INGEST=incremental serves
+# the cube kept up to date by `python -m mta.refresh` (see mta/refresh.py). MTA_INGEST=shared
+# memory-maps the Arrow store published by `python -m mta.store`, so every server process
+# shares one copy of the rows (see mta/store.py). MTA_INGEST=partitioned reads the month x
+# Detection Region Parquet dataset (see mta/dataset.py), pushing the study cutoff down to it.
+# Each mode's modules are imported in its own branch, so a mode never pays for another's.
+INGEST = os.environ.get("MTA_INGEST", "snapshot")
+
+# Tracing spans (mta/trace.py) are recorded when MTA_TRACE names a JSONL file, or for
+# the debug timing panel when MTA_DEBUG is set; otherwise they cost a flag check.
+if os.environ.get("MTA_DEBUG"):
+    trace.enable()
+
+# The DuckDB backend queries the Parquet snapshot; other ingest modes always use the cube
+if BACKEND == "duckdb" and INGEST != "snapshot":
+    st.warning(f"MTA_BACKEND=duckdb only applies to MTA_INGEST=snapshot; "
+               f"MTA_INGEST={INGEST} is served from the aggregate cube.")
+
+# One root span per rerun, so the timing panel shows this rerun's spans only
+rerun = trace.begin("app.rerun")
+
+# ``_entries`` is not part of the cache key: shared mode passes the rows it opened for ``version``
+@st.cache_resource(show_spinner="Loading MTA entries...")
+def load_data(version, _entries=None):
+    with span("load.data", ingest=INGEST):
+        return _load_data(version) if _entries is None else _entries
+
+def _load_data(version):
+    if INGEST == "stream":
+        return prepare_entries(read_entries_csv(raw_csv_path(), nrows=100))
+    if INGEST == "incremental":
+        return load_cube(version).aggregate(['Toll Date'], MEASURES)
+    if INGEST == "partitioned":
+        from mta.dataset import PartitionedEntries
+        return PartitionedEntries.from_version(version).window(end=CUTOFF_DATE)
+    return read_snapshot(version)
+
+# Every chart below is answered from a dense aggregate cube built once per data version,
+# split by month across MTA_WORKERS processes when that is set (see mta/parallel.py).
+# MTA_BACKEND=duckdb answers the same aggregates with SQL over the snapshot instead.
+@st.cache_resource(show_spinner="Building aggregates...")
+def load_cube(version):
+    with span("load.cube", ingest=INGEST):
+        return _load_cube(version)
+
+def _load_cube(version):
+    if BACKEND == "duckdb" and INGEST == "snapshot":
+        return DuckEntries.from_version(version)
+    if INGEST == "stream":
+        return aggregate_csv_parallel(raw_csv_path())
+    if INGEST == "incremental":
+        from mta import refresh
+        return refresh.load_cube()
+    return from_frame_parallel(load_data(version))
+
+# The shared store is opened once per published file (each publish replaces its inode)
+@st.cache_resource(show_spinner="Opening the shared store...", max_entries=2)
+def open_store(inode):
+    from mta.store import STORE_PATH, open_entries
+    return open_entries(STORE_PATH)
+
+# Section aggregates and figures, keyed by data version, builder and widget choice.
+# The cache lives in mta.cache, so it survives reruns and is shared by all sessions.
+@memoize(maxsize=32, name="sections")
+def build(version, builder, *params):
+    with span("section.build", builder=builder.__name__, params=params):
+        return builder(load_cube(version), *params)
+
+if INGEST == "incremental":
+    from mta import refresh
+    try:
+        data_ver = refresh.cube_version()
+    except FileNotFoundError:
+        st.error(f"No aggregate cube at {refresh.CUBE_PATH}. Seed it with `python -m mta.refresh --seed` first.")
+        st.stop()
+elif INGEST == "shared":
+    from mta.store import STORE_PATH, publish_snapshot, stored_version
+    if stored_version(STORE_PATH) is None:
+        publish_snapshot(path=STORE_PATH)
+    # Version and rows come from one open, so a publish in between cannot pair one with the other's rows
+    data_ver, shared_entries = open_store(os.stat(STORE_PATH).st_ino)
+else:
+    data_ver = data_version(build_snapshot=INGEST != "stream")
+df = load_data(data_ver, shared_entries if INGEST == "shared" else None)
 
 # --- Sidebar Navigation ---
 st.sidebar.title("📌 Navigation")
@@ -86,18 +152,11 @@ elif section == "2. Word Cloud of Entry Points":
     Helps quickly identify major access points for targeted traffic management.            
     """)
 
-    detection_counts = df["Detection Group"].value_counts()
+    detection_counts = build(data_ver, charts.detection_counts)
 
-    def generate_wordcloud():
-        wordcloud = WordCloud(width=800, height=400, colormap="Blues").generate_from_frequencies(
-            detection_counts.to_dict()
-        )
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation="bilinear")
-        ax.axis("off")
-        st.pyplot(fig)
-
-    generate_wordcloud()
+    # Rendered once per frequency table and cached as PNG (memory + .cache/wordcloud)
+    with span("section.render", section=section):
+        st.image(wordcloud_png(detection_counts), use_container_width=True)
     
 # --- Section 3: Heatmaps of Entry Points ---
 elif section == "3. Heatmaps of Entry Points":
@@ -115,53 +174,19 @@ elif section == "3. Heatmaps of Entry Points":
     # Add Select View for Heatmap type
     heatmap_choice = st.radio(
         "Select Heatmap View:",
-        ["Basic Heatmap", "Heatmap with Labels and Markers", "Bubble Map with Branca Colormap"]
+        maps.MAP_VIEWS
     )
-
-    # Prepare entry data
-    entry_data = df.groupby('Detection Group')['CRZ Entries'].sum().reset_index()
-    entry_data['lat'] = entry_data['Detection Group'].map(lambda x: entry_points.get(x, {}).get('lat'))
-    entry_data['lon'] = entry_data['Detection Group'].map(lambda x: entry_points.get(x, {}).get('lon'))
-    entry_data = entry_data.dropna(subset=['lat', 'lon'])
-
-    # Basic Heatmap
-    if heatmap_choice == "Basic Heatmap":
-        st.subheader("🚗 Basic Heatmap: Traffic Volume at Entry Points")
-        map1 = folium.Map(location=[40.758, -73.985], zoom_start=12)
-        HeatMap([[row['lat'], row['lon'], row['CRZ Entries']] for _, row in entry_data.iterrows()]).add_to(map1)
-        st_folium(map1, width=700, height=500)
-
-    # Heatmap with Labels 
-    elif heatmap_choice == "Heatmap with Labels and Markers":
-        st.subheader("📍 Heatmap with Labels and Markers")
-        map2 = folium.Map(location=[40.758, -73.985], zoom_start=12)
-        HeatMap([[row['lat'], row['lon'], row['CRZ Entries']] for _, row in entry_data.iterrows()]).add_to(map2)
-        for _, row in entry_data.iterrows():
-            popup = folium.Popup(f"{row['Detection Group']}: {row['CRZ Entries']} entries", max_width=200)
-            folium.Marker([row['lat'], row['lon']], popup=popup).add_to(map2)
-        st_folium(map2, width=700, height=500)
-
-    # Branca Colormap Bubble Map 
-    elif heatmap_choice == "Bubble Map with Branca Colormap":
-        st.subheader("🌐 Bubble Map with Branca Colormap")
-        map3 = folium.Map(location=[40.758, -73.985], zoom_start=12)
-        colormap = cm.LinearColormap(['blue', 'purple', 'orange', 'red'],
-                                     vmin=entry_data['CRZ Entries'].min(),
-                                     vmax=entry_data['CRZ Entries'].max())
-        map3.add_child(colormap)
-        for _, row in entry_data.iterrows():
-            radius = int(np.sqrt(row['CRZ Entries']) / 35)
-            color = colormap(row['CRZ Entries'])
-            folium.CircleMarker(
-                location=[row['lat'], row['lon']],
-                radius=radius,
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.7,
-                popup=folium.Popup(f"{row['Detection Group']}: {row['CRZ Entries']} entries", max_width=200)
-            ).add_to(map3)
-        st_folium(map3, width=700, height=500)
+    subheaders = {
+        "Basic Heatmap": "🚗 Basic Heatmap: Traffic Volume at Entry Points",
+        "Heatmap with Labels and Markers": "📍 Heatmap with Labels and Markers",
+        "Bubble Map with Branca Colormap": "🌐 Bubble Map with Branca Colormap",
+    }
+    st.subheader(subheaders[heatmap_choice])
+
+    # The rendered map page is cached per view and data version
+    map_page = build(data_ver, maps.map_html, heatmap_choice)
+    with span("section.render", section=section, view=heatmap_choice):
+        components.html(map_page, width=700, height=500)
 
 # --- Section 4: Percentage of Entries by Detection Region ---
 elif section == "4. Percentage of Entries by Detection Region":
@@ -179,28 +204,9 @@ elif section == "4. Percentage of Entries by Detection Region":
     For Brooklyn and Queens, policymakers might want to improve public transportation accessibility by enhancing bus and subway services. Offer subsidies or discounted fares for commuters who opt for public transport instead of driving.
     """)
     
-    region_data = df.groupby('Detection Region')['CRZ Entries'].sum().reset_index()
-    region_data['Percentage'] = (region_data['CRZ Entries'] / region_data['CRZ Entries'].sum()) * 100
-    fig = px.bar(
-    region_data,
-    x='Detection Region',
-    y='Percentage',
-    color='Detection Region',
-    title='Percentage of CRZ Entries by Detection Region',
-    labels={'Percentage': 'Percentage of Entries (%)'}
-)
-
-    fig.update_layout(
-    title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
-    width=1200,
-    height=600,
-    xaxis_title='Detection Region',
-    yaxis_title='Percentage of Entries (%)',
-    template='simple_white',
-    font=dict(family="Arial", size=14, color="black"),
-    showlegend=False
-)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = build(data_ver, charts.region_chart)
+    with span("section.render", section=section):
+        st.plotly_chart(fig, use_container_width=True)
 
 # --- Section 5: Average Daily Entries by Vehicle Type ---
 elif section == "5. Average Daily Entries by Vehicle Type":
@@ -218,12 +224,9 @@ elif section == "5. Average Daily Entries by Vehicle Type":
     The policy could offer discounted rates or incentives for high-occupancy vehicles to encourage ride-sharing, carpooling, or using electric vehicles.
     """)
     
-    daily_avg = df.groupby(['Toll Date', 'Vehicle Class'])['CRZ Entries'].sum().reset_index()
-    daily_avg = daily_avg.groupby('Vehicle Class')['CRZ Entries'].mean().reset_index(name='Average Daily Count')
-    fig = px.bar(daily_avg, x='Vehicle Class', y='Average Daily Count',
-                 title="Average Daily Number of Entries by Vehicle Type",
-                 color='Vehicle Class')
-    st.plotly_chart(fig, use_container_width=True)
+    fig = build(data_ver, charts.vehicle_chart)
+    with span("section.render", section=section):
+        st.plotly_chart(fig, use_container_width=True)
 
 # --- Section 6: Number of Entries by Time ---
 elif section == "6. Number of Entries by Time":
@@ -247,161 +250,18 @@ elif section == "6. Number of Entries by Time":
     # View Options
     view_choice = st.radio(
         "Select View:",
-        ["Peak vs. Off-Peak", "By Day of the Week", "Average Daily Entries Over Time", "By Time of Day (10-minute increments)"]
+        list(charts.TIME_VIEWS)
     )
-
-    if view_choice == "Peak vs. Off-Peak":
-        daily_avg_detection = df.groupby(['Toll Date', 'Time Period', 'Detection Group'])['CRZ Entries'].sum().reset_index()
-        daily_avg_detection = daily_avg_detection.groupby(['Time Period', 'Detection Group'])['CRZ Entries'].mean().reset_index()
-        daily_avg_detection = daily_avg_detection.sort_values(by='CRZ Entries', ascending=True)
-        pivot = daily_avg_detection.pivot(index='Detection Group', columns='Time Period', values='CRZ Entries').reset_index()
-        pivot = pivot.sort_values(by='Peak', ascending=False)
-        sorted_detection_groups = pivot['Detection Group'].tolist()
-
-        detection_time_chart = px.bar(
-            daily_avg_detection,
-            x='CRZ Entries',
-            y='Detection Group',
-            color='Time Period',
-            barmode='group',
-            orientation='h',
-            title='Average Daily Entries by Detection Group and Time Period',
-            labels={'CRZ Entries': 'Count of Entries'},
-            category_orders={'Detection Group': sorted_detection_groups, 'Time Period': ['Overnight', 'Peak']}
-        )
-
-        detection_time_chart.update_layout(
-            title=dict(y=0.9, x=0.55, xanchor="center", yanchor="top"),
-            xaxis_title="Entries",
-            yaxis_title="Detection Group",
-            template='simple_white',
-            font=dict(family="Arial", size=14, color="black"),
-            width=1000,
-            height=600
-        )
-        st.plotly_chart(detection_time_chart, use_container_width=True)
-
-    elif view_choice == "By Day of the Week":
-        dow_avg = df.groupby(['Toll Date', 'Day of Week', 'Time Period'])['CRZ Entries'].sum().reset_index()
-        dow_avg = dow_avg.groupby(['Day of Week', 'Time Period'])['CRZ Entries'].mean().reset_index()
-        dow_avg = dow_avg.sort_values(['Day of Week', 'Time Period'])
-
-        dow_chart = px.bar(
-            dow_avg,
-            x='Day of Week',
-            y='CRZ Entries',
-            color='Time Period',
-            barmode='group',
-            title='Average Daily Entries by Day of Week and Time Period',
-            labels={'CRZ Entries': 'Average Daily Entries', 'Day of Week': 'Day of Week'},
-            category_orders={'Day of Week': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
-                             'Time Period': ['Peak', 'Overnight']},
-            color_discrete_sequence=['#EF553B', '#636EFA']
-        )
-
-        dow_chart.update_layout(
-            title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
-            template='simple_white',
-            font=dict(family="Arial", size=14, color="black"),
-            width=1000,
-            height=600,
-            legend_title="Time Period"
-        )
-        st.plotly_chart(dow_chart, use_container_width=True)
-
-    elif view_choice == "Average Daily Entries Over Time":
-        daily_totals = df.groupby(['Toll Date', 'Day of Week', 'Time Period'])['CRZ Entries'].sum().reset_index()
-        daily_total = daily_totals.groupby(['Toll Date', 'Day of Week', 'Time Period'])['CRZ Entries'].mean().reset_index()
-        daily_total['Toll Date'] = pd.to_datetime(daily_total['Toll Date'])
-
-        time_chart = px.line(
-            daily_total,
-            x='Toll Date',
-            y='CRZ Entries',
-            color='Time Period',
-            title='Average Daily Entries Over Time',
-            labels={'CRZ Entries': 'Total Daily Entries', 'Toll Date': 'Date'},
-            color_discrete_map={'Peak': '#EF553B', 'Overnight': '#636EFA'}
-        )
-
-        time_chart.update_layout(
-            title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
-            template='simple_white',
-            font=dict(family="Arial", size=14, color="black"),
-            width=1000,
-            height=500,
-            legend_title="Time Period"
-        )
-        time_chart.update_xaxes(tickmode='auto', nticks=13, tickformat='%m-%d')
-
-        # Add shaded weekends
-        weekend_dates = daily_total[daily_total['Day of Week'].isin(['Saturday', 'Sunday'])]['Toll Date'].unique()
-        for date in weekend_dates:
-            date = pd.to_datetime(date)
-            next_date = date + pd.Timedelta(days=1)
-            time_chart.add_shape(
-                type="rect",
-                x0=date,
-                x1=next_date,
-                y0=0,
-                y1=1,
-                yref="paper",
-                fillcolor="lightgray",
-                opacity=0.3,
-                layer="below",
-                line_width=0,
-            )
-        time_chart.add_annotation(
-            xref="paper",
-            yref="paper",
-            x=0.02,
-            y=0.02,
-            text="Gray areas indicate weekends",
-            showarrow=False,
-            font=dict(family="Arial", size=12, color="black"),
-            bgcolor="white",
-            borderwidth=1,
-            borderpad=4,
-            opacity=0.8
-        )
-        time_chart.update_traces(mode='lines+markers', marker=dict(size=6))
-        st.plotly_chart(time_chart, use_container_width=True)
-
-    elif view_choice == "By Time of Day (10-minute increments)":
-        df['Time'] = pd.to_datetime(df['Toll Hour'], format='%m/%d/%Y %I:%M:%S %p', errors='coerce').dt.strftime('%H:%M')
-        time_sums = df.groupby(['Toll Date', 'Time'])['CRZ Entries'].sum().reset_index()
-        df_avg_entries = time_sums.groupby('Time')['CRZ Entries'].mean().reset_index()
-        df_avg_entries['Time'] = pd.to_datetime(df_avg_entries['Time'], format='%H:%M').dt.strftime('%H:%M')
-        df_avg_entries = df_avg_entries.sort_values('Time')
-
-        fig = px.line(
-            df_avg_entries,
-            x='Time',
-            y='CRZ Entries',
-            title='CRZ Entries by Time of Day (10-minute increments)',
-            labels={'Time': 'Time of Day (10-minute increments)', 'CRZ Entries': 'Average CRZ Entries'},
-            line_shape='linear'
-        )
-
-        # Add commute hour shading
-        fig.add_vrect(x0="06:00", x1="10:00", fillcolor="lightblue", opacity=0.3, line_width=0,
-                      annotation_text="Morning Commute Hours", annotation_position="top left")
-        fig.add_vrect(x0="16:00", x1="20:00", fillcolor="lightblue", opacity=0.3, line_width=0,
-                      annotation_text="Evening Commute Hours", annotation_position="top left")
-
-        fig.update_layout(
-            template='simple_white',
-            title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
-            xaxis_title='Time of Day (10-minute increments)',
-            yaxis_title='Average CRZ Entries',
-            font=dict(family="Arial", size=14, color="black"),
-            width=1200,
-            height=600,
-            hovermode="x unified"
-        )
-
+    params = ()
+    if charts.TIME_VIEWS[view_choice] is charts.entries_over_time_chart:
+        # Auto widens the buckets with the span; long lines are drawn with WebGL (see mta/timeseries.py)
+        resolution = st.radio("Resolution:", ["Auto", *RESOLUTIONS], horizontal=True)
+        params = (None if resolution == "Auto" else resolution,)
+    fig = build(data_ver, charts.TIME_VIEWS[view_choice], *params)
+    with span("section.render", section=section, view=view_choice):
         st.plotly_chart(fig, use_container_width=True)
 
+
 # --- Section 7: Congestion Relief Zone vs. Excluded Roadway Entries ---
 elif section == "7. Congestion Relief Zone vs. Excluded Roadway Entries":
     st.title("🚧 CRZ vs. Excluded Roadway Entries")
@@ -420,38 +280,17 @@ elif section == "7. Congestion Relief Zone vs. Excluded Roadway Entries":
     Considering the lower volume of Excluded Roadway Entries, the city could promote the use of these roads through incentives or temporary toll-free periods to help distribute traffic more evenly.
     """)
 
-    # Filter for Jan 5 - Jan 25, 2025 (as per your original logic)
-    df_filtered = df[
-    (df['Toll Date'] >= datetime.date(2025, 1, 5)) &
-    (df['Toll Date'] <= datetime.date(2025, 1, 25))
-]
-
-    # Group by 'Toll Date' and sum CRZ and Excluded Roadway entries
-    daily_entries = df_filtered.groupby('Toll Date')[['CRZ Entries', 'Excluded Roadway Entries']].sum().reset_index()
-
-    # Create the stacked bar chart
-    fig = px.bar(
-        daily_entries,
-        x='Toll Date',
-        y=['CRZ Entries', 'Excluded Roadway Entries'],
-        title='Daily Entries to CRZ and Excluded Roadways (Jan 5 - Jan 25)',
-        labels={'Toll Date': 'Date', 'value': 'Daily Entries', 'variable': 'Entry Type'},
-        color_discrete_sequence=['#0074CC', '#C1D3F7']
-    )
+    fig = build(data_ver, charts.crz_vs_excluded_chart)
+    with span("section.render", section=section):
+        st.plotly_chart(fig, use_container_width=True)
 
-    # Customize layout
-    fig.update_layout(
-        barmode='stack',
-        xaxis_title='Date',
-        yaxis_title='Daily Entries',
-        template='simple_white',
-        width=1200,
-        height=600,
-        title=dict(y=0.9, x=0.45, xanchor="center", yanchor="top"),
-        yaxis=dict(tickmode='array', tickvals=[0, 200000, 400000, 600000]),
-        font=dict(family="Arial", size=14, color="black")
-    )
+rerun.end()
 
-    st.plotly_chart(fig, use_container_width=True)
+# --- Cache statistics and timings (set MTA_DEBUG=1 to show) ---
+if os.environ.get("MTA_DEBUG"):
+    with st.sidebar.expander("Cache statistics"):
+        st.json(cache_stats())
+    with st.sidebar.expander("Timings (ms)"):
+        st.dataframe(trace.recent_spans(rerun.trace_id), hide_index=True)
 
 st.caption("2025 MTA Congestion Data Visualization · Group_G")